@@ -0,0 +1,87 @@
+import re
+from collections import deque
+
+
+class AutomataFrases:
+    """
+    Autómata de Aho-Corasick sobre secuencias de palabras.
+
+    Las transiciones se hacen por palabra completa y no por carácter, así que una frase solo
+    coincide en límites de palabra ("tonto" no aparece dentro de "tontería"), y todas las
+    frases de todas las categorías se buscan en una sola pasada lineal sobre los tokens.
+    """
+    def __init__(self):
+        self.transiciones = [{}]
+        self.fallos = [0]
+        # Por estado: [(categoria, frase, cantidad de palabras)] que terminan en él
+        self.salidas = [[]]
+        self.compilado = True
+
+    @classmethod
+    def desde_categorias(cls, categorias):
+
+        automata = cls()
+        for categoria, frases in categorias.items():
+            for frase in frases:
+                automata.agregar(frase, categoria)
+        automata.compilar()
+        return automata
+
+    def agregar(self, frase, categoria):
+
+        palabras = re.findall(r'\w+', frase.lower())
+        if not palabras:
+            return
+
+        estado = 0
+        for palabra in palabras:
+            siguiente = self.transiciones[estado].get(palabra)
+            if siguiente is None:
+                siguiente = len(self.transiciones)
+                self.transiciones.append({})
+                self.fallos.append(0)
+                self.salidas.append([])
+                self.transiciones[estado][palabra] = siguiente
+            estado = siguiente
+
+        self.salidas[estado].append((categoria, frase, len(palabras)))
+        self.compilado = False
+
+    def compilar(self):
+
+        # Recorrido en anchura: el enlace de fallo de cada estado apunta al sufijo propio
+        # más largo que también es prefijo de alguna frase
+        cola = deque()
+        for estado in self.transiciones[0].values():
+            self.fallos[estado] = 0
+            cola.append(estado)
+
+        while cola:
+            estado = cola.popleft()
+            for palabra, siguiente in self.transiciones[estado].items():
+                fallo = self.fallos[estado]
+                while fallo and palabra not in self.transiciones[fallo]:
+                    fallo = self.fallos[fallo]
+                self.fallos[siguiente] = self.transiciones[fallo].get(palabra, 0)
+                self.salidas[siguiente] = self.salidas[siguiente] + self.salidas[self.fallos[siguiente]]
+                cola.append(siguiente)
+
+        self.compilado = True
+
+    def avanzar(self, estado, palabra):
+        """Transición desde `estado` leyendo `palabra`; devuelve (nuevo_estado, salidas)"""
+        while estado and palabra not in self.transiciones[estado]:
+            estado = self.fallos[estado]
+        estado = self.transiciones[estado].get(palabra, 0)
+        return estado, self.salidas[estado]
+
+    def buscar(self, palabras):
+        """Genera (posicion_inicio, categoria, frase) para cada coincidencia en la secuencia"""
+        if not self.compilado:
+            self.compilar()
+
+        estado = 0
+        for posicion, palabra in enumerate(palabras):
+            estado, salidas = self.avanzar(estado, palabra)
+            for categoria, frase, largo in salidas:
+                yield posicion - largo + 1, categoria, frase
@@ -0,0 +1,294 @@
+"""
+Resultados de procesar_conversacion guardados en SQLite para consultarlos sin reprocesar.
+
+Por defecto van a una base aparte (resultados.db), así los lotes que escriben resultados no
+compiten por el bloqueo con las altas del léxico; las tablas no chocan con las de
+tokenizador.db, así que también pueden vivir ahí.
+
+    conversaciones           una fila por conversación: fecha de la llamada, totales de sentimiento
+    turnos_conversacion      puntuación, acumulados y promedio móvil de cada turno
+    protocolo_conversacion   estado de cada fase del protocolo y si se cumplió
+    categorias_conversacion  cantidad de tokens de cada categoría (positivo, prohibida, ...)
+    apariciones              palabras negativas y frases del protocolo con su ubicación
+    correcciones_conversacion  correcciones hechas durante el análisis
+
+Las conversaciones se acumulan y se escriben de a `tamanio_lote` por transacción. Los índices
+cubren las consultas de cumplimiento: por sentimiento y fecha, por fase y cumplimiento, y por
+categoría de token, así que buscar() resuelve cada filtro con un índice sin recorrer la tabla.
+"""
+from datetime import datetime, timezone
+
+from conexion_sqlite import conectar
+
+# Estados de una fase del protocolo que cuentan como cumplida
+ESTADOS_CUMPLIDOS = ('OK', 'Ninguna detectada')
+
+ESQUEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS conversaciones (
+        id INTEGER PRIMARY KEY,
+        archivo TEXT,
+        fecha TEXT NOT NULL,
+        analizado_en TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        sentimiento TEXT,
+        puntuacion_total INTEGER,
+        palabras_positivas INTEGER,
+        palabras_negativas INTEGER,
+        puntuacion_agente INTEGER,
+        puntuacion_cliente INTEGER,
+        turnos INTEGER,
+        correcciones INTEGER
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_conversaciones_fecha ON conversaciones (fecha)',
+    'CREATE INDEX IF NOT EXISTS idx_conversaciones_sentimiento ON conversaciones (sentimiento, fecha)',
+    'CREATE INDEX IF NOT EXISTS idx_conversaciones_archivo ON conversaciones (archivo)',
+    '''
+    CREATE TABLE IF NOT EXISTS turnos_conversacion (
+        conversacion INTEGER NOT NULL REFERENCES conversaciones (id) ON DELETE CASCADE,
+        turno INTEGER NOT NULL,
+        hablante TEXT,
+        puntuacion INTEGER,
+        acumulado INTEGER,
+        acumulado_hablante INTEGER,
+        movil_hablante REAL,
+        PRIMARY KEY (conversacion, turno)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS protocolo_conversacion (
+        conversacion INTEGER NOT NULL REFERENCES conversaciones (id) ON DELETE CASCADE,
+        fase TEXT NOT NULL,
+        estado TEXT,
+        cumple INTEGER NOT NULL,
+        PRIMARY KEY (conversacion, fase)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_protocolo_fase ON protocolo_conversacion (fase, cumple, conversacion)',
+    '''
+    CREATE TABLE IF NOT EXISTS categorias_conversacion (
+        conversacion INTEGER NOT NULL REFERENCES conversaciones (id) ON DELETE CASCADE,
+        categoria TEXT NOT NULL,
+        cantidad INTEGER NOT NULL,
+        PRIMARY KEY (conversacion, categoria)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_categorias_categoria ON categorias_conversacion (categoria, conversacion)',
+    '''
+    CREATE TABLE IF NOT EXISTS apariciones (
+        conversacion INTEGER NOT NULL REFERENCES conversaciones (id) ON DELETE CASCADE,
+        turno INTEGER,
+        categoria TEXT,
+        palabra TEXT,
+        puntuacion INTEGER,
+        inicio INTEGER,
+        fin INTEGER
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_apariciones_conversacion ON apariciones (conversacion)',
+    'CREATE INDEX IF NOT EXISTS idx_apariciones_categoria ON apariciones (categoria, palabra)',
+    '''
+    CREATE TABLE IF NOT EXISTS correcciones_conversacion (
+        conversacion INTEGER NOT NULL REFERENCES conversaciones (id) ON DELETE CASCADE,
+        palabra_original TEXT,
+        palabra_corregida TEXT,
+        token TEXT,
+        puntuacion INTEGER,
+        tipo TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_correcciones_conversacion ON correcciones_conversacion (conversacion)',
+    'CREATE INDEX IF NOT EXISTS idx_correcciones_palabra ON correcciones_conversacion (palabra_corregida)',
+)
+
+
+def fecha_sql(fecha=None):
+    """Fecha en el formato de CURRENT_TIMESTAMP (UTC); acepta datetime, timestamp o texto ya formateado"""
+    if fecha is None:
+        fecha = datetime.now(timezone.utc)
+    elif isinstance(fecha, (int, float)):
+        fecha = datetime.fromtimestamp(fecha, timezone.utc)
+    elif isinstance(fecha, str):
+        return fecha
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc)
+    return fecha.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def tipo_correccion(correccion):
+
+    if correccion.get('automatica'):
+        return 'automatica'
+    if correccion.get('aprendida'):
+        return 'aprendida'
+    return 'seleccionada'
+
+
+class AlmacenResultados:
+
+    def __init__(self, ruta_bd='resultados.db', tamanio_lote=500):
+        self.ruta_bd = ruta_bd
+        self.tamanio_lote = tamanio_lote
+        self.pendientes = []
+        self.conn = None
+        with self.conexion() as conn:
+            for sentencia in ESQUEMA:
+                conn.execute(sentencia)
+
+    def conexion(self):
+
+        if self.conn is None:
+            # Sin claves foráneas SQLite ignora el ON DELETE CASCADE al reemplazar una conversación
+            self.conn = conectar(self.ruta_bd, claves_foraneas=True)
+        return self.conn
+
+    def guardar(self, resultados, archivo=None, fecha=None):
+        """
+        Encola los resultados de una conversación; se escriben al juntar `tamanio_lote` o al
+        llamar a vaciar(). Si el archivo ya estaba guardado, sus resultados anteriores se
+        reemplazan. `fecha` es la de la llamada (por defecto, ahora).
+        """
+        self.pendientes.append((resultados, archivo, fecha_sql(fecha)))
+        if len(self.pendientes) >= self.tamanio_lote:
+            self.vaciar()
+
+    def vaciar(self):
+
+        if not self.pendientes:
+            return 0
+
+        # Un archivo guardado dos veces en el mismo lote queda solo con lo último
+        ultimos = {archivo: i for i, (_, archivo, _) in enumerate(self.pendientes) if archivo is not None}
+        pendientes = [pendiente for i, pendiente in enumerate(self.pendientes)
+                      if pendiente[1] is None or ultimos[pendiente[1]] == i]
+        archivos = list(ultimos)
+
+        conversaciones, turnos, protocolo, categorias, apariciones, correcciones = [], [], [], [], [], []
+
+        conn = self.conexion()
+        with conn:
+            # BEGIN IMMEDIATE toma el bloqueo de escritura antes de leer el último id, así los ids
+            # asignados acá no chocan con los de otro proceso que escriba en la misma base
+            conn.execute('BEGIN IMMEDIATE')
+            for i in range(0, len(archivos), 500):
+                parte = archivos[i:i + 500]
+                conn.execute(f"DELETE FROM conversaciones WHERE archivo IN ({','.join('?' * len(parte))})", parte)
+            siguiente = conn.execute('SELECT COALESCE(MAX(id), 0) FROM conversaciones').fetchone()[0] + 1
+
+            for id_conversacion, (resultados, archivo, fecha) in enumerate(pendientes, siguiente):
+                s = resultados.get('sentimiento_general') or {}
+                por_hablante = resultados.get('sentimiento_por_hablante') or {}
+                linea = (resultados.get('linea_tiempo') or {}).get('turnos', [])
+                correcciones_totales = resultados.get('correcciones_totales', [])
+                conversaciones.append((
+                    id_conversacion, archivo, fecha, s.get('sentimiento'), s.get('puntuacion_total'),
+                    s.get('palabras_positivas'), s.get('palabras_negativas'),
+                    por_hablante.get('Agente', {}).get('puntuacion_total'),
+                    por_hablante.get('Cliente', {}).get('puntuacion_total'),
+                    len(linea), len(correcciones_totales)
+                ))
+                turnos.extend((id_conversacion, p['turno'], p['hablante'], p['puntuacion'], p['acumulado'],
+                               p['acumulado_hablante'], p['movil_hablante']) for p in linea)
+                protocolo.extend((id_conversacion, fase, estado, int(estado in ESTADOS_CUMPLIDOS))
+                                 for fase, estado in (resultados.get('protocolo') or {}).items())
+                if resultados.get('columnas') is not None:
+                    categorias.extend((id_conversacion, categoria, cantidad)
+                                      for categoria, cantidad in resultados['columnas'].conteo_categorias().items())
+                apariciones.extend((id_conversacion, p['turno'], 'negativa', p['palabra'], p['puntuacion'],
+                                    p['inicio'], p['fin']) for p in resultados.get('palabras_negativas', []))
+                apariciones.extend((id_conversacion, c.get('turno'), c['categoria'], c['frase'], None,
+                                    c.get('inicio'), c.get('fin')) for c in resultados.get('coincidencias_protocolo', []))
+                correcciones.extend((id_conversacion, c['palabra_original'], c['palabra_corregida'], c['token'],
+                                     c['puntuacion'], tipo_correccion(c)) for c in correcciones_totales)
+
+            conn.executemany('''INSERT INTO conversaciones (id, archivo, fecha, sentimiento, puntuacion_total,
+                                palabras_positivas, palabras_negativas, puntuacion_agente, puntuacion_cliente,
+                                turnos, correcciones) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', conversaciones)
+            conn.executemany('INSERT INTO turnos_conversacion VALUES (?, ?, ?, ?, ?, ?, ?)', turnos)
+            conn.executemany('INSERT INTO protocolo_conversacion VALUES (?, ?, ?, ?)', protocolo)
+            conn.executemany('INSERT INTO categorias_conversacion VALUES (?, ?, ?)', categorias)
+            conn.executemany('INSERT INTO apariciones VALUES (?, ?, ?, ?, ?, ?, ?)', apariciones)
+            conn.executemany('INSERT INTO correcciones_conversacion VALUES (?, ?, ?, ?, ?, ?)', correcciones)
+
+        cantidad = len(pendientes)
+        self.pendientes = []
+        return cantidad
+
+    def filtros(self, sentimiento=None, fase=None, cumple=None, categoria=None, desde=None, hasta=None):
+        """
+        Condiciones WHERE sobre conversaciones (alias c) y sus parámetros. Con fecha o
+        sentimiento la consulta recorre ese índice de conversaciones y comprueba fase y
+        categoría por clave primaria (EXISTS); sin ellos, la primera de fase o categoría se
+        resuelve con su índice (IN) y el resto por clave primaria.
+        """
+        condiciones, parametros = [], []
+        if sentimiento is not None:
+            condiciones.append('c.sentimiento = ?')
+            parametros.append(sentimiento)
+        if desde is not None:
+            condiciones.append('c.fecha >= ?')
+            parametros.append(fecha_sql(desde))
+        if hasta is not None:
+            condiciones.append('c.fecha < ?')
+            parametros.append(fecha_sql(hasta))
+
+        relacionadas = []
+        if fase is not None:
+            if cumple is None:
+                relacionadas.append(('protocolo_conversacion', 'fase = ?', [fase]))
+            else:
+                relacionadas.append(('protocolo_conversacion', 'fase = ? AND cumple = ?', [fase, int(cumple)]))
+        if categoria is not None:
+            relacionadas.append(('categorias_conversacion', 'categoria = ?', [categoria]))
+
+        for tabla, condicion, valores in relacionadas:
+            if condiciones:
+                condiciones.append(f'EXISTS (SELECT 1 FROM {tabla} WHERE conversacion = c.id AND {condicion})')
+            else:
+                condiciones.append(f'c.id IN (SELECT conversacion FROM {tabla} WHERE {condicion})')
+            parametros.extend(valores)
+        return (' WHERE ' + ' AND '.join(condiciones) if condiciones else ''), parametros
+
+    def buscar(self, limite=None, **filtros):
+        """
+        Conversaciones que cumplen todos los filtros, de la más reciente a la más antigua:
+        sentimiento ('Negativo'...), fase y cumple (fase='Uso de palabras rudas', cumple=False),
+        categoria de token ('prohibida'), desde y hasta (fecha de la llamada, hasta excluida).
+        """
+        self.vaciar()
+        donde, parametros = self.filtros(**filtros)
+        consulta = f'SELECT c.* FROM conversaciones c{donde} ORDER BY c.fecha DESC, c.id DESC'
+        if limite is not None:
+            consulta += ' LIMIT ?'
+            parametros.append(limite)
+        cursor = self.conexion().execute(consulta, parametros)
+        columnas = [descripcion[0] for descripcion in cursor.description]
+        return [dict(zip(columnas, fila)) for fila in cursor]
+
+    def contar(self, **filtros):
+
+        self.vaciar()
+        donde, parametros = self.filtros(**filtros)
+        return self.conexion().execute(f'SELECT COUNT(*) FROM conversaciones c{donde}', parametros).fetchone()[0]
+
+    def detalle(self, id_conversacion):
+        """Turnos, protocolo, categorías, apariciones y correcciones guardados de una conversación"""
+        self.vaciar()
+        conn = self.conexion()
+        detalle = {}
+        for clave, tabla, orden in (('turnos', 'turnos_conversacion', 'turno'),
+                                    ('protocolo', 'protocolo_conversacion', 'fase'),
+                                    ('categorias', 'categorias_conversacion', 'categoria'),
+                                    ('apariciones', 'apariciones', 'inicio'),
+                                    ('correcciones', 'correcciones_conversacion', 'rowid')):
+            cursor = conn.execute(f'SELECT * FROM {tabla} WHERE conversacion = ? ORDER BY {orden}', (id_conversacion,))
+            columnas = [descripcion[0] for descripcion in cursor.description]
+            detalle[clave] = [dict(zip(columnas, fila)) for fila in cursor]
+        return detalle
+
+    def cerrar(self):
+
+        if self.conn is not None:
+            self.vaciar()
+            self.conn.close()
+            self.conn = None
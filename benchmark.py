@@ -0,0 +1,822 @@
+"""
+Benchmarks del tokenizador.
+
+Uso:
+    python benchmark.py sugerencias [--tamanios 1000 10000 100000] [--consultas 20]
+    python benchmark.py distancias [--consultas 200 | --completo]
+    python benchmark.py escritura [--palabras 2000]
+    python benchmark.py carga [--tamanio 100000]
+    python benchmark.py cache [--consultas 20000] [--distintas 2000] [--capacidad 10000]
+    python benchmark.py pipeline [--lexicos 1000 10000] [--turnos 100 500] [--indice bk|numpy]
+                                 [--salida resultados.json] [--comparar anterior.json]
+    python benchmark.py columnar [--conversaciones 500] [--turnos 40]
+    python benchmark.py resultados [--conversaciones 100000] [--lote 500]
+    python benchmark.py reanalisis [--conversaciones 300] [--turnos 30]
+    python benchmark.py servidor [--conversaciones 200] [--clientes 4] [--turnos 20]
+    python benchmark.py importacion [--modulos motor lote cli] [--repeticiones 5] [--limite-ms 150]
+                                    [--salida importacion.json]
+"""
+import argparse
+import glob
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import random
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from almacen_resultados import AlmacenResultados
+from cache_resultados import CacheResultados
+from columnar import LoteColumnar
+from distancias_vectorizadas import MotorDistancias
+from instantanea import exportar_instantanea
+from motor import Tokenizador
+from reporte import crear_registro
+from servidor import ClienteAnalisis, percentiles
+
+SILABAS = ['ca', 'co', 'cu', 'ta', 'te', 'ti', 'to', 'ma', 'me', 'mi', 'mo', 'pa', 'pe', 'po',
+           'ra', 're', 'ri', 'ro', 'sa', 'se', 'si', 'so', 'la', 'le', 'li', 'lo', 'na', 'ne',
+           'ni', 'no', 'da', 'de', 'di', 'do', 'ga', 'go', 'ba', 'be', 'bi', 'ción', 'ñu', 'án']
+LETRAS = 'abcdefghijklmnopqrstuvwxyzáéíóúñ'
+
+
+def crear_tokenizador(**opciones):
+    """Crea un Tokenizador no interactivo sobre una copia temporal de tokenizador.db"""
+    directorio = tempfile.mkdtemp(prefix='bench_tokenizador_')
+    ruta_bd = os.path.join(directorio, 'tokenizador.db')
+    shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tokenizador.db'), ruta_bd)
+    opciones.setdefault('interactivo', False)
+    opciones.setdefault('verboso', False)
+    return Tokenizador(ruta_bd, **opciones), directorio
+
+
+def palabras_base():
+
+    ruta = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tokenizador.db')
+    conn = sqlite3.connect(ruta)
+    palabras = [lexema.lower() for lexema, in conn.execute('SELECT lexema FROM palabras')]
+    conn.close()
+    return palabras
+
+
+def generar_lexico(tamanio, rng):
+    """Léxico sintético: las palabras reales de la base más pseudopalabras por sílabas"""
+    lexico = dict.fromkeys(palabras_base()[:tamanio])
+    while len(lexico) < tamanio:
+        palabra = ''.join(rng.choice(SILABAS) for _ in range(rng.randint(2, 5)))
+        lexico.setdefault(palabra)
+    return {palabra: ('neutro', 0) for palabra in lexico}
+
+
+def alterar(palabra, rng, ediciones=1):
+    """Simula un error de transcripción con inserciones, borrados o sustituciones"""
+    for _ in range(ediciones):
+        pos = rng.randrange(len(palabra) + 1)
+        operacion = rng.choice('isb') if len(palabra) > 1 else 'i'
+        if operacion == 'i':
+            palabra = palabra[:pos] + rng.choice(LETRAS) + palabra[pos:]
+        elif operacion == 's':
+            pos = min(pos, len(palabra) - 1)
+            palabra = palabra[:pos] + rng.choice(LETRAS) + palabra[pos + 1:]
+        else:
+            pos = min(pos, len(palabra) - 1)
+            palabra = palabra[:pos] + palabra[pos + 1:]
+    return palabra
+
+
+def medir(funcion, argumentos):
+
+    inicio = time.perf_counter()
+    resultados = [funcion(argumento) for argumento in argumentos]
+    return time.perf_counter() - inicio, resultados
+
+
+def benchmark_sugerencias(tamanios, consultas, semilla=0):
+    """Compara el recorrido lineal de sugerencias contra el árbol BK y el motor NumPy"""
+    rng = random.Random(semilla)
+    # Sin caché: se mide el índice, no la memoización
+    tokenizador, directorio = crear_tokenizador(capacidad_cache=0)
+
+    print(f"{'léxico':>8} {'lineal/consulta':>16} {'BK/consulta':>12} {'NumPy/consulta':>15} "
+          f"{'construcción BK':>16} {'construcción NumPy':>19}")
+    try:
+        for tamanio in tamanios:
+            tokenizador.palabras = generar_lexico(tamanio, rng)
+            lexemas = list(tokenizador.palabras)
+            palabras = [alterar(rng.choice(lexemas), rng, rng.randint(1, 2)) for _ in range(consultas)]
+
+            tiempo_lineal, esperadas = medir(tokenizador.sugerir_palabras_similares_lineal, palabras)
+
+            tiempos = []
+            for indice in ('bk', 'numpy'):
+                tokenizador.indice_sugerencias = indice
+                inicio = time.perf_counter()
+                tokenizador.construir_indice()
+                construccion = time.perf_counter() - inicio
+
+                tiempo, obtenidas = medir(tokenizador.sugerir_palabras_similares, palabras)
+                if esperadas != obtenidas:
+                    raise AssertionError(f"El índice '{indice}' no coincide con el recorrido lineal (léxico de {tamanio})")
+                tiempos.append((tiempo, construccion))
+
+            (tiempo_bk, construccion_bk), (tiempo_numpy, construccion_numpy) = tiempos
+            print(f"{tamanio:>8} {tiempo_lineal / consultas * 1000:>14.2f}ms {tiempo_bk / consultas * 1000:>10.2f}ms "
+                  f"{tiempo_numpy / consultas * 1000:>13.2f}ms {construccion_bk:>15.2f}s {construccion_numpy:>18.2f}s")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def verificar_distancias(consultas=200, completo=False, semilla=0):
+    """
+    Comprueba que el motor vectorizado coincide con distancia_levenshtein y distancia_hamming
+    para cada consulta contra todo el léxico de tokenizador.db.
+    """
+    rng = random.Random(semilla)
+    tokenizador, directorio = crear_tokenizador()
+    try:
+        lexemas = list(tokenizador.palabras)
+        motor = MotorDistancias(lexemas)
+
+        if completo:
+            palabras = lexemas + [alterar(lexema, rng, 2) for lexema in lexemas]
+        else:
+            palabras = [alterar(rng.choice(lexemas), rng, rng.randint(0, 3)) for _ in range(consultas)]
+
+        inicio = time.perf_counter()
+        for palabra in palabras:
+            levenshtein = [tokenizador.distancia_levenshtein(palabra, lexema) for lexema in lexemas]
+            hamming = [tokenizador.distancia_hamming(palabra, lexema) for lexema in lexemas]
+            acotada = [min(d, 3) for d in levenshtein]
+            if (motor.levenshtein(palabra).tolist() != levenshtein
+                    or motor.levenshtein(palabra, 2).tolist() != acotada
+                    or motor.hamming(palabra).tolist() != hamming):
+                raise AssertionError(f"Las distancias vectorizadas difieren para '{palabra}'")
+        escalar = time.perf_counter() - inicio
+
+        tiempo_vectorizado, _ = medir(motor.levenshtein, palabras)
+        print(f"{len(palabras)} consultas x {len(lexemas)} lexemas: distancias idénticas")
+        print(f"escalar (Levenshtein + Hamming): {escalar:.2f}s, NumPy (Levenshtein): {tiempo_vectorizado:.2f}s")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def agregar_sin_conexion_persistente(ruta_bd, lexema, token, puntuacion):
+    """Camino de escritura original: una conexión y una transacción por palabra"""
+    conn = sqlite3.connect(ruta_bd)
+    try:
+        conn.execute('INSERT INTO palabras (lexema, token, puntuacion) VALUES (?, ?, ?)', (lexema, token, puntuacion))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def benchmark_escritura(cantidad, semilla=0):
+    """Palabras por segundo al escribir el léxico: por palabra contra en lotes"""
+    rng = random.Random(semilla)
+    tokenizador, directorio = crear_tokenizador()
+    try:
+        nuevas = [palabra for palabra in generar_lexico(len(tokenizador.palabras) + 3 * cantidad, rng)
+                  if palabra not in tokenizador.palabras]
+        tandas = [[(palabra, 'neutro', 0) for palabra in nuevas[i * cantidad:(i + 1) * cantidad]] for i in range(3)]
+
+        # La base original usa el modo de journal por defecto, sin WAL
+        ruta_original = os.path.join(directorio, 'original.db')
+        shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tokenizador.db'), ruta_original)
+        inicio = time.perf_counter()
+        for palabra in tandas[0]:
+            agregar_sin_conexion_persistente(ruta_original, *palabra)
+        original = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for palabra in tandas[1]:
+            tokenizador.agregar_palabra(*palabra)
+        persistente = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        tokenizador.agregar_palabras(tandas[2])
+        por_lotes = time.perf_counter() - inicio
+
+        print(f"{'camino':<40} {'palabras/s':>12}")
+        print(f"{'conexión por palabra (original)':<40} {cantidad / original:>12.0f}")
+        print(f"{'conexión persistente + WAL, por palabra':<40} {cantidad / persistente:>12.0f}")
+        print(f"{'agregar_palabras (lotes)':<40} {cantidad / por_lotes:>12.0f}")
+    finally:
+        tokenizador.cerrar()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def benchmark_carga(tamanio, semilla=0):
+    """Tiempo y memoria de arranque: diccionario desde SQLite contra instantánea mapeada"""
+    rng = random.Random(semilla)
+    tokenizador, directorio = crear_tokenizador()
+    try:
+        nuevas = [(palabra, 'neutro', rng.randint(-3, 3)) for palabra in generar_lexico(tamanio, rng)]
+        tokenizador.agregar_palabras(nuevas)
+        tokenizador.cerrar()
+        ruta_instantanea = os.path.join(directorio, 'lexico.bin')
+        exportar_instantanea(tokenizador.ruta_bd, ruta_instantanea)
+
+        print(f"{'carga':<14} {'palabras':>9} {'tiempo':>9} {'memoria':>10} {'búsquedas/s':>12}")
+        consultas = rng.sample(list(tokenizador.palabras), min(20000, len(tokenizador.palabras)))
+        for nombre, opciones in (('SQLite + dict', {}), ('instantánea', {'instantanea': ruta_instantanea})):
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            cargado = Tokenizador(tokenizador.ruta_bd, interactivo=False, verboso=False, **opciones)
+            tiempo = time.perf_counter() - inicio
+            memoria = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            inicio = time.perf_counter()
+            for palabra in consultas:
+                cargado.palabras[palabra]
+            busquedas = len(consultas) / (time.perf_counter() - inicio)
+
+            print(f"{nombre:<14} {len(cargado.palabras):>9} {tiempo * 1000:>7.1f}ms {memoria / 2**20:>8.1f}MB {busquedas:>12.0f}")
+            cargado.cerrar()
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def benchmark_cache(consultas, distintas, capacidad, semilla=0):
+    """Flujo de palabras desconocidas con distribución de Zipf, sin caché y con caché LRU"""
+    rng = random.Random(semilla)
+    lexemas = palabras_base()
+    vocabulario = [alterar(rng.choice(lexemas), rng, rng.randint(1, 2)) for _ in range(distintas)]
+    pesos = [1 / rango for rango in range(1, distintas + 1)]
+    palabras = rng.choices(vocabulario, weights=pesos, k=consultas)
+
+    print(f"{'índice':<7} {'caché':>7} {'tiempo':>9} {'consultas/s':>12} {'aciertos':>9} {'desalojos':>10}")
+    for indice in ('bk', 'numpy'):
+        esperadas = None
+        for capacidad_cache in (0, capacidad):
+            tokenizador, directorio = crear_tokenizador(indice_sugerencias=indice, capacidad_cache=capacidad_cache)
+            try:
+                tokenizador.construir_indice()
+                tiempo, obtenidas = medir(tokenizador.sugerir_palabras_similares, palabras)
+                if esperadas is None:
+                    esperadas = obtenidas
+                elif esperadas != obtenidas:
+                    raise AssertionError(f"La caché cambia las sugerencias del índice '{indice}'")
+
+                estadisticas = tokenizador.cache_sugerencias.estadisticas()
+                total = estadisticas['aciertos'] + estadisticas['fallos']
+                tasa = estadisticas['aciertos'] / total if total else 0
+                print(f"{indice:<7} {capacidad_cache:>7} {tiempo:>8.2f}s {consultas / tiempo:>12.0f} "
+                      f"{tasa:>8.1%} {estadisticas['desalojos']:>10}")
+                tokenizador.cerrar()
+            finally:
+                shutil.rmtree(directorio, ignore_errors=True)
+
+
+def turnos_de_muestra():
+    """Turnos (hablante, texto) de todas las conversaciones de Textos/*.txt"""
+    tokenizador = Tokenizador.__new__(Tokenizador)  # dividir_turnos no usa estado
+    directorio = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Textos')
+    turnos = []
+    for ruta in sorted(glob.glob(os.path.join(directorio, '*.txt'))):
+        with open(ruta, 'r', encoding='utf-8') as f:
+            turnos.extend(tokenizador.dividir_turnos(f.read()))
+    return turnos
+
+
+def generar_conversacion(muestras, cantidad_turnos, rng, ruido=0.05):
+    """
+    Conversación sintética alternando Agente y Cliente con turnos tomados de las muestras. Una
+    fracción `ruido` de las palabras se altera para simular errores del reconocedor de voz.
+    """
+    por_hablante = {'Agente': [], 'Cliente': []}
+    for hablante, texto in muestras:
+        por_hablante[hablante].append(texto)
+
+    lineas = []
+    for i in range(cantidad_turnos):
+        hablante = 'Agente' if i % 2 == 0 else 'Cliente'
+        palabras = rng.choice(por_hablante[hablante]).split()
+        palabras = [alterar(palabra, rng) if len(palabra) > 3 and rng.random() < ruido else palabra
+                    for palabra in palabras]
+        lineas.append(f"{hablante}: {' '.join(palabras)}")
+    return '\n'.join(lineas)
+
+
+def medir_etapa(funcion, argumentos, preparar=None):
+    """Tiempo de una pasada y pico de memoria de otra pasada igual bajo tracemalloc"""
+    if preparar:
+        preparar()
+    tiempo, resultados = medir(funcion, argumentos)
+
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    medir(funcion, argumentos)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return tiempo, pico, resultados
+
+
+def version_codigo():
+
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark_pipeline(lexicos, cantidades_turnos, indice='bk', ruido=0.05, semilla=0, salida=None, comparar=None):
+    """
+    Throughput y memoria de cada etapa del análisis sin interacción, para cada combinación de
+    tamaño de léxico y largo de conversación. La caché de sugerencias se vacía antes de cada
+    etapa para medir el costo real de las búsquedas.
+    """
+    rng = random.Random(semilla)
+    muestras = turnos_de_muestra()
+    resultados = []
+
+    print(f"{'etapa':<22} {'léxico':>8} {'turnos':>7} {'tiempo':>9} {'turnos/s':>10} {'palabras/s':>11} {'pico':>9}")
+    for tamanio in lexicos:
+        tokenizador, directorio = crear_tokenizador(umbral_autocorreccion=1, indice_sugerencias=indice)
+        try:
+            # Léxico escalado: las palabras reales de la base con su puntuación más pseudopalabras neutras
+            lexico = generar_lexico(tamanio, rng)
+            lexico.update((palabra, valor) for palabra, valor in tokenizador.palabras.items() if palabra in lexico)
+            tokenizador.palabras = lexico
+            tokenizador.construir_indice()
+
+            for cantidad_turnos in cantidades_turnos:
+                conversacion = generar_conversacion(muestras, cantidad_turnos, rng, ruido)
+                turnos = list(tokenizador.dividir_turnos(conversacion))
+                total_palabras = sum(len(re.findall(r'\b\w+\b', texto)) for _, texto in turnos)
+                vaciar = tokenizador.cache_sugerencias.invalidar
+
+                tiempo_tokenizar, pico_tokenizar, tokenizados = medir_etapa(
+                    lambda turno: tokenizador.tokenizar(turno[1])[0], turnos, vaciar)
+                tokens = [token for tokens_turno in tokenizados for token in tokens_turno]
+                tokens_agente = [token for (hablante, _), tokens_turno in zip(turnos, tokenizados)
+                                 if hablante == 'Agente' for token in tokens_turno]
+                desconocidas = [palabra for _, texto in turnos for palabra in re.findall(r'\b\w+\b', texto.lower())
+                                if palabra not in tokenizador.palabras]
+
+                etapas = [
+                    ('tokenizar', tiempo_tokenizar, pico_tokenizar, len(turnos), total_palabras),
+                    ('sugerir_palabras', *medir_etapa(tokenizador.sugerir_palabras_similares, desconocidas, vaciar)[:2],
+                     None, len(desconocidas)),
+                    ('analizar_sentimiento', *medir_etapa(tokenizador.analizar_sentimiento, tokenizados)[:2],
+                     len(turnos), len(tokens)),
+                    ('verificar_protocolo', *medir_etapa(tokenizador.verificar_protocolo, [tokens_agente])[:2],
+                     None, len(tokens_agente)),
+                    ('procesar_conversacion', *medir_etapa(tokenizador.procesar_conversacion, [conversacion], vaciar)[:2],
+                     len(turnos), total_palabras),
+                ]
+                for etapa, tiempo, pico, cantidad, palabras in etapas:
+                    tiempo = max(tiempo, 1e-9)
+                    resultado = {
+                        'etapa': etapa, 'lexico': tamanio, 'turnos': cantidad_turnos, 'palabras': palabras,
+                        'segundos': tiempo,
+                        'turnos_por_segundo': cantidad / tiempo if cantidad is not None else None,
+                        'palabras_por_segundo': palabras / tiempo,
+                        'memoria_pico_bytes': pico
+                    }
+                    resultados.append(resultado)
+                    turnos_s = f"{resultado['turnos_por_segundo']:>10.0f}" if cantidad is not None else f"{'-':>10}"
+                    print(f"{etapa:<22} {tamanio:>8} {cantidad_turnos:>7} {tiempo:>8.3f}s {turnos_s} "
+                          f"{resultado['palabras_por_segundo']:>11.0f} {pico / 2**20:>7.1f}MB")
+
+                # Las desconocidas encoladas no deben acumularse entre tamaños
+                tokenizador.pendientes_sesion.clear()
+        finally:
+            tokenizador.cerrar()
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    informe = {
+        'version': version_codigo(),
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'parametros': {'lexicos': lexicos, 'turnos': cantidades_turnos, 'indice': indice, 'ruido': ruido,
+                       'semilla': semilla},
+        'resultados': resultados
+    }
+    if salida:
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {salida}")
+    if comparar:
+        comparar_resultados(comparar, informe)
+    return informe
+
+
+def comparar_resultados(ruta_anterior, informe):
+    """Imprime la variación de palabras/s y memoria contra una corrida guardada"""
+    with open(ruta_anterior, 'r', encoding='utf-8') as f:
+        anterior = json.load(f)
+    previos = {(r['etapa'], r['lexico'], r['turnos']): r for r in anterior['resultados']}
+
+    print(f"\nComparación contra {anterior.get('version') or ruta_anterior}:")
+    print(f"{'etapa':<22} {'léxico':>8} {'turnos':>7} {'palabras/s':>11} {'pico':>8}")
+    for resultado in informe['resultados']:
+        previo = previos.get((resultado['etapa'], resultado['lexico'], resultado['turnos']))
+        if previo is None:
+            continue
+        velocidad = resultado['palabras_por_segundo'] / previo['palabras_por_segundo'] - 1
+        memoria = resultado['memoria_pico_bytes'] / max(previo['memoria_pico_bytes'], 1) - 1
+        print(f"{resultado['etapa']:<22} {resultado['lexico']:>8} {resultado['turnos']:>7} "
+              f"{velocidad:>+10.1%} {memoria:>+7.1%}")
+
+
+def benchmark_columnar(cantidad, cantidad_turnos, semilla=0):
+    """Sentimiento de un lote por conversación y hablante: tuplas y bucles contra LoteColumnar"""
+    rng = random.Random(semilla)
+    muestras = turnos_de_muestra()
+    tokenizador, directorio = crear_tokenizador()
+    try:
+        resultados = [tokenizador.procesar_conversacion(generar_conversacion(muestras, cantidad_turnos, rng, 0))
+                      for _ in range(cantidad)]
+        tokens = sum(len(r['columnas']) for r in resultados)
+        listas = [(r['columnas'].tuplas(), r['columnas'].tuplas(r['columnas'].agente),
+                   r['columnas'].tuplas(~r['columnas'].agente)) for r in resultados]
+
+        inicio = time.perf_counter()
+        por_tuplas = []
+        for totales, agente, cliente in listas:
+            por_tuplas.append((tokenizador.analizar_sentimiento(totales),
+                               tokenizador.analizar_sentimiento(agente),
+                               tokenizador.analizar_sentimiento(cliente)))
+        tiempo_tuplas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        lote = LoteColumnar(r['columnas'] for r in resultados)
+        sentimiento = lote.sentimiento()
+        por_hablante = lote.puntuacion_por_hablante()
+        tiempo_columnar = time.perf_counter() - inicio
+
+        for i, (general, agente, cliente) in enumerate(por_tuplas):
+            if (general['puntuacion_total'] != sentimiento['puntuacion_total'][i]
+                    or agente['puntuacion_total'] != por_hablante['Agente'][i]
+                    or cliente['puntuacion_total'] != por_hablante['Cliente'][i]):
+                raise AssertionError(f"El agregado columnar difiere en la conversación {i}")
+
+        tuplas = sum(len(pickle.dumps(totales)) for totales, _, _ in listas)
+        columnas = sum(len(pickle.dumps(r['columnas'])) for r in resultados)
+        print(f"{cantidad} conversaciones, {tokens} tokens: agregados idénticos")
+        print(f"{'representación':<16} {'tiempo':>9} {'tokens/s':>12} {'serializado':>12}")
+        print(f"{'tuplas':<16} {tiempo_tuplas:>8.3f}s {tokens / tiempo_tuplas:>12.0f} {tuplas / 2**20:>10.2f}MB")
+        print(f"{'columnar':<16} {tiempo_columnar:>8.3f}s {tokens / tiempo_columnar:>12.0f} {columnas / 2**20:>10.2f}MB")
+    finally:
+        tokenizador.cerrar()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def benchmark_resultados(cantidad, tamanio_lote=500, semilla=0):
+    """
+    Escritura por lotes de `cantidad` conversaciones en un AlmacenResultados (resultados reales
+    de unas pocas conversaciones repetidos con fechas distintas) y latencia de las consultas
+    de cumplimiento sobre la base llena.
+    """
+    rng = random.Random(semilla)
+    muestras = turnos_de_muestra()
+    tokenizador, directorio = crear_tokenizador(umbral_autocorreccion=1)
+    try:
+        modelos = [tokenizador.procesar_conversacion(generar_conversacion(muestras, rng.randint(10, 40), rng, 0.05))
+                   for _ in range(50)]
+        almacen = AlmacenResultados(os.path.join(directorio, 'resultados.db'), tamanio_lote)
+        inicio_periodo = datetime(2026, 1, 1).timestamp()
+
+        inicio = time.perf_counter()
+        for i in range(cantidad):
+            almacen.guardar(rng.choice(modelos), f'conversacion_{i}.txt',
+                            fecha=inicio_periodo + rng.uniform(0, 300 * 86400))
+        almacen.vaciar()
+        tiempo_escritura = time.perf_counter() - inicio
+        print(f"Escritura: {cantidad} conversaciones en {tiempo_escritura:.2f}s "
+              f"({cantidad / tiempo_escritura:.0f}/s, lotes de {tamanio_lote}), "
+              f"{os.path.getsize(almacen.ruta_bd) / 2**20:.1f}MB")
+
+        semana = {'desde': '2026-10-11', 'hasta': '2026-10-18'}
+        consultas = [
+            ('prohibidas en una semana', {'categoria': 'prohibida', **semana}),
+            ('sin saludo en una semana', {'fase': 'Fase de saludo', 'cumple': False, **semana}),
+            ('negativas en una semana', {'sentimiento': 'Negativo', **semana}),
+            ('rudas del agente (total)', {'fase': 'Uso de palabras rudas', 'cumple': False}),
+            ('negativas (total)', {'sentimiento': 'Negativo'}),
+        ]
+        print(f"{'consulta':<28} {'resultado':>10} {'contar':>10} {'buscar 100':>11}")
+        for nombre, filtros in consultas:
+            tiempo_contar, (total,) = medir(lambda _: almacen.contar(**filtros), [None])
+            tiempo_buscar, _ = medir(lambda _: almacen.buscar(limite=100, **filtros), [None])
+            print(f"{nombre:<28} {total:>10} {tiempo_contar * 1000:>8.2f}ms {tiempo_buscar * 1000:>9.2f}ms")
+        almacen.cerrar()
+    finally:
+        tokenizador.cerrar()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def benchmark_reanalisis(cantidad, cantidad_turnos, semilla=0):
+    """
+    Tres corridas sobre las mismas conversaciones con caché de resultados: en frío, sin cambios
+    y después de agregar un lexema que aparece solo en algunas. Verifica que la última coincide
+    con un análisis sin caché.
+    """
+    rng = random.Random(semilla)
+    muestras = turnos_de_muestra()
+    conversaciones = [generar_conversacion(muestras, cantidad_turnos, rng, 0.05) for _ in range(cantidad)]
+    tokenizador, directorio = crear_tokenizador(umbral_autocorreccion=1)
+    cache = tokenizador.cache_resultados = CacheResultados(os.path.join(directorio, 'cache_resultados.db'))
+    try:
+        print(f"{'corrida':<20} {'tiempo':>9} {'conv/s':>9} {'recalculadas':>13}")
+
+        def corrida(nombre):
+            fallos = cache.fallos
+            tiempo, resultados = medir(tokenizador.procesar_conversacion, conversaciones)
+            print(f"{nombre:<20} {tiempo:>8.3f}s {cantidad / tiempo:>9.0f} {cache.fallos - fallos:>13}")
+            return resultados
+
+        corrida('en frío')
+        corrida('sin cambios')
+
+        # Una palabra desconocida que aparece en pocas conversaciones pasa a ser lexema
+        desconocidas = Counter(palabra for conversacion in conversaciones
+                               for palabra in set(re.findall(r'\b\w+\b', conversacion.lower()))
+                               if tokenizador.clave_lexico(palabra) is None)
+        palabra = min(desconocidas, key=lambda p: (abs(desconocidas[p] - cantidad // 20), p))
+        tokenizador.agregar_palabra(palabra, 'negativo', -1)
+        resultados = corrida(f"con '{palabra}'")
+
+        referencia, directorio_referencia = crear_tokenizador(umbral_autocorreccion=1)
+        try:
+            referencia.agregar_palabra(palabra, 'negativo', -1)
+            esperados = [referencia.procesar_conversacion(conversacion) for conversacion in conversaciones]
+        finally:
+            referencia.cerrar()
+            shutil.rmtree(directorio_referencia, ignore_errors=True)
+        for i, (obtenido, esperado) in enumerate(zip(resultados, esperados)):
+            if crear_registro(obtenido) != crear_registro(esperado):
+                raise AssertionError(f"La conversación {i} desde la caché difiere del análisis sin caché")
+        print(f"Resultados idénticos al análisis sin caché; {cache.estadisticas()}")
+    finally:
+        tokenizador.cerrar()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def benchmark_servidor(cantidad, clientes, cantidad_turnos, semilla=0):
+    """
+    Costo por invocación sin servidor (arrancar un proceso, crear el Tokenizador y analizar)
+    contra el servidor local: ida y vuelta del protocolo, sobrecosto por conversación respecto
+    de llamar al motor en el mismo proceso, y throughput con varios clientes encadenando pedidos.
+    """
+    rng = random.Random(semilla)
+    muestras = turnos_de_muestra()
+    conversaciones = [generar_conversacion(muestras, cantidad_turnos, rng, 0) for _ in range(cantidad)]
+    corta = 'Agente: Hola, buenos días. Cliente: Hola, gracias.'
+    tokenizador, directorio = crear_tokenizador()
+    ruta_socket = os.path.join(directorio, 'tokenizador.sock')
+    proceso = subprocess.Popen([sys.executable, 'tokenizador.py', 'servir', '--socket', ruta_socket,
+                                '--bd', tokenizador.ruta_bd], cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stderr=subprocess.PIPE, text=True)
+    try:
+        proceso.stderr.readline()  # "Escuchando en ...": el léxico ya está cargado
+
+        codigo = (f"from motor import Tokenizador; "
+                  f"Tokenizador({tokenizador.ruta_bd!r}, interactivo=False, verboso=False).procesar_conversacion({corta!r})")
+        arranques = []
+        for _ in range(5):
+            inicio = time.perf_counter()
+            subprocess.run([sys.executable, '-c', codigo], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+            arranques.append(time.perf_counter() - inicio)
+        print(f"Sin servidor (proceso nuevo por conversación): {min(arranques) * 1000:.1f}ms")
+
+        with ClienteAnalisis(ruta_socket) as cliente:
+            for _ in range(200):
+                cliente.salud()
+            idas = []
+            for _ in range(2000):
+                inicio = time.perf_counter()
+                cliente.salud()
+                idas.append(time.perf_counter() - inicio)
+            print(f"Ida y vuelta del protocolo (salud): p50 {percentiles(idas)['p50']:.3f}ms, "
+                  f"p99 {percentiles(idas)['p99']:.3f}ms")
+
+            # Misma conversación corta en el mismo proceso y por el servidor
+            directas, remotas = [], []
+            for _ in range(500):
+                inicio = time.perf_counter()
+                tokenizador.procesar_conversacion(corta)
+                directas.append(time.perf_counter() - inicio)
+                inicio = time.perf_counter()
+                cliente.analizar(corta)
+                remotas.append(time.perf_counter() - inicio)
+            directa, remota = percentiles(directas)['p50'], percentiles(remotas)['p50']
+            print(f"Conversación corta: en proceso {directa:.3f}ms, por el servidor {remota:.3f}ms "
+                  f"(sobrecosto {remota - directa:.3f}ms)")
+
+        partes = [conversaciones[i::clientes] for i in range(clientes)]
+
+        def cliente_encadenado(parte):
+            with ClienteAnalisis(ruta_socket) as cliente:
+                cliente.analizar_varios(parte)
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(clientes) as ejecutor:
+            list(ejecutor.map(cliente_encadenado, partes))
+        tiempo = time.perf_counter() - inicio
+        with ClienteAnalisis(ruta_socket) as cliente:
+            estadisticas = cliente.estadisticas()
+        latencia = estadisticas['latencia_ms']
+        print(f"{clientes} clientes, {cantidad} conversaciones de {cantidad_turnos} turnos: {tiempo:.2f}s "
+              f"({cantidad / tiempo:.0f} conv/s), lote promedio {estadisticas['lote_promedio']:.1f}, "
+              f"latencia p50 {latencia['p50']:.1f}ms p99 {latencia['p99']:.1f}ms")
+    finally:
+        proceso.terminate()
+        proceso.wait()
+        tokenizador.cerrar()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+# Módulos que el núcleo sin interfaz no debe cargar al importarse
+IMPORTACIONES_PESADAS = ('tkinter', 'numpy')
+
+
+def tiempos_importacion(modulo):
+    """
+    Importa el módulo en un intérprete nuevo con -X importtime y devuelve su tiempo acumulado en
+    microsegundos, el de cada una de sus importaciones directas (las que no estaban cargadas) y
+    cuáles de IMPORTACIONES_PESADAS quedaron cargados.
+    """
+    codigo = (f"import sys, {modulo}; "
+              f"print(','.join(m for m in {IMPORTACIONES_PESADAS!r} if m in sys.modules))")
+    proceso = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+
+    # Formato de cada línea: "import time:  self [us] | cumulative | imported package", con dos
+    # espacios de sangría por nivel; cada módulo aparece después de todo lo que importó
+    lineas = []
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        _, acumulado, nombre = linea[len('import time:'):].split('|')
+        nivel = (len(nombre) - len(nombre.lstrip()) - 1) // 2
+        lineas.append((nivel, nombre.strip(), int(acumulado)))
+
+    total = 0
+    dependencias = {}
+    for i, (nivel, nombre, acumulado) in enumerate(lineas):
+        if nivel == 0 and nombre == modulo:
+            total = acumulado
+            for nivel_previo, previo, acumulado_previo in reversed(lineas[:i]):
+                if nivel_previo == 0:
+                    break
+                if nivel_previo == 1:
+                    dependencias[previo] = acumulado_previo
+    cargadas = [m for m in proceso.stdout.strip().split(',') if m]
+    return total, dependencias, cargadas
+
+
+def benchmark_importacion(modulos, repeticiones=5, limite_ms=None, salida=None):
+    """
+    Tiempo de arranque de cada módulo (el mejor de varios intérpretes nuevos) y sus
+    dependencias más caras. Falla si alguno carga tkinter o NumPy al importarse o si supera
+    `limite_ms`, para poder correrlo como verificación.
+    """
+    resultados = []
+    fallas = []
+
+    print(f"{'módulo':<14} {'mejor':>9} {'mediana':>9}  dependencias más caras")
+    for modulo in modulos:
+        corridas = sorted((tiempos_importacion(modulo) for _ in range(repeticiones)), key=lambda corrida: corrida[0])
+        totales = [total for total, _, _ in corridas]
+        _, dependencias, cargadas = corridas[0]
+        dependencias = sorted(((t, nombre) for nombre, t in dependencias.items()), reverse=True)[:3]
+        resultado = {
+            'modulo': modulo,
+            'mejor_ms': totales[0] / 1000,
+            'mediana_ms': totales[len(totales) // 2] / 1000,
+            'pesadas_cargadas': cargadas,
+            'dependencias': {nombre: t / 1000 for t, nombre in dependencias}
+        }
+        resultados.append(resultado)
+        detalle = ', '.join(f"{nombre} {t / 1000:.1f}ms" for t, nombre in dependencias)
+        print(f"{modulo:<14} {resultado['mejor_ms']:>7.1f}ms {resultado['mediana_ms']:>7.1f}ms  {detalle}")
+
+        if cargadas:
+            fallas.append(f"{modulo} carga {', '.join(cargadas)} al importarse")
+        if limite_ms is not None and resultado['mejor_ms'] > limite_ms:
+            fallas.append(f"{modulo} tarda {resultado['mejor_ms']:.1f}ms en importarse (límite {limite_ms}ms)")
+
+    if salida:
+        informe = {
+            'version': version_codigo(),
+            'fecha': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'resultados': resultados
+        }
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"Resultados guardados en {salida}")
+    if fallas:
+        raise AssertionError('; '.join(fallas))
+    return resultados
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Benchmarks del tokenizador")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    sugerencias = subparsers.add_parser('sugerencias', help="Recorrido lineal contra árbol BK y motor NumPy")
+    sugerencias.add_argument('--tamanios', type=int, nargs='+', default=[1000, 10000, 100000])
+    sugerencias.add_argument('--consultas', type=int, default=20)
+    sugerencias.add_argument('--semilla', type=int, default=0)
+
+    distancias = subparsers.add_parser('distancias', help="Verifica el motor NumPy contra las funciones escalares")
+    distancias.add_argument('--consultas', type=int, default=200)
+    distancias.add_argument('--completo', action='store_true', help="Usa cada lexema de la base como consulta")
+    distancias.add_argument('--semilla', type=int, default=0)
+
+    escritura = subparsers.add_parser('escritura', help="Escritura de palabras por palabra contra en lotes")
+    escritura.add_argument('--palabras', type=int, default=2000)
+    escritura.add_argument('--semilla', type=int, default=0)
+
+    carga = subparsers.add_parser('carga', help="Arranque desde SQLite contra instantánea binaria")
+    carga.add_argument('--tamanio', type=int, default=100000)
+    carga.add_argument('--semilla', type=int, default=0)
+
+    cache = subparsers.add_parser('cache', help="Sugerencias repetidas sin caché contra caché LRU")
+    cache.add_argument('--consultas', type=int, default=20000)
+    cache.add_argument('--distintas', type=int, default=2000)
+    cache.add_argument('--capacidad', type=int, default=10000)
+    cache.add_argument('--semilla', type=int, default=0)
+
+    pipeline = subparsers.add_parser('pipeline', help="Throughput y memoria de cada etapa del análisis")
+    pipeline.add_argument('--lexicos', type=int, nargs='+', default=[1000, 10000])
+    pipeline.add_argument('--turnos', type=int, nargs='+', default=[100, 500])
+    pipeline.add_argument('--indice', choices=['bk', 'numpy'], default='bk')
+    pipeline.add_argument('--ruido', type=float, default=0.05, help="Fracción de palabras alteradas")
+    pipeline.add_argument('--semilla', type=int, default=0)
+    pipeline.add_argument('--salida', default=None, help="Archivo JSON donde guardar los resultados")
+    pipeline.add_argument('--comparar', default=None, help="JSON de una corrida anterior para comparar")
+
+    columnar = subparsers.add_parser('columnar', help="Agregado de sentimiento con tuplas contra arreglos NumPy")
+    columnar.add_argument('--conversaciones', type=int, default=500)
+    columnar.add_argument('--turnos', type=int, default=40)
+    columnar.add_argument('--semilla', type=int, default=0)
+
+    resultados = subparsers.add_parser('resultados', help="Escritura por lotes y consultas de la base de resultados")
+    resultados.add_argument('--conversaciones', type=int, default=100000)
+    resultados.add_argument('--lote', type=int, default=500)
+    resultados.add_argument('--semilla', type=int, default=0)
+
+    reanalisis = subparsers.add_parser('reanalisis', help="Reanálisis con la caché de resultados tras editar el léxico")
+    reanalisis.add_argument('--conversaciones', type=int, default=300)
+    reanalisis.add_argument('--turnos', type=int, default=30)
+    reanalisis.add_argument('--semilla', type=int, default=0)
+
+    servidor = subparsers.add_parser('servidor', help="Servidor local contra un proceso nuevo por conversación")
+    servidor.add_argument('--conversaciones', type=int, default=200)
+    servidor.add_argument('--clientes', type=int, default=4)
+    servidor.add_argument('--turnos', type=int, default=20)
+    servidor.add_argument('--semilla', type=int, default=0)
+
+    importacion = subparsers.add_parser('importacion', help="Tiempo de arranque del núcleo sin tkinter ni NumPy")
+    importacion.add_argument('--modulos', nargs='+', default=['motor', 'lote', 'cli', 'en_vivo'])
+    importacion.add_argument('--repeticiones', type=int, default=5)
+    importacion.add_argument('--limite-ms', type=float, default=None, help="Falla si un módulo tarda más en importarse")
+    importacion.add_argument('--salida', default=None, help="Archivo JSON donde guardar los resultados")
+
+    args = parser.parse_args()
+
+    if args.comando == 'sugerencias':
+        benchmark_sugerencias(args.tamanios, args.consultas, args.semilla)
+    elif args.comando == 'distancias':
+        verificar_distancias(args.consultas, args.completo, args.semilla)
+    elif args.comando == 'escritura':
+        benchmark_escritura(args.palabras, args.semilla)
+    elif args.comando == 'carga':
+        benchmark_carga(args.tamanio, args.semilla)
+    elif args.comando == 'cache':
+        benchmark_cache(args.consultas, args.distintas, args.capacidad, args.semilla)
+    elif args.comando == 'columnar':
+        benchmark_columnar(args.conversaciones, args.turnos, args.semilla)
+    elif args.comando == 'resultados':
+        benchmark_resultados(args.conversaciones, args.lote, args.semilla)
+    elif args.comando == 'reanalisis':
+        benchmark_reanalisis(args.conversaciones, args.turnos, args.semilla)
+    elif args.comando == 'servidor':
+        benchmark_servidor(args.conversaciones, args.clientes, args.turnos, args.semilla)
+    elif args.comando == 'importacion':
+        benchmark_importacion(args.modulos, args.repeticiones, args.limite_ms, args.salida)
+    elif args.comando == 'pipeline':
+        benchmark_pipeline(args.lexicos, args.turnos, args.indice, args.ruido, args.semilla, args.salida, args.comparar)
+
+
+if __name__ == "__main__":
+    main()
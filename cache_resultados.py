@@ -0,0 +1,262 @@
+"""
+Caché en disco de los resultados de procesar_conversacion, para no reanalizar las
+transcripciones que no cambiaron cuando se vuelve a correr un archivo completo.
+
+La clave de cada entrada es el hash de la transcripción normalizada junto con la huella de la
+configuración del Tokenizador (versión de categorias_protocolo, umbral de autocorrección,
+plegado de acentos y ventana de sentimiento). La versión del léxico no forma parte de la
+clave: la caché recuerda hasta qué versión está sincronizada y, cuando el Tokenizador trae
+cambios, descarta solo las entradas afectadas usando un índice invertido palabra -> entrada:
+
+    - las que contienen una palabra de algún lexema o alias agregado, cambiado o borrado, o
+      una palabra que se había corregido hacia un lexema que cambió
+    - con autocorrección, las que tienen una palabra desconocida a distancia de un lexema
+      nuevo menor o igual al umbral (su corrección podría ser otra)
+
+Las palabras se indexan sin tildes de ambos lados, así el plegado de acentos no deja pasar
+ningún cambio. Cada entrada guarda también los efectos del análisis (palabras encoladas para
+revisión, aciertos de correcciones y turnos), que el Tokenizador repite en cada acierto para
+que la cola de revisión y los contadores no dependan de si el resultado salió de la caché.
+El tamaño total se acota en bytes y se desalojan las entradas usadas hace más
+tiempo. Varias corridas (o los trabajadores de lote.py) pueden compartir el mismo archivo.
+"""
+import hashlib
+import json
+import pickle
+import time
+import unicodedata
+import zlib
+
+from conexion_sqlite import conectar
+from indice_difuso import ArbolBK
+from lexemas_compuestos import es_compuesto
+from motor import PLEGADO_ACENTOS
+
+ESQUEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS entradas (
+        id INTEGER PRIMARY KEY,
+        clave TEXT UNIQUE NOT NULL,
+        huella TEXT NOT NULL,
+        tamanio INTEGER NOT NULL,
+        usado_en REAL NOT NULL,
+        resultados BLOB NOT NULL
+    )
+    ''',
+    # Cubre el orden de desalojo y la suma de tamaños sin leer los resultados
+    'CREATE INDEX IF NOT EXISTS idx_entradas_usado ON entradas (usado_en, tamanio)',
+    '''
+    CREATE TABLE IF NOT EXISTS indice_palabras (
+        palabra TEXT NOT NULL,
+        entrada INTEGER NOT NULL REFERENCES entradas (id) ON DELETE CASCADE,
+        desconocida INTEGER NOT NULL,
+        PRIMARY KEY (palabra, entrada)
+    ) WITHOUT ROWID
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_indice_palabras_entrada ON indice_palabras (entrada)',
+    'CREATE INDEX IF NOT EXISTS idx_indice_palabras_desconocida ON indice_palabras (desconocida, palabra)',
+    'CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER)',
+)
+
+# Forma de lo guardado en cada entrada; al cambiarla, las entradas viejas dejan de coincidir
+FORMATO = 2
+
+
+def normalizar_transcripcion(texto):
+    """Saltos de línea unificados y Unicode en forma NFC (tildes como un solo carácter)"""
+    return unicodedata.normalize('NFC', texto.replace('\r\n', '\n').replace('\r', '\n'))
+
+
+def plegar(palabra):
+    return palabra.lower().translate(PLEGADO_ACENTOS)
+
+
+def en_partes(valores, tamanio=500):
+    """El límite de parámetros de SQLite obliga a partir las listas largas de IN (...)"""
+    valores = list(valores)
+    for i in range(0, len(valores), tamanio):
+        yield valores[i:i + tamanio]
+
+
+class CacheResultados:
+
+    def __init__(self, ruta='cache_resultados.db', capacidad_bytes=256 * 2**20):
+        self.ruta = ruta
+        self.capacidad_bytes = capacidad_bytes
+        self.conn = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.invalidaciones = 0
+        self.desalojos = 0
+        with self.conexion() as conn:
+            for sentencia in ESQUEMA:
+                conn.execute(sentencia)
+
+    def conexion(self):
+
+        if self.conn is None:
+            # Las claves foráneas borran el índice de palabras junto con cada entrada
+            self.conn = conectar(self.ruta, claves_foraneas=True)
+        return self.conn
+
+    def cerrar(self):
+
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def leer_meta(self, clave):
+        fila = self.conexion().execute('SELECT valor FROM meta WHERE clave = ?', (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def huella(self, tokenizador):
+
+        return json.dumps({'protocolo': tokenizador.version_protocolo,
+                           'umbral': tokenizador.umbral_autocorreccion,
+                           'plegar_acentos': tokenizador.plegar_acentos,
+                           'ventana': tokenizador.ventana_sentimiento,
+                           'formato': FORMATO}, sort_keys=True)
+
+    def clave(self, huella, texto):
+        return hashlib.sha256(huella.encode('utf-8') + b'\0' + texto.encode('utf-8')).hexdigest()
+
+    def sincronizar(self, tokenizador):
+        """
+        Lleva la caché a la versión del léxico que tiene cargada el Tokenizador, descartando
+        las entradas que los cambios intermedios pueden haber alterado. Devuelve False si el
+        Tokenizador está atrasado respecto de la caché (sus resultados no se pueden usar ni
+        guardar hasta que refresque el léxico).
+        """
+        objetivo = tokenizador.version_lexico
+        version = self.leer_meta('version_lexico')
+        if version == objetivo:
+            return True
+        if version is not None and version > objetivo:
+            return False
+
+        conn = self.conexion()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            # Otro proceso pudo haberla sincronizado mientras se esperaba el bloqueo
+            version = self.leer_meta('version_lexico')
+            if version is None:
+                conn.execute("INSERT INTO meta (clave, valor) VALUES ('version_lexico', ?)", (objetivo,))
+                return True
+            if version >= objetivo:
+                return version == objetivo
+
+            lexico = tokenizador.conexion()
+            actualizados = [lexema for lexema, in lexico.execute(
+                'SELECT lexema FROM palabras WHERE version > ?', (version,))]
+            borrados = [lexema for lexema, in lexico.execute(
+                'SELECT lexema FROM palabras_borradas WHERE version > ?', (version,))]
+            alias = [alias for alias, in lexico.execute(
+                'SELECT alias FROM correcciones WHERE version > ?', (version,))]
+
+            palabras = {plegar(palabra) for lexema in actualizados + borrados + alias for palabra in lexema.split()}
+            afectadas = set()
+            for parte in en_partes(palabras):
+                afectadas.update(entrada for entrada, in conn.execute(
+                    f"SELECT entrada FROM indice_palabras WHERE palabra IN ({','.join('?' * len(parte))})", parte))
+
+            # Un lexema nuevo cerca de una palabra desconocida puede cambiar su autocorrección
+            umbral = tokenizador.umbral_autocorreccion
+            nuevos = {plegar(lexema) for lexema in actualizados if not es_compuesto(lexema)}
+            if umbral is not None and nuevos:
+                arbol = ArbolBK(tokenizador.distancia_levenshtein)
+                for lexema in nuevos:
+                    arbol.agregar(lexema)
+                cercanas = [palabra for palabra, in conn.execute(
+                    'SELECT DISTINCT palabra FROM indice_palabras WHERE desconocida = 1')
+                    if arbol.buscar(palabra, umbral)]
+                for parte in en_partes(cercanas):
+                    afectadas.update(entrada for entrada, in conn.execute(
+                        f"SELECT entrada FROM indice_palabras WHERE desconocida = 1 "
+                        f"AND palabra IN ({','.join('?' * len(parte))})", parte))
+
+            for parte in en_partes(afectadas):
+                conn.execute(f"DELETE FROM entradas WHERE id IN ({','.join('?' * len(parte))})", parte)
+            self.invalidaciones += len(afectadas)
+            conn.execute("UPDATE meta SET valor = ? WHERE clave = 'version_lexico'", (objetivo,))
+        return True
+
+    def obtener(self, tokenizador, texto):
+        """(resultados, efectos) guardados para la transcripción (ya normalizada), o None"""
+        if not self.sincronizar(tokenizador):
+            return None
+
+        conn = self.conexion()
+        fila = conn.execute('SELECT id, resultados FROM entradas WHERE clave = ?',
+                            (self.clave(self.huella(tokenizador), texto),)).fetchone()
+        if fila is None:
+            self.fallos += 1
+            return None
+
+        with conn:
+            conn.execute('UPDATE entradas SET usado_en = ? WHERE id = ?', (time.time(), fila[0]))
+        self.aciertos += 1
+        return pickle.loads(zlib.decompress(fila[1]))
+
+    def guardar(self, tokenizador, texto, resultados, efectos):
+
+        if not self.sincronizar(tokenizador):
+            return
+
+        # Palabra (sin tildes) -> si no estaba en el léxico; también los lexemas hacia los que
+        # se corrigió, que no aparecen en el texto pero de los que depende el resultado
+        palabras = {}
+        for _, _, palabra in tokenizador.segmentar(texto):
+            clave = plegar(palabra)
+            desconocida = int(tokenizador.clave_lexico(palabra) is None)
+            palabras[clave] = max(palabras.get(clave, 0), desconocida)
+        for correccion in resultados.get('correcciones_totales', []):
+            for palabra in correccion['palabra_corregida'].split():
+                palabras.setdefault(plegar(palabra), 0)
+
+        huella = self.huella(tokenizador)
+        datos = zlib.compress(pickle.dumps((resultados, efectos), pickle.HIGHEST_PROTOCOL), 1)
+        conn = self.conexion()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            # Si otro proceso avanzó la versión mientras se analizaba, el resultado ya es viejo
+            if self.leer_meta('version_lexico') != tokenizador.version_lexico:
+                return
+            clave = self.clave(huella, texto)
+            conn.execute('DELETE FROM entradas WHERE clave = ?', (clave,))
+            cursor = conn.execute('INSERT INTO entradas (clave, huella, resultados, tamanio, usado_en) '
+                                  'VALUES (?, ?, ?, ?, ?)', (clave, huella, datos, len(datos), time.time()))
+            conn.executemany('INSERT INTO indice_palabras (palabra, entrada, desconocida) VALUES (?, ?, ?)',
+                             ((palabra, cursor.lastrowid, desconocida) for palabra, desconocida in palabras.items()))
+            self.desalojar(conn)
+
+    def desalojar(self, conn):
+
+        total = conn.execute('SELECT COALESCE(SUM(tamanio), 0) FROM entradas').fetchone()[0]
+        if total <= self.capacidad_bytes:
+            return
+
+        # Se libera hasta el 90% de la capacidad para no desalojar en cada alta siguiente
+        desalojadas = []
+        for entrada, tamanio in conn.execute('SELECT id, tamanio FROM entradas ORDER BY usado_en'):
+            if total <= 0.9 * self.capacidad_bytes:
+                break
+            desalojadas.append(entrada)
+            total -= tamanio
+        for parte in en_partes(desalojadas):
+            conn.execute(f"DELETE FROM entradas WHERE id IN ({','.join('?' * len(parte))})", parte)
+        self.desalojos += len(desalojadas)
+
+    def estadisticas(self):
+
+        conn = self.conexion()
+        cantidad, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(tamanio), 0) FROM entradas').fetchone()
+        return {
+            'entradas': cantidad,
+            'bytes': total,
+            'capacidad_bytes': self.capacidad_bytes,
+            'version_lexico': self.leer_meta('version_lexico'),
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'invalidaciones': self.invalidaciones,
+            'desalojos': self.desalojos
+        }
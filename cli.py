@@ -0,0 +1,240 @@
+"""
+Interfaz de línea de comandos para analizar directorios de conversaciones sin GUI.
+
+Uso:
+    python -m tokenizador analizar DIRECTORIO --jobs N --out resultados.jsonl [--instantanea lexico.bin]
+                                   [--metricas metricas.prom | metricas.jsonl] [--formato jsonl|csv|texto]
+                                   [--resultados-bd resultados.db] [--cache-resultados cache.db]
+    python -m tokenizador consultar resultados.db [--fase FASE --incumple] [--categoria prohibida]
+                                    [--sentimiento Negativo] [--desde 2026-10-11] [--hasta ...] [--limite N]
+    python -m tokenizador instantanea lexico.bin [--bd tokenizador.db]
+    python -m tokenizador servir (--socket /tmp/tokenizador.sock | --puerto 8765) [--lote-maximo 32] [--espera-ms 0]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+
+from almacen_resultados import AlmacenResultados
+from instantanea import exportar_instantanea
+from lote import iterar_lote
+from reporte import FORMATOS, crear_renderizador
+
+
+def recorrer_directorio(directorio, extension):
+    """Rutas de las transcripciones del directorio (recursivo), en orden estable"""
+    for raiz, subdirectorios, archivos in os.walk(directorio):
+        subdirectorios.sort()
+        for archivo in sorted(archivos):
+            if archivo.lower().endswith(extension):
+                yield os.path.join(raiz, archivo)
+
+
+def archivo_de_linea(linea, formato):
+    """
+    (archivo, si es un error) de una línea completa de la salida; el archivo es None si la
+    línea no registra ninguno (el encabezado del CSV)
+    """
+    if formato == 'jsonl':
+        registro = json.loads(linea)
+        return registro['archivo'], 'error' in registro
+    fila = next(csv.reader([linea.decode('utf-8')]))
+    if fila[0] == 'archivo':
+        return None, False
+    return fila[0], bool(fila[-1])
+
+
+def cargar_procesados(ruta_salida, formato='jsonl'):
+    """
+    Archivos ya analizados en una salida JSONL o CSV previa, para reanudar una corrida
+    interrumpida. Los que solo tienen registros de error no cuentan, así una falla pasajera
+    se vuelve a intentar (el registro nuevo queda después del error). Si la última línea
+    quedó a medio escribir se descarta antes de seguir agregando. Devuelve también si el
+    archivo ya tenía contenido (para no repetir el encabezado del CSV).
+    """
+    if not os.path.exists(ruta_salida):
+        return set(), False
+
+    procesados = set()
+    valido = 0
+    with open(ruta_salida, 'rb') as f:
+        for linea in f:
+            if not linea.endswith(b'\n'):
+                break
+            try:
+                archivo, error = archivo_de_linea(linea, formato)
+            except (ValueError, KeyError, IndexError):
+                break
+            if archivo is not None and not error:
+                procesados.add(archivo)
+            valido += len(linea)
+
+    with open(ruta_salida, 'r+b') as f:
+        f.truncate(valido)
+    return procesados, valido > 0
+
+
+def analizar(args):
+
+    # El reporte de texto no se puede reanudar con seguridad: se reescribe entero
+    if args.formato == 'texto':
+        procesados, con_contenido = set(), False
+        modo = 'w'
+    else:
+        procesados, con_contenido = cargar_procesados(args.out, args.formato)
+        modo = 'a'
+
+    # Índice del lote -> ruta, solo para las conversaciones en curso
+    rutas = {}
+
+    def pendientes():
+        indice = 0
+        for ruta in recorrer_directorio(args.directorio, args.extension):
+            if os.path.relpath(ruta, args.directorio) in procesados:
+                continue
+            rutas[indice] = ruta
+            indice += 1
+            yield ruta
+
+    opciones = {'umbral_autocorreccion': args.umbral, 'instantanea': args.instantanea,
+                'ruta_metricas': args.metricas, 'plegar_acentos': args.plegar_acentos,
+                'cache_resultados': args.cache_resultados}
+    cantidad = errores = 0
+    almacen = AlmacenResultados(args.resultados_bd) if args.resultados_bd else None
+    try:
+        with open(args.out, modo, encoding='utf-8', newline='') as salida:
+            renderizador = crear_renderizador(args.formato, salida,
+                                              **({'encabezado': not con_contenido} if args.formato == 'csv' else {}))
+            for indice, resultados in iterar_lote(pendientes(), args.jobs, args.bd, en_orden=False, **opciones):
+                ruta = rutas.pop(indice)
+                archivo = os.path.relpath(ruta, args.directorio)
+                if 'error' in resultados:
+                    # Queda registrado en la salida; al reanudar se vuelve a intentar
+                    print(f"Error en {archivo}: {resultados['error']}", file=sys.stderr)
+                    renderizador.escribir_error(resultados['error'], archivo)
+                    salida.flush()
+                    errores += 1
+                    continue
+                renderizador.escribir(resultados, archivo)
+                salida.flush()
+                if almacen is not None:
+                    # La fecha de la llamada es la de modificación de la transcripción
+                    almacen.guardar(resultados, archivo, fecha=os.path.getmtime(ruta))
+                cantidad += 1
+    finally:
+        if almacen is not None:
+            almacen.cerrar()
+
+    print(f"Se analizaron {cantidad} conversaciones ({len(procesados)} ya estaban en {args.out}, "
+          f"{errores} con errores).", file=sys.stderr)
+    return 0
+
+
+def consultar(args):
+
+    almacen = AlmacenResultados(args.resultados_bd)
+    try:
+        filtros = {'sentimiento': args.sentimiento, 'fase': args.fase, 'categoria': args.categoria,
+                   'desde': args.desde, 'hasta': args.hasta,
+                   'cumple': False if args.incumple else (True if args.cumple else None)}
+        for conversacion in almacen.buscar(limite=args.limite, **filtros):
+            print(json.dumps(conversacion, ensure_ascii=False))
+        print(f"{almacen.contar(**filtros)} conversaciones cumplen los filtros.", file=sys.stderr)
+    finally:
+        almacen.cerrar()
+    return 0
+
+
+def servir(args):
+
+    # asyncio solo se carga para este comando
+    from motor import Tokenizador
+    from servidor import servir as servir_analisis
+
+    tokenizador = Tokenizador(args.bd, interactivo=False, verboso=False, umbral_autocorreccion=args.umbral,
+                              instantanea=args.instantanea, plegar_acentos=args.plegar_acentos,
+                              cache_resultados=args.cache_resultados)
+    servir_analisis(tokenizador, args.socket, args.host, args.puerto,
+                    lote_maximo=args.lote_maximo, espera_maxima=args.espera_ms / 1000)
+    return 0
+
+
+def instantanea(args):
+
+    cantidad = exportar_instantanea(args.bd, args.salida)
+    print(f"Se exportaron {cantidad} palabras a {args.salida}.", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='python -m tokenizador',
+                                     description="Análisis de conversaciones de contact center")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    analizar_parser = subparsers.add_parser('analizar', aliases=['analyze'],
+                                            help="Analiza todas las transcripciones de un directorio")
+    analizar_parser.add_argument('directorio', help="Directorio con las transcripciones")
+    analizar_parser.add_argument('--jobs', type=int, default=None, help="Procesos trabajadores (por defecto, uno por CPU)")
+    analizar_parser.add_argument('--out', required=True,
+                                 help="Archivo de salida (en jsonl y csv se reanuda si ya existe)")
+    analizar_parser.add_argument('--formato', choices=list(FORMATOS), default='jsonl',
+                                 help="Formato de la salida: un registro JSON por línea, una fila CSV o el reporte de texto")
+    analizar_parser.add_argument('--bd', default='tokenizador.db', help="Base de datos del léxico")
+    analizar_parser.add_argument('--extension', default='.txt', help="Extensión de los archivos a analizar")
+    analizar_parser.add_argument('--umbral', type=int, default=None,
+                                 help="Distancia máxima para autocorregir palabras desconocidas")
+    analizar_parser.add_argument('--instantanea', default=None,
+                                 help="Instantánea binaria del léxico compartida por los trabajadores")
+    analizar_parser.add_argument('--plegar-acentos', action='store_true',
+                                 help="Buscar en el léxico también sin tildes (\"cuenteme\" encuentra \"cuénteme\")")
+    analizar_parser.add_argument('--metricas', default=None,
+                                 help="Tiempos por etapa y contadores de cada trabajador: .prom (Prometheus) o JSON lines")
+    analizar_parser.add_argument('--resultados-bd', default=None,
+                                 help="Base SQLite donde guardar también los resultados para consultarlos después")
+    analizar_parser.add_argument('--cache-resultados', default=None,
+                                 help="Caché en disco de resultados: las transcripciones sin cambios que no "
+                                      "tocan lexemas modificados no se vuelven a analizar")
+    analizar_parser.set_defaults(funcion=analizar)
+
+    consultar_parser = subparsers.add_parser('consultar', help="Busca conversaciones en una base de resultados")
+    consultar_parser.add_argument('resultados_bd', help="Base de resultados creada con analizar --resultados-bd")
+    consultar_parser.add_argument('--sentimiento', choices=['Positivo', 'Neutral', 'Negativo'], default=None)
+    consultar_parser.add_argument('--fase', default=None, help="Fase del protocolo, por ejemplo \"Uso de palabras rudas\"")
+    cumplimiento = consultar_parser.add_mutually_exclusive_group()
+    cumplimiento.add_argument('--cumple', action='store_true', help="Solo las que cumplieron la fase")
+    cumplimiento.add_argument('--incumple', action='store_true', help="Solo las que no cumplieron la fase")
+    consultar_parser.add_argument('--categoria', default=None, help="Con al menos un token de esta categoría")
+    consultar_parser.add_argument('--desde', default=None, help="Fecha de la llamada (UTC), inclusive")
+    consultar_parser.add_argument('--hasta', default=None, help="Fecha de la llamada (UTC), exclusive")
+    consultar_parser.add_argument('--limite', type=int, default=None)
+    consultar_parser.set_defaults(funcion=consultar)
+
+    servir_parser = subparsers.add_parser('servir', help="Servicio local con el léxico cargado en memoria")
+    direccion = servir_parser.add_mutually_exclusive_group(required=True)
+    direccion.add_argument('--socket', default=None, help="Ruta del socket Unix donde escuchar")
+    direccion.add_argument('--puerto', type=int, default=None, help="Puerto TCP (solo en --host)")
+    servir_parser.add_argument('--host', default='127.0.0.1')
+    servir_parser.add_argument('--bd', default='tokenizador.db', help="Base de datos del léxico")
+    servir_parser.add_argument('--umbral', type=int, default=None,
+                               help="Distancia máxima para autocorregir palabras desconocidas")
+    servir_parser.add_argument('--instantanea', default=None, help="Instantánea binaria del léxico")
+    servir_parser.add_argument('--plegar-acentos', action='store_true')
+    servir_parser.add_argument('--cache-resultados', default=None, help="Caché en disco de resultados")
+    servir_parser.add_argument('--lote-maximo', type=int, default=32, help="Conversaciones por lote como máximo")
+    servir_parser.add_argument('--espera-ms', type=float, default=0.0,
+                               help="Espera extra para juntar más pedidos antes de cada lote (por defecto, ninguna)")
+    servir_parser.set_defaults(funcion=servir)
+
+    instantanea_parser = subparsers.add_parser('instantanea', help="Exporta el léxico a una instantánea binaria")
+    instantanea_parser.add_argument('salida', help="Archivo de la instantánea")
+    instantanea_parser.add_argument('--bd', default='tokenizador.db', help="Base de datos del léxico")
+    instantanea_parser.set_defaults(funcion=instantanea)
+
+    args = parser.parse_args(argv)
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
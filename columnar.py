@@ -0,0 +1,231 @@
+"""
+Representación columnar de los tokens de una conversación para agregar sentimiento con NumPy.
+
+En lugar de una tupla (palabra, token, puntuacion) por token, cada conversación guarda arreglos
+paralelos: id de palabra y de categoría (internados en vocabularios propios de la conversación,
+así el objeto viaja solo entre procesos), puntuación (int8 salvo que el léxico tenga valores
+más grandes), si lo dijo el agente, número de turno y ubicación (inicio, fin) en el texto. Es
+el único almacén de tokens de los resultados: los totales, conteos y extremos salen de
+reducciones vectorizadas, las palabras del agente y las negativas se extraen de las columnas, y
+LoteColumnar agrega muchas conversaciones de una vez sin crear objetos por token.
+"""
+from array import array
+
+import numpy as np
+
+
+def tipo_minimo(maximo):
+    """El entero sin signo más chico que representa valores hasta `maximo`"""
+    for tipo in (np.uint8, np.uint16, np.uint32):
+        if maximo <= np.iinfo(tipo).max:
+            return tipo
+    return np.uint64
+
+
+def tipo_minimo_con_signo(minimo, maximo):
+    """El entero con signo más chico que representa valores entre `minimo` y `maximo`"""
+    for tipo in (np.int8, np.int16, np.int32):
+        if np.iinfo(tipo).min <= minimo and maximo <= np.iinfo(tipo).max:
+            return tipo
+    return np.int64
+
+
+def etiqueta_sentimiento(puntuacion_total):
+
+    if puntuacion_total > 0:
+        return "Positivo"
+    elif puntuacion_total < 0:
+        return "Negativo"
+    return "Neutral"
+
+
+class TokensColumnares:
+
+    def __init__(self):
+        self.vocabulario = []
+        self.ids_palabra = {}
+        self.categorias = []
+        self.ids_categoria = {}
+
+        # Columnas en construcción (array.array, sin un objeto Python por token)
+        self.columnas = {'palabras': array('i'), 'categorias': array('H'), 'puntuaciones': array('q'),
+                         'agente': array('B'), 'turnos': array('i'), 'inicios': array('q'), 'fines': array('q')}
+        self.cerrado = False
+
+    def __len__(self):
+        return len(self.puntuaciones) if self.cerrado else len(self.columnas['puntuaciones'])
+
+    def internar(self, valor, ids, valores):
+
+        identificador = ids.get(valor)
+        if identificador is None:
+            identificador = ids[valor] = len(valores)
+            valores.append(valor)
+        return identificador
+
+    def agregar_turno(self, tokens, es_agente, turno, posiciones):
+        """`posiciones` tiene el (inicio, fin) de cada token en la conversación"""
+        if self.cerrado:
+            raise ValueError("No se pueden agregar turnos a columnas ya cerradas")
+
+        columnas = self.columnas
+        for palabra, token, puntuacion in tokens:
+            columnas['palabras'].append(self.internar(palabra, self.ids_palabra, self.vocabulario))
+            columnas['categorias'].append(self.internar(token, self.ids_categoria, self.categorias))
+            columnas['puntuaciones'].append(puntuacion)
+        cantidad = len(tokens)
+        columnas['agente'].extend([1 if es_agente else 0] * cantidad)
+        columnas['turnos'].extend([turno] * cantidad)
+        for inicio, fin in posiciones:
+            columnas['inicios'].append(inicio)
+            columnas['fines'].append(fin)
+
+    def cerrar(self):
+        """
+        Convierte las columnas en arreglos NumPy con el tipo entero más chico que alcanza
+        (una conversación típica queda en 5 o 6 bytes por token); después ya no se pueden
+        agregar turnos.
+        """
+        if self.cerrado:
+            return self
+
+        c = self.columnas
+        self.palabras = np.array(c['palabras'], dtype=tipo_minimo(len(self.vocabulario)))
+        self.ids_categorias = np.array(c['categorias'], dtype=tipo_minimo(len(self.categorias)))
+        self.puntuaciones = np.array(c['puntuaciones'], dtype=tipo_minimo_con_signo(
+            min(c['puntuaciones'], default=0), max(c['puntuaciones'], default=0)))
+        self.agente = np.array(c['agente'], dtype=bool)
+        self.turnos = np.array(c['turnos'], dtype=tipo_minimo(max(c['turnos'], default=0)))
+        tipo_posicion = tipo_minimo(max(c['fines'], default=0))
+        self.inicios = np.array(c['inicios'], dtype=tipo_posicion)
+        self.fines = np.array(c['fines'], dtype=tipo_posicion)
+        self.columnas = None
+        self.cerrado = True
+        return self
+
+    def tuplas(self, mascara=None):
+        """Los tokens como tuplas (palabra, token, puntuacion), para código que no es columnar"""
+        self.cerrar()
+        indices = np.flatnonzero(mascara) if mascara is not None else range(len(self.puntuaciones))
+        return [(self.vocabulario[self.palabras[i]], self.categorias[self.ids_categorias[i]], int(self.puntuaciones[i]))
+                for i in indices]
+
+    def palabras_de(self, mascara=None):
+        """Las palabras de los tokens en orden (los textos del vocabulario, sin copiarlos)"""
+        self.cerrar()
+        ids = self.palabras if mascara is None else self.palabras[mascara]
+        vocabulario = self.vocabulario
+        return [vocabulario[i] for i in ids.tolist()]
+
+    def posiciones(self, mascara=None):
+        """Arreglo (n, 2) con el (inicio, fin) de cada token en la conversación"""
+        self.cerrar()
+        posiciones = np.column_stack((self.inicios, self.fines))
+        return posiciones if mascara is None else posiciones[mascara]
+
+    def negativas(self):
+        """Cada token con puntuación negativa y dónde aparece, en el orden de la conversación"""
+        self.cerrar()
+        return [{'palabra': self.vocabulario[self.palabras[i]], 'puntuacion': int(self.puntuaciones[i]),
+                 'turno': int(self.turnos[i]), 'inicio': int(self.inicios[i]), 'fin': int(self.fines[i])}
+                for i in np.flatnonzero(self.puntuaciones < 0)]
+
+    def desconocidas(self):
+        """Las palabras distintas que quedaron como 'desconocido', ordenadas"""
+        self.cerrar()
+        if 'desconocido' not in self.ids_categoria:
+            return []
+        ids = np.unique(self.palabras[self.ids_categorias == self.ids_categoria['desconocido']])
+        return sorted(self.vocabulario[i] for i in ids.tolist())
+
+    def sentimiento(self, mascara=None):
+        """Igual que Tokenizador.analizar_sentimiento, con reducciones vectorizadas"""
+        self.cerrar()
+        puntuaciones, palabras = self.puntuaciones, self.palabras
+        if mascara is not None:
+            puntuaciones, palabras = puntuaciones[mascara], palabras[mascara]
+
+        puntuacion_total = int(puntuaciones.sum(dtype=np.int64))
+        positivas = int(np.count_nonzero(puntuaciones > 0))
+        negativas = int(np.count_nonzero(puntuaciones < 0))
+
+        # argmax/argmin devuelven la primera aparición del extremo, como max/min con key
+        palabra_mas_positiva = palabra_mas_negativa = None
+        if positivas:
+            i = int(np.argmax(puntuaciones))
+            palabra_mas_positiva = (self.vocabulario[palabras[i]], int(puntuaciones[i]))
+        if negativas:
+            i = int(np.argmin(puntuaciones))
+            palabra_mas_negativa = (self.vocabulario[palabras[i]], int(puntuaciones[i]))
+
+        return {
+            "sentimiento": etiqueta_sentimiento(puntuacion_total),
+            "puntuacion_total": puntuacion_total,
+            "palabras_positivas": positivas,
+            "palabras_negativas": negativas,
+            "palabra_mas_positiva": palabra_mas_positiva,
+            "palabra_mas_negativa": palabra_mas_negativa
+        }
+
+    def sentimiento_por_hablante(self):
+
+        self.cerrar()
+        return {'Agente': self.sentimiento(self.agente), 'Cliente': self.sentimiento(~self.agente)}
+
+    def conteo_categorias(self):
+        """categoría -> cantidad de tokens de la conversación con esa categoría"""
+        self.cerrar()
+        conteos = np.bincount(self.ids_categorias, minlength=len(self.categorias))
+        return {self.categorias[i]: int(conteos[i]) for i in np.flatnonzero(conteos)}
+
+
+class LoteColumnar:
+    """
+    Muchas conversaciones columnares concatenadas: cada agregado por conversación es un
+    bincount sobre el índice de conversación de cada token.
+    """
+    def __init__(self, conversaciones):
+        conversaciones = [columnas.cerrar() for columnas in conversaciones]
+        self.cantidad = len(conversaciones)
+
+        largos = np.array([len(columnas.puntuaciones) for columnas in conversaciones], dtype=np.int64)
+        self.conversacion = np.repeat(np.arange(self.cantidad), largos)
+        self.puntuaciones = np.concatenate([c.puntuaciones for c in conversaciones]) if conversaciones else np.zeros(0, np.int8)
+        self.agente = np.concatenate([c.agente for c in conversaciones]) if conversaciones else np.zeros(0, bool)
+
+        # Vocabulario común del lote: se remapean los ids locales de cada conversación
+        ids = {}
+        palabras = []
+        for columnas in conversaciones:
+            mapa = np.array([ids.setdefault(palabra, len(ids)) for palabra in columnas.vocabulario], dtype=np.int32)
+            palabras.append(mapa[columnas.palabras])
+        self.vocabulario = list(ids)
+        self.palabras = np.concatenate(palabras) if palabras else np.zeros(0, np.int32)
+
+    def sumar(self, pesos=None, mascara=None):
+
+        conversacion = self.conversacion if mascara is None else self.conversacion[mascara]
+        if pesos is not None and mascara is not None:
+            pesos = pesos[mascara]
+        return np.bincount(conversacion, weights=pesos, minlength=self.cantidad).astype(np.int64)
+
+    def sentimiento(self):
+        """Arreglos por conversación: puntuación total, palabras positivas y negativas, y etiqueta"""
+        totales = self.sumar(self.puntuaciones)
+        etiquetas = np.array(["Negativo", "Neutral", "Positivo"])[np.sign(totales) + 1]
+        return {
+            'puntuacion_total': totales,
+            'palabras_positivas': self.sumar(mascara=self.puntuaciones > 0),
+            'palabras_negativas': self.sumar(mascara=self.puntuaciones < 0),
+            'sentimiento': etiquetas
+        }
+
+    def puntuacion_por_hablante(self):
+        return {'Agente': self.sumar(self.puntuaciones, self.agente),
+                'Cliente': self.sumar(self.puntuaciones, ~self.agente)}
+
+    def frecuencias(self, mascara=None):
+        """palabra -> apariciones en todo el lote (por ejemplo, mascara=lote.puntuaciones < 0)"""
+        palabras = self.palabras if mascara is None else self.palabras[mascara]
+        conteos = np.bincount(palabras, minlength=len(self.vocabulario))
+        return {self.vocabulario[i]: int(conteos[i]) for i in np.flatnonzero(conteos)}
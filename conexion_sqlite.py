@@ -0,0 +1,19 @@
+import sqlite3
+
+
+def conectar(ruta, claves_foraneas=False):
+    """
+    Conexión de larga duración con la configuración común de las bases del proyecto (léxico,
+    resultados y caché de resultados).
+
+    check_same_thread=False: la interfaz y el servidor usan la conexión desde un hilo aparte y
+    SQLite serializa el acceso. WAL: los lectores de otros procesos no bloquean a los
+    escritores, y con synchronous=NORMAL no se hace fsync en cada commit sino en los
+    checkpoints. Con `claves_foraneas`, SQLite respeta los ON DELETE CASCADE del esquema.
+    """
+    conn = sqlite3.connect(ruta, timeout=30, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    if claves_foraneas:
+        conn.execute('PRAGMA foreign_keys=ON')
+    return conn
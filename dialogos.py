@@ -0,0 +1,195 @@
+"""
+Diálogos de Tk del modo interactivo del Tokenizador.
+
+motor.py los importa recién cuando tiene que preguntarle algo al usuario, así que el análisis
+sin interacción no carga tkinter.
+"""
+import tkinter as tk
+from tkinter import simpledialog, ttk
+
+
+def crear_raiz_oculta():
+    """Ventana raíz invisible y siempre encima, para colgar de ella los diálogos"""
+    root = tk.Tk()
+    root.withdraw()
+    root.attributes('-topmost', True)
+    return root
+
+
+def pedir_puntuacion(palabra, root):
+
+    return simpledialog.askinteger("Asignar puntuación",
+                                   f"¿Qué puntuación de sentimiento tiene '{palabra}'?\n(Número positivo o negativo)",
+                                   parent=root)
+
+
+class TokenDialog(tk.Toplevel):
+
+    def __init__(self, parent, title, prompt, tokens_disponibles):
+        super().__init__(parent)
+        self.title(title)
+        self.attributes('-topmost', True)
+        self.resizable(False, False)
+        
+        # Configuración para centrar la ventana
+        window_width = 450
+        window_height = 180
+        screen_width = self.winfo_screenwidth()
+        screen_height = self.winfo_screenheight()
+        
+        center_x = int(screen_width/2 - window_width/2)
+        center_y = int(screen_height/2 - window_height/2)
+        
+        self.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
+        
+        self.result = None
+        self.tokens_disponibles = tokens_disponibles
+        
+        # Frame principal para mejor organización
+        main_frame = tk.Frame(self, padx=15, pady=15)
+        main_frame.pack(expand=True, fill=tk.BOTH)
+        
+        # Etiqueta con la pregunta
+        lbl_prompt = tk.Label(main_frame, text=prompt, wraplength=400, justify=tk.LEFT)
+        lbl_prompt.pack(pady=(0, 10), anchor=tk.W)
+        
+        # Combobox con estilo mejorado
+        self.combo = ttk.Combobox(main_frame)
+        self.combo.pack(fill=tk.X, pady=5)
+        self.combo['values'] = list(tokens_disponibles)
+        self.combo.set("")
+        self.combo.focus_set()
+        
+        # Frame para botones
+        btn_frame = tk.Frame(main_frame)
+        btn_frame.pack(pady=(10, 0))
+        
+        # Botones con mejor estilo
+        btn_aceptar = ttk.Button(btn_frame, text="Aceptar", command=self.on_accept)
+        btn_aceptar.pack(side=tk.LEFT, padx=5)
+        
+        btn_cancelar = ttk.Button(btn_frame, text="Cancelar", command=self.on_cancel)
+        btn_cancelar.pack(side=tk.LEFT, padx=5)
+        
+        # Configurar autocompletado
+        self.combo.bind('<KeyRelease>', self.autocomplete)
+        self.bind('<Return>', lambda e: self.on_accept())
+        self.bind('<Escape>', lambda e: self.on_cancel())
+    
+    def autocomplete(self, event):
+        """Implementa autocompletado para facilitar la selección de tokens"""
+        value = event.widget.get()
+        if value == '':
+            self.combo['values'] = list(self.tokens_disponibles)
+        else:
+            data = []
+            for item in self.tokens_disponibles:
+                if value.lower() in item.lower():
+                    data.append(item)
+            self.combo['values'] = data
+    
+    def on_accept(self):
+        self.result = self.combo.get()
+        self.destroy()
+    
+    def on_cancel(self):
+        self.destroy()
+
+class SugerenciasDialog(tk.Toplevel):
+
+    def __init__(self, parent, palabra_original, sugerencias):
+        super().__init__(parent)
+        self.title("Palabra desconocida - Seleccionar corrección")
+        self.attributes('-topmost', True)
+        self.resizable(False, False)
+        
+        # Configuración para centrar la ventana
+        window_width = 500
+        window_height = 280
+        screen_width = self.winfo_screenwidth()
+        screen_height = self.winfo_screenheight()
+        
+        center_x = int(screen_width/2 - window_width/2)
+        center_y = int(screen_height/2 - window_height/2)
+        
+        self.geometry(f'{window_width}x{window_height}+{center_x}+{center_y}')
+        
+        self.result = None
+        self.palabra_original = palabra_original
+        self.sugerencias = sugerencias
+        
+        # Frame principal
+        main_frame = tk.Frame(self, padx=20, pady=20)
+        main_frame.pack(expand=True, fill=tk.BOTH)
+        
+        # Título y explicación
+        titulo = tk.Label(main_frame, 
+                         text=f"La palabra '{palabra_original}' no existe en la base de datos",
+                         font=("Arial", 12, "bold"),
+                         fg="red")
+        titulo.pack(pady=(0, 10))
+        
+        explicacion = tk.Label(main_frame,
+                              text="Seleccione una opción del menú desplegable:",
+                              wraplength=450)
+        explicacion.pack(pady=(0, 15))
+        
+        # Frame para el combobox
+        combo_frame = tk.LabelFrame(main_frame, text="Opciones disponibles", padx=10, pady=10)
+        combo_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        # Preparar opciones para el combobox
+        opciones = [f"Mantener '{palabra_original}' (agregar como nueva palabra)"]
+        
+        if sugerencias:
+            for sugerencia in sugerencias:
+                opciones.append(f"Reemplazar por '{sugerencia}'")
+        else:
+            opciones.append("(No hay sugerencias disponibles)")
+        
+        # Combobox con las opciones
+        self.combo = ttk.Combobox(combo_frame, state="readonly", width=60)
+        self.combo.pack(fill=tk.X, pady=5)
+        self.combo['values'] = opciones
+        self.combo.set(opciones[0])  # Seleccionar la primera opción por defecto
+        self.combo.focus_set()
+        
+        # Frame para botones
+        btn_frame = tk.Frame(main_frame)
+        btn_frame.pack(pady=(10, 0))
+        
+        # Botones
+        btn_aceptar = ttk.Button(btn_frame, text="Aceptar", command=self.on_accept)
+        btn_aceptar.pack(side=tk.LEFT, padx=5)
+        
+        btn_cancelar = ttk.Button(btn_frame, text="Cancelar", command=self.on_cancel)
+        btn_cancelar.pack(side=tk.LEFT, padx=5)
+        
+        # Configurar teclas
+        self.bind('<Return>', lambda e: self.on_accept())
+        self.bind('<Escape>', lambda e: self.on_cancel())
+    
+    def on_accept(self):
+        seleccion = self.combo.get()
+        
+        if seleccion.startswith("Mantener"):
+            # Si se seleccionó mantener la palabra original
+            self.result = self.palabra_original
+        elif seleccion.startswith("Reemplazar por"):
+            # Extraer la palabra de la opción seleccionada
+            # Formato: "Reemplazar por 'palabra'"
+            import re
+            match = re.search(r"'([^']+)'", seleccion)
+            if match:
+                self.result = match.group(1)
+            else:
+                self.result = self.palabra_original
+        else:
+            # Caso por defecto
+            self.result = self.palabra_original
+            
+        self.destroy()
+    
+    def on_cancel(self):
+        self.result = None
+        self.destroy()
@@ -0,0 +1,121 @@
+import numpy as np
+
+ESPACIO = ord(' ')
+
+
+def codigos(palabra):
+    """Puntos de código de la palabra como arreglo de enteros"""
+    return np.frombuffer(palabra.encode('utf-32-le'), dtype=np.uint32).astype(np.int32)
+
+
+class MotorDistancias:
+    """
+    Calcula las distancias de una palabra contra todo el léxico a la vez con NumPy.
+
+    El léxico se empaqueta en una matriz de puntos de código rellenada con espacios (el mismo
+    relleno que usa distancia_hamming), y cada fila de la programación dinámica de Levenshtein
+    se calcula para todos los lexemas con operaciones de arreglos. Las funciones escalares de
+    Tokenizador siguen siendo la implementación de referencia.
+    """
+    def __init__(self, lexemas=()):
+        self.lexemas = []
+        self.largos = np.zeros(0, dtype=np.int32)
+        self.matriz = np.full((0, 1), ESPACIO, dtype=np.int32)
+        self.agregar_varios(lexemas)
+
+    def __len__(self):
+        return len(self.lexemas)
+
+    def agregar(self, lexema):
+        self.agregar_varios([lexema])
+
+    def agregar_varios(self, lexemas):
+
+        nuevos = list(lexemas)
+        if not nuevos:
+            return
+
+        n = len(self.lexemas)
+        total = n + len(nuevos)
+        ancho = max([self.matriz.shape[1]] + [len(lexema) for lexema in nuevos])
+
+        # Reservar capacidad de más para que las altas de a una no copien la matriz cada vez
+        if total > self.matriz.shape[0] or ancho > self.matriz.shape[1]:
+            capacidad = max(total, 2 * self.matriz.shape[0]) if total > self.matriz.shape[0] else self.matriz.shape[0]
+            matriz = np.full((capacidad, ancho), ESPACIO, dtype=np.int32)
+            matriz[:n, :self.matriz.shape[1]] = self.matriz[:n]
+            largos = np.zeros(capacidad, dtype=np.int32)
+            largos[:n] = self.largos[:n]
+            self.matriz, self.largos = matriz, largos
+
+        for i, lexema in enumerate(nuevos, n):
+            self.matriz[i, :len(lexema)] = codigos(lexema)
+            self.largos[i] = len(lexema)
+        self.lexemas.extend(nuevos)
+
+    def hamming(self, palabra):
+        """Distancia de Hamming (con relleno de espacios) de la palabra a cada lexema"""
+        n = len(self.lexemas)
+        ancho = self.matriz.shape[1]
+        q = codigos(palabra)
+
+        consulta = np.full(ancho, ESPACIO, dtype=np.int32)
+        consulta[:min(len(q), ancho)] = q[:ancho]
+        distancias = np.count_nonzero(self.matriz[:n] != consulta, axis=1)
+
+        # Caracteres de la consulta más allá del lexema más largo se comparan contra espacios
+        if len(q) > ancho:
+            distancias += np.count_nonzero(q[ancho:] != ESPACIO)
+        return distancias
+
+    def levenshtein(self, palabra, maximo=None):
+        """
+        Distancia de Levenshtein de la palabra a cada lexema. Con `maximo`, los lexemas que
+        superan ese valor se descartan en cuanto el mínimo de su fila lo excede y se informan
+        como maximo + 1.
+        """
+        n = len(self.lexemas)
+        q = codigos(palabra)
+        largos = self.largos[:n]
+
+        activos = np.arange(n)
+        if maximo is not None:
+            activos = activos[np.abs(largos - len(q)) <= maximo]
+
+        # Columnas más allá del lexema más largo entre los activos no aportan nada
+        ancho = int(largos[activos].max()) if len(activos) else 0
+        matriz = self.matriz[activos, :ancho]
+        columnas = np.arange(ancho + 1, dtype=np.int32)
+        fila = np.tile(columnas, (len(activos), 1))
+
+        for i, c in enumerate(q, 1):
+            # Sustitución e inserción dependen de la fila anterior; el borrado (izquierda) se
+            # resuelve con un mínimo acumulado de fila - j, que evita el bucle por columna
+            candidatos = np.empty_like(fila)
+            candidatos[:, 0] = i
+            candidatos[:, 1:] = np.minimum(fila[:, 1:] + 1, fila[:, :-1] + (matriz != c))
+            fila = np.minimum.accumulate(candidatos - columnas, axis=1) + columnas
+
+            if maximo is not None:
+                # El mínimo de una fila nunca baja en las siguientes: corte temprano
+                vivos = fila.min(axis=1) <= maximo
+                if not vivos.all():
+                    activos, matriz, fila = activos[vivos], matriz[vivos], fila[vivos]
+
+        distancias = np.full(n, len(q) if maximo is None else maximo + 1, dtype=np.int32)
+        finales = fila[np.arange(len(activos)), largos[activos]]
+        if maximo is not None:
+            finales = np.minimum(finales, maximo + 1)
+        distancias[activos] = finales
+        return distancias
+
+    def buscar(self, palabra, radio=2):
+        """[(distancia, lexema)] dentro del radio con el mínimo de ambas distancias, en orden estable"""
+        distancias = np.minimum(self.levenshtein(palabra, radio), self.hamming(palabra))
+        candidatos = np.flatnonzero(distancias <= radio)
+        orden = candidatos[np.argsort(distancias[candidatos], kind='stable')]
+        return [(int(distancias[i]), self.lexemas[i]) for i in orden]
+
+    def sugerir(self, palabra, maximo=2, limite=5):
+        """Igual que sugerir_palabras_similares"""
+        return [lexema for _, lexema in self.buscar(palabra, maximo)[:limite]]
@@ -0,0 +1,135 @@
+from linea_tiempo import LineaTiempoSentimiento
+
+
+class AnalizadorEnVivo:
+    """
+    Análisis incremental de una llamada en curso, turno por turno.
+
+    Mantiene totales de sentimiento y el estado del autómata del protocolo entre turnos, así que
+    el costo de cada turno depende solo de su largo y no de lo que ya se habló. Después de cada
+    turno devuelve una actualización con el estado acumulado y las alertas nuevas (por ejemplo,
+    una palabra prohibida dicha por el agente).
+
+    La línea de tiempo guarda solo los valores corrientes; con `guardar_linea_tiempo=True` el
+    resumen final incluye además el punto de cada turno (y el estado crece con la llamada).
+    """
+    def __init__(self, tokenizador, guardar_linea_tiempo=False):
+        self.tokenizador = tokenizador
+        # Cada llamada es una corrida: no hereda lo que el operador decidió en otra
+        tokenizador.descartar_decisiones()
+        self.automata = tokenizador.automata_protocolo
+
+        self.numero_turno = 0
+        self.puntuacion_total = 0
+        self.palabras_positivas = 0
+        self.palabras_negativas = 0
+        self.palabra_mas_positiva = None
+        self.palabra_mas_negativa = None
+        self.correcciones = 0
+        self.linea_tiempo = LineaTiempoSentimiento(tokenizador.ventana_sentimiento, guardar_linea_tiempo)
+
+        # Estado del autómata sobre el habla del agente (las frases pueden cruzar turnos)
+        self.estado_protocolo = 0
+        self.posicion_agente = 0
+        # (categoria, frase) -> primera coincidencia; acotado por la cantidad de frases
+        self.frases_encontradas = {}
+
+    def sentimiento(self):
+
+        if self.puntuacion_total > 0:
+            sentimiento = "Positivo"
+        elif self.puntuacion_total < 0:
+            sentimiento = "Negativo"
+        else:
+            sentimiento = "Neutral"
+
+        return {
+            "sentimiento": sentimiento,
+            "puntuacion_total": self.puntuacion_total,
+            "palabras_positivas": self.palabras_positivas,
+            "palabras_negativas": self.palabras_negativas,
+            "palabra_mas_positiva": self.palabra_mas_positiva,
+            "palabra_mas_negativa": self.palabra_mas_negativa
+        }
+
+    def protocolo(self):
+        return self.tokenizador.evaluar_protocolo(self.frases_encontradas.values())
+
+    def agregar_turno(self, hablante, texto):
+
+        tokens, correcciones = self.tokenizador.tokenizar(texto)
+        self.correcciones += len(correcciones)
+
+        puntuacion_turno = 0
+        for palabra, _, puntuacion in tokens:
+            puntuacion_turno += puntuacion
+            if puntuacion > 0:
+                self.palabras_positivas += 1
+                if self.palabra_mas_positiva is None or puntuacion > self.palabra_mas_positiva[1]:
+                    self.palabra_mas_positiva = (palabra, puntuacion)
+            elif puntuacion < 0:
+                self.palabras_negativas += 1
+                if self.palabra_mas_negativa is None or puntuacion < self.palabra_mas_negativa[1]:
+                    self.palabra_mas_negativa = (palabra, puntuacion)
+        self.puntuacion_total += puntuacion_turno
+        punto = self.linea_tiempo.agregar(self.numero_turno, hablante, puntuacion_turno)
+
+        coincidencias = []
+        if hablante == "Agente":
+            # Los lexemas de varias palabras avanzan el autómata palabra por palabra, así que
+            # 'posicion' cuenta palabras del agente
+            for palabra, _, _ in tokens:
+                for parte in palabra.split():
+                    self.estado_protocolo, salidas = self.automata.avanzar(self.estado_protocolo, parte)
+                    for categoria, frase, largo in salidas:
+                        coincidencia = {'categoria': categoria, 'frase': frase,
+                                        'posicion': self.posicion_agente - largo + 1, 'turno': self.numero_turno}
+                        coincidencias.append(coincidencia)
+                        self.frases_encontradas.setdefault((categoria, frase), coincidencia)
+                    self.posicion_agente += 1
+
+        actualizacion = {
+            "turno": self.numero_turno,
+            "hablante": hablante,
+            "tokens": tokens,
+            "correcciones": correcciones,
+            "puntuacion_turno": puntuacion_turno,
+            "linea_tiempo": punto,
+            "coincidencias_protocolo": coincidencias,
+            "alertas": [c for c in coincidencias if c['categoria'] == 'palabras_prohibidas'],
+            "sentimiento": self.sentimiento(),
+            "protocolo": self.protocolo()
+        }
+        self.numero_turno += 1
+        return actualizacion
+
+    def turnos_de(self, entrada):
+        """Acepta tuplas (hablante, texto) o texto con marcas 'Agente:'/'Cliente:'"""
+        if isinstance(entrada, str):
+            return self.tokenizador.dividir_turnos(entrada)
+        return [entrada]
+
+    def procesar(self, turnos):
+        """Generador: una actualización por turno a medida que llegan del iterable"""
+        for entrada in turnos:
+            for hablante, texto in self.turnos_de(entrada):
+                yield self.agregar_turno(hablante, texto)
+
+    async def procesar_async(self, turnos):
+        """Igual que procesar, para un iterador asíncrono (por ejemplo, la salida del reconocedor de voz)"""
+        async for entrada in turnos:
+            for hablante, texto in self.turnos_de(entrada):
+                yield self.agregar_turno(hablante, texto)
+
+    def finalizar(self):
+
+        # Persistir las palabras desconocidas encoladas durante la llamada (modo no interactivo)
+        # y los aciertos de la memoria de correcciones
+        if not self.tokenizador.interactivo:
+            self.tokenizador.guardar_pendientes()
+        self.tokenizador.guardar_aciertos_alias()
+        self.tokenizador.metricas.volcar()
+        self.tokenizador.descartar_decisiones()
+
+        return {"sentimiento_general": self.sentimiento(), "protocolo": self.protocolo(),
+                "linea_tiempo": self.linea_tiempo.resumen()}
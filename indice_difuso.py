@@ -0,0 +1,147 @@
+from collections import OrderedDict
+
+
+class ArbolBK:
+    """
+    Árbol BK (Burkhard-Keller) para búsqueda aproximada de lexemas.
+
+    Cada nodo guarda una palabra y sus hijos indexados por la distancia a ella; por la
+    desigualdad triangular, una búsqueda de radio r solo necesita visitar los hijos cuya
+    distancia al nodo está en [d - r, d + r], en lugar de comparar contra todo el léxico.
+    """
+    def __init__(self, distancia):
+        self.distancia = distancia
+        self.raiz = None
+        # Posición de inserción de cada palabra, para desempatar igual que el recorrido lineal
+        self.orden = {}
+
+    def __len__(self):
+        return len(self.orden)
+
+    def __contains__(self, palabra):
+        return palabra in self.orden
+
+    def agregar(self, palabra):
+
+        if palabra in self.orden:
+            return False
+
+        self.orden[palabra] = len(self.orden)
+
+        if self.raiz is None:
+            self.raiz = (palabra, {})
+            return True
+
+        nodo = self.raiz
+        while True:
+            d = self.distancia(palabra, nodo[0])
+            hijo = nodo[1].get(d)
+            if hijo is None:
+                nodo[1][d] = (palabra, {})
+                return True
+            nodo = hijo
+
+    def agregar_varios(self, palabras):
+        for palabra in palabras:
+            self.agregar(palabra)
+
+    def buscar(self, palabra, radio):
+        """Devuelve [(distancia, palabra)] dentro del radio, ordenado por distancia y orden de inserción"""
+        if self.raiz is None:
+            return []
+
+        encontradas = []
+        pendientes = [self.raiz]
+        while pendientes:
+            lexema, hijos = pendientes.pop()
+            d = self.distancia(palabra, lexema)
+            if d <= radio:
+                encontradas.append((d, self.orden[lexema], lexema))
+            for distancia_hijo, hijo in hijos.items():
+                if d - radio <= distancia_hijo <= d + radio:
+                    pendientes.append(hijo)
+
+        encontradas.sort()
+        return [(d, lexema) for d, _, lexema in encontradas]
+
+
+class CacheSugerencias:
+    """
+    Caché LRU acotada palabra -> sugerencias [(distancia, lexema)]. obtener() devuelve una
+    copia de la lista guardada.
+
+    Cuando se agrega un lexema, las entradas se corrigen en el lugar (el lexema nuevo es el
+    último en el orden de inserción, así que solo puede entrar detrás de los de igual o menor
+    distancia); las bajas y los cambios masivos vacían la caché.
+    """
+    def __init__(self, capacidad=10000, radio=2, limite=5):
+        self.capacidad = capacidad
+        self.radio = radio
+        self.limite = limite
+        self.entradas = OrderedDict()
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.parches = 0
+        self.invalidaciones = 0
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def obtener(self, palabra):
+
+        sugerencias = self.entradas.get(palabra)
+        if sugerencias is None:
+            self.fallos += 1
+            return None
+
+        self.entradas.move_to_end(palabra)
+        self.aciertos += 1
+        # Copia: la lista guardada se parcha en el lugar y no la puede tocar quien la pidió
+        return list(sugerencias)
+
+    def guardar(self, palabra, sugerencias):
+
+        if self.capacidad <= 0:
+            return
+
+        self.entradas[palabra] = sugerencias[:self.limite]
+        self.entradas.move_to_end(palabra)
+        while len(self.entradas) > self.capacidad:
+            self.entradas.popitem(last=False)
+            self.desalojos += 1
+
+    def agregar_lexema(self, lexema, distancia):
+
+        for palabra, sugerencias in self.entradas.items():
+            # Filtro barato por largo antes de calcular la distancia
+            if abs(len(palabra) - len(lexema)) > self.radio:
+                continue
+            d = distancia(palabra, lexema)
+            if d > self.radio:
+                continue
+
+            posicion = sum(1 for distancia_previa, _ in sugerencias if distancia_previa <= d)
+            if posicion < self.limite:
+                sugerencias.insert(posicion, (d, lexema))
+                del sugerencias[self.limite:]
+                self.parches += 1
+
+    def invalidar(self):
+
+        if self.entradas:
+            self.entradas.clear()
+            self.invalidaciones += 1
+
+    def estadisticas(self):
+
+        return {
+            'tamanio': len(self.entradas),
+            'capacidad': self.capacidad,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'desalojos': self.desalojos,
+            'parches': self.parches,
+            'invalidaciones': self.invalidaciones
+        }
@@ -0,0 +1,209 @@
+"""
+Tiempos por etapa y contadores del análisis, con destino intercambiable.
+
+Por defecto Tokenizador usa METRICAS_NULAS: los métodos medidos solo consultan un atributo
+antes de seguir, así que el costo con la instrumentación apagada es despreciable. Con
+Metricas(...) cada etapa acumula cantidad, total, mínimo y máximo en memoria, y el sumidero
+opcional recibe los eventos y el resumen al volcar:
+
+    SumideroJSONL(ruta)        una línea JSON por medición y un resumen por volcado
+    SumideroPrometheus(ruta)   archivo en formato de texto de Prometheus (textfile collector)
+
+Los tiempos son inclusivos: tokenizar incluye las sugerencias que pide para las desconocidas.
+"""
+import functools
+import json
+import os
+import time
+from collections import Counter
+
+
+class CronometroNulo:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+CRONOMETRO_NULO = CronometroNulo()
+
+
+class MetricasNulas:
+    """Instrumentación apagada: no mide ni guarda nada"""
+    activa = False
+
+    def medir(self, etapa):
+        return CRONOMETRO_NULO
+
+    def registrar(self, etapa, segundos):
+        pass
+
+    def contar(self, nombre, cantidad=1):
+        pass
+
+    def resumen(self):
+        return {'etapas': {}, 'contadores': {}}
+
+    def volcar(self):
+        pass
+
+
+METRICAS_NULAS = MetricasNulas()
+
+
+class Cronometro:
+
+    def __init__(self, metricas, etapa):
+        self.metricas = metricas
+        self.etapa = etapa
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.metricas.registrar(self.etapa, time.perf_counter() - self.inicio)
+        return False
+
+
+class Metricas:
+
+    activa = True
+
+    def __init__(self, sumidero=None):
+        self.sumidero = sumidero
+        # etapa -> [cantidad, total, mínimo, máximo] en segundos
+        self.tiempos = {}
+        self.contadores = Counter()
+
+    def medir(self, etapa):
+        return Cronometro(self, etapa)
+
+    def registrar(self, etapa, segundos):
+
+        tiempo = self.tiempos.get(etapa)
+        if tiempo is None:
+            self.tiempos[etapa] = [1, segundos, segundos, segundos]
+        else:
+            tiempo[0] += 1
+            tiempo[1] += segundos
+            tiempo[2] = min(tiempo[2], segundos)
+            tiempo[3] = max(tiempo[3], segundos)
+
+        if self.sumidero is not None:
+            self.sumidero.evento(etapa, segundos)
+
+    def contar(self, nombre, cantidad=1):
+        self.contadores[nombre] += cantidad
+
+    def resumen(self):
+
+        etapas = {}
+        for etapa, (cantidad, total, minimo, maximo) in self.tiempos.items():
+            etapas[etapa] = {'cantidad': cantidad, 'total': total, 'promedio': total / cantidad,
+                             'minimo': minimo, 'maximo': maximo}
+        return {'etapas': etapas, 'contadores': dict(self.contadores)}
+
+    def volcar(self):
+        if self.sumidero is not None:
+            self.sumidero.volcar(self.resumen())
+
+
+class SumideroJSONL:
+    """Eventos y resúmenes como líneas JSON, escritos en bloque al volcar"""
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.eventos = []
+
+    def evento(self, etapa, segundos):
+        self.eventos.append((time.time(), etapa, segundos))
+
+    def volcar(self, resumen):
+
+        with open(self.ruta, 'a', encoding='utf-8') as f:
+            for instante, etapa, segundos in self.eventos:
+                f.write(json.dumps({'tipo': 'tiempo', 'instante': instante, 'etapa': etapa,
+                                    'segundos': segundos}) + '\n')
+            f.write(json.dumps({'tipo': 'resumen', 'instante': time.time(), 'pid': os.getpid(), **resumen},
+                               ensure_ascii=False) + '\n')
+        self.eventos = []
+
+
+class SumideroPrometheus:
+    """
+    Reescribe el archivo con el resumen acumulado en el formato de texto de Prometheus. La
+    escritura es atómica (archivo temporal y reemplazo) para que el recolector nunca lea un
+    archivo a medias.
+    """
+    def __init__(self, ruta, prefijo='tokenizador', etiquetas=None):
+        self.ruta = ruta
+        self.prefijo = prefijo
+        # Etiquetas fijas agregadas a cada serie, por ejemplo el proceso trabajador
+        self.etiquetas = ''.join(f',{clave}="{valor}"' for clave, valor in (etiquetas or {}).items())
+
+    def evento(self, etapa, segundos):
+        pass
+
+    def volcar(self, resumen):
+
+        p = self.prefijo
+        fijas = self.etiquetas
+        extra = f'{{{fijas[1:]}}}' if fijas else ''
+        lineas = [f'# HELP {p}_etapa_segundos Tiempo acumulado por etapa del análisis',
+                  f'# TYPE {p}_etapa_segundos summary']
+        for etapa, tiempo in sorted(resumen['etapas'].items()):
+            lineas.append(f'{p}_etapa_segundos_sum{{etapa="{etapa}"{fijas}}} {tiempo["total"]:.9f}')
+            lineas.append(f'{p}_etapa_segundos_count{{etapa="{etapa}"{fijas}}} {tiempo["cantidad"]}')
+        lineas.append(f'# HELP {p}_etapa_segundos_max Duración máxima de una llamada por etapa')
+        lineas.append(f'# TYPE {p}_etapa_segundos_max gauge')
+        for etapa, tiempo in sorted(resumen['etapas'].items()):
+            lineas.append(f'{p}_etapa_segundos_max{{etapa="{etapa}"{fijas}}} {tiempo["maximo"]:.9f}')
+        for nombre, valor in sorted(resumen['contadores'].items()):
+            lineas.append(f'# TYPE {p}_{nombre}_total counter')
+            lineas.append(f'{p}_{nombre}_total{extra} {valor}')
+
+        temporal = f'{self.ruta}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lineas) + '\n')
+        os.replace(temporal, self.ruta)
+
+
+def crear_metricas(ruta=None, por_proceso=False):
+    """
+    Metricas según la extensión de la ruta: .prom para Prometheus, otra para JSON lines, None
+    solo en memoria. Con `por_proceso`, cada proceso escribe su propio archivo (ruta con el pid
+    antes de la extensión), como necesitan los trabajadores de lote.py.
+    """
+    if ruta is None:
+        return Metricas()
+
+    etiquetas = None
+    if por_proceso:
+        base, extension = os.path.splitext(ruta)
+        ruta = f'{base}.{os.getpid()}{extension}'
+        etiquetas = {'proceso': os.getpid()}
+
+    if ruta.endswith('.prom'):
+        return Metricas(SumideroPrometheus(ruta, etiquetas=etiquetas))
+    return Metricas(SumideroJSONL(ruta))
+
+
+def medido(etapa):
+    """Decorador de métodos de Tokenizador: mide la llamada solo si self.metricas está activa"""
+    def decorador(metodo):
+
+        @functools.wraps(metodo)
+        def envoltura(self, *args, **kwargs):
+            metricas = self.metricas
+            if not metricas.activa:
+                return metodo(self, *args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return metodo(self, *args, **kwargs)
+            finally:
+                metricas.registrar(etapa, time.perf_counter() - inicio)
+
+        return envoltura
+    return decorador
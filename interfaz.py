@@ -1,6 +1,8 @@
 import tkinter as tk
-from tkinter import scrolledtext, messagebox, filedialog
-from tokenizador import Tokenizador
+import queue
+import threading
+from tkinter import scrolledtext, messagebox, filedialog, ttk
+from tokenizador import Tokenizador, ProcesamientoCancelado
 
 class InterfazTokenizador:
     def __init__(self, root):
@@ -12,6 +14,14 @@ class InterfazTokenizador:
 
         # Crear instancia del tokenizador que implementa toda la funcionalidad del TP
         self.tokenizador = Tokenizador()
+
+        # El análisis corre en un hilo aparte; los mensajes vuelven al hilo de Tk por esta cola
+        self.cola = queue.Queue()
+        self.hilo = None
+        self.cancelacion = threading.Event()
+
+        # Los diálogos de palabras desconocidas se muestran sobre la ventana principal
+        self.tokenizador.resolutor_desconocidas = self.resolver_desde_hilo
         
         # Crear interfaz
         self.crear_interfaz()
@@ -54,11 +64,24 @@ class InterfazTokenizador:
         btn_ejemplo = tk.Button(btn_frame, text="Cargar ejemplo", command=self.cargar_ejemplo)
         btn_ejemplo.pack(side=tk.LEFT, padx=5)
         
-        btn_procesar = tk.Button(btn_frame, text="Procesar conversación", command=self.procesar_conversacion)
-        btn_procesar.pack(side=tk.LEFT, padx=5)
+        self.btn_procesar = tk.Button(btn_frame, text="Procesar conversación", command=self.procesar_conversacion)
+        self.btn_procesar.pack(side=tk.LEFT, padx=5)
+
+        self.btn_cancelar = tk.Button(btn_frame, text="Cancelar", command=self.cancelar, state=tk.DISABLED)
+        self.btn_cancelar.pack(side=tk.LEFT, padx=5)
         
         btn_limpiar = tk.Button(btn_frame, text="Limpiar", command=self.limpiar)
         btn_limpiar.pack(side=tk.LEFT, padx=5)
+
+        # Progreso del análisis en curso, por turno
+        progreso_frame = tk.Frame(main_frame)
+        progreso_frame.pack(fill=tk.X, pady=5)
+
+        self.barra_progreso = ttk.Progressbar(progreso_frame, mode='determinate')
+        self.barra_progreso.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+
+        self.lbl_progreso = tk.Label(progreso_frame, text="", width=20, anchor=tk.W)
+        self.lbl_progreso.pack(side=tk.LEFT, padx=5)
         
         # Frame para mostrar los resultados del análisis
         result_frame = tk.LabelFrame(main_frame, text="Resultados", padx=5, pady=5)
@@ -105,31 +128,121 @@ Agente: No se preocupe, ya estoy gestionando la eliminación del cargo. En unos
         if not conversacion.strip():
             messagebox.showwarning("Advertencia", "Por favor, ingrese una conversación para procesar")
             return
-        
-        try:
-            # 1. Tokenización de la conversación
-            # 2. Análisis de sentimiento
-            # 3. Verificación del protocolo de atención
-            resultados = self.tokenizador.procesar_conversacion(conversacion)
 
+        if self.hilo is not None:
+            return  # Ya hay un análisis en curso
+
+        # Traer palabras agregadas por otras instancias desde la última conversación
+        self.tokenizador.refrescar_palabras()
+
+        self.cancelacion.clear()
+        self.btn_procesar.config(state=tk.DISABLED)
+        self.btn_cancelar.config(state=tk.NORMAL)
+        self.barra_progreso['value'] = 0
+        self.lbl_progreso.config(text="Procesando...")
+
+        # 1. Tokenización de la conversación
+        # 2. Análisis de sentimiento
+        # 3. Verificación del protocolo de atención
+        self.hilo = threading.Thread(target=self.analizar_en_hilo, args=(conversacion,), daemon=True)
+        self.hilo.start()
+        self.root.after(50, self.revisar_cola)
+
+    def analizar_en_hilo(self, conversacion):
+
+        # Se ejecuta fuera del hilo de Tk: no toca widgets, solo encola mensajes
+        try:
+            resultados = self.tokenizador.procesar_conversacion(
+                conversacion,
+                progreso=lambda turno, total: self.cola.put(("progreso", turno, total)),
+                cancelar=self.cancelacion)
             reporte = self.tokenizador.generar_reporte(resultados)
-            
-            # Mostrar resultados en la interfaz
-            self.texto_resultados.delete(1.0, tk.END)
-            self.texto_resultados.insert(tk.END, reporte)
-            
-            # Mostrar mensaje de éxito con información de correcciones
-            if "correcciones_totales" in resultados and resultados["correcciones_totales"]:
-                num_correcciones = len(resultados["correcciones_totales"])
-                messagebox.showinfo("Procesamiento completado", 
-                                  f"Conversación procesada correctamente.\n"
-                                  f"Se realizaron {num_correcciones} corrección(es).\n"
-                                  f"Consulte el reporte para ver los detalles.")
-            else:
-                messagebox.showinfo("Éxito", "Conversación procesada correctamente")
-                
+            self.cola.put(("resultado", resultados, reporte))
+        except ProcesamientoCancelado:
+            self.cola.put(("cancelado",))
         except Exception as e:
-            messagebox.showerror("Error", f"Error al procesar la conversación: {str(e)}")
+            self.cola.put(("error", e))
+
+    def resolver_desde_hilo(self, palabra):
+
+        # Llamado desde el hilo de análisis: pide al hilo de Tk que muestre los diálogos
+        # sobre la ventana principal y espera la respuesta del operador
+        respuesta = {}
+        listo = threading.Event()
+        self.cola.put(("desconocida", palabra, respuesta, listo))
+        listo.wait()
+        return respuesta['resultado']
+
+    def revisar_cola(self):
+
+        try:
+            while True:
+                mensaje = self.cola.get_nowait()
+                tipo = mensaje[0]
+
+                if tipo == "progreso":
+                    _, turno, total = mensaje
+                    self.barra_progreso['maximum'] = total
+                    self.barra_progreso['value'] = turno
+                    self.lbl_progreso.config(text=f"Turno {turno} de {total}")
+
+                elif tipo == "desconocida":
+                    _, palabra, respuesta, listo = mensaje
+                    try:
+                        respuesta['resultado'] = self.tokenizador.mostrar_popup_palabra_desconocida(palabra, self.root)
+                    except Exception:
+                        respuesta['resultado'] = (None, False, None)
+                    finally:
+                        self.root.attributes('-topmost', False)
+                        listo.set()
+
+                elif tipo == "resultado":
+                    _, resultados, reporte = mensaje
+                    self.finalizar_analisis("Análisis completado")
+                    self.mostrar_resultados(resultados, reporte)
+                    return
+
+                elif tipo == "cancelado":
+                    self.finalizar_analisis("Análisis cancelado")
+                    return
+
+                elif tipo == "error":
+                    self.finalizar_analisis("Error")
+                    messagebox.showerror("Error", f"Error al procesar la conversación: {str(mensaje[1])}")
+                    return
+        except queue.Empty:
+            pass
+
+        self.root.after(50, self.revisar_cola)
+
+    def finalizar_analisis(self, estado):
+
+        self.hilo = None
+        self.btn_procesar.config(state=tk.NORMAL)
+        self.btn_cancelar.config(state=tk.DISABLED)
+        self.lbl_progreso.config(text=estado)
+
+    def cancelar(self):
+
+        # El hilo se detiene antes del próximo turno
+        self.cancelacion.set()
+        self.lbl_progreso.config(text="Cancelando...")
+
+    def mostrar_resultados(self, resultados, reporte):
+            
+        # Mostrar resultados en la interfaz
+        self.texto_resultados.delete(1.0, tk.END)
+        self.texto_resultados.insert(tk.END, reporte)
+        
+        # Mostrar mensaje de éxito con información de correcciones
+        if "correcciones_totales" in resultados and resultados["correcciones_totales"]:
+            num_correcciones = len(resultados["correcciones_totales"])
+            messagebox.showinfo("Procesamiento completado", 
+                              f"Conversación procesada correctamente.\n"
+                              f"Se realizaron {num_correcciones} corrección(es).\n"
+                              f"Consulte el reporte para ver los detalles.")
+        else:
+            messagebox.showinfo("Éxito", "Conversación procesada correctamente")
     
     def limpiar(self):
         """Limpia los campos de texto"""
@@ -0,0 +1,45 @@
+class TrieFrases:
+    """
+    Trie por palabras de los lexemas de varias palabras ("no funciona", "buenos días").
+
+    Cada nodo es un diccionario palabra -> nodo hijo; la clave None guarda el lexema que termina
+    en ese nodo. Desde una posición de la secuencia de palabras se baja por el trie hasta donde
+    se pueda y se devuelve la coincidencia más larga, así que toda la secuencia se recorre una
+    sola vez y cada paso cuesta a lo sumo el largo de la frase más larga.
+    """
+    def __init__(self, frases=()):
+        self.raiz = {}
+        self.cantidad = 0
+        for frase in frases:
+            self.agregar(frase)
+
+    def __len__(self):
+        return self.cantidad
+
+    def agregar(self, frase, palabras=None):
+        """
+        Agrega un lexema de varias palabras; el lexema se guarda tal cual es clave del léxico.
+        `palabras` son las claves del camino (por defecto frase.split()), por ejemplo sin tildes.
+        """
+        nodo = self.raiz
+        for palabra in (palabras if palabras is not None else frase.split()):
+            nodo = nodo.setdefault(palabra, {})
+        if None not in nodo:
+            self.cantidad += 1
+        nodo[None] = frase
+
+    def buscar(self, palabras, inicio):
+        """(largo, frase) de la frase más larga que empieza en palabras[inicio], o (0, None)"""
+        nodo = self.raiz
+        largo, frase = 0, None
+        for i in range(inicio, len(palabras)):
+            nodo = nodo.get(palabras[i])
+            if nodo is None:
+                break
+            if None in nodo:
+                largo, frase = i - inicio + 1, nodo[None]
+        return largo, frase
+
+
+def es_compuesto(lexema):
+    return len(lexema.split()) > 1
@@ -0,0 +1,62 @@
+from collections import deque
+
+
+class LineaTiempoSentimiento:
+    """
+    Serie de sentimiento turno por turno, por hablante.
+
+    Se alimenta con la puntuación de cada turno a medida que se tokeniza, así que no hace falta
+    volver a recorrer los tokens: mantiene el acumulado general, el acumulado de cada hablante y
+    un promedio móvil de los últimos `ventana` turnos de cada hablante.
+
+    Con `guardar_turnos=False` no se guarda la serie completa, solo los valores corrientes y el
+    punto más bajo de cada hablante, así el estado no crece con el largo de la llamada.
+    """
+    def __init__(self, ventana=3, guardar_turnos=True):
+        self.ventana = ventana
+        self.guardar_turnos = guardar_turnos
+        self.turnos = []
+        self.acumulado = 0
+        self.acumulado_hablante = {}
+        self.recientes = {}
+        self.suma_recientes = {}
+        self.minimos = {}
+
+    def agregar(self, turno, hablante, puntuacion):
+
+        self.acumulado += puntuacion
+        self.acumulado_hablante[hablante] = self.acumulado_hablante.get(hablante, 0) + puntuacion
+
+        recientes = self.recientes.setdefault(hablante, deque())
+        recientes.append(puntuacion)
+        self.suma_recientes[hablante] = self.suma_recientes.get(hablante, 0) + puntuacion
+        if len(recientes) > self.ventana:
+            self.suma_recientes[hablante] -= recientes.popleft()
+
+        punto = {
+            'turno': turno,
+            'hablante': hablante,
+            'puntuacion': puntuacion,
+            'acumulado': self.acumulado,
+            'acumulado_hablante': self.acumulado_hablante[hablante],
+            'movil_hablante': self.suma_recientes[hablante] / len(recientes)
+        }
+        if self.guardar_turnos:
+            self.turnos.append(punto)
+        minimo = self.minimos.get(hablante)
+        if minimo is None or punto['acumulado_hablante'] < minimo['acumulado_hablante']:
+            self.minimos[hablante] = punto
+        return punto
+
+    def punto_mas_bajo(self, hablante):
+        """El turno donde el acumulado del hablante llegó a su mínimo (el primero si se repite), o None"""
+        return self.minimos.get(hablante)
+
+    def resumen(self):
+
+        return {
+            'ventana': self.ventana,
+            'turnos': self.turnos,
+            'acumulado_por_hablante': dict(self.acumulado_hablante),
+            'punto_mas_bajo': {hablante: self.punto_mas_bajo(hablante) for hablante in self.acumulado_hablante}
+        }
@@ -0,0 +1,97 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from instrumentacion import crear_metricas
+from motor import Tokenizador
+
+# Tokenizador propio de cada proceso trabajador: el léxico se carga una sola vez por proceso
+tokenizador_trabajador = None
+
+
+def inicializar_trabajador(ruta_bd, opciones):
+
+    global tokenizador_trabajador
+    # Las métricas no se pasan entre procesos: cada trabajador crea las suyas con su propio archivo
+    opciones = dict(opciones)
+    ruta_metricas = opciones.pop('ruta_metricas', None)
+    if ruta_metricas:
+        opciones['metricas'] = crear_metricas(ruta_metricas, por_proceso=True)
+    tokenizador_trabajador = Tokenizador(ruta_bd, interactivo=False, verboso=False, **opciones)
+
+
+def leer_conversacion(entrada):
+    """Las entradas pueden ser rutas a archivos de texto o directamente el texto de la conversación"""
+    if os.path.isfile(entrada):
+        with open(entrada, 'r', encoding='utf-8') as f:
+            return f.read()
+    return entrada
+
+
+def procesar_en_trabajador(indice, entrada):
+    """Un error en una conversación (archivo ilegible, texto inesperado...) no corta el lote: vuelve como resultado"""
+    try:
+        conversacion = leer_conversacion(entrada)
+        # Consulta barata de la versión del léxico: solo trae filas si otro proceso lo modificó
+        tokenizador_trabajador.refrescar_palabras()
+        return indice, tokenizador_trabajador.procesar_conversacion(conversacion)
+    except Exception as error:
+        return indice, {'error': f'{type(error).__name__}: {error}'}
+
+
+def iterar_lote(entradas, workers=None, ruta_bd='tokenizador.db', en_orden=True, en_vuelo=None, **opciones):
+    """
+    Procesa conversaciones en un pool de procesos y va devolviendo tuplas (indice, resultados).
+    Si una conversación falla, sus resultados son {'error': 'Tipo: mensaje'} y el lote sigue.
+
+    Con en_orden=True los resultados salen en el orden de las entradas; con en_orden=False salen
+    a medida que terminan. Solo se mantienen `en_vuelo` conversaciones enviadas a la vez, así que
+    `entradas` puede ser un generador arbitrariamente largo sin cargarlo entero en memoria.
+    """
+    workers = workers or os.cpu_count() or 1
+    en_vuelo = en_vuelo or workers * 4
+    entradas = enumerate(entradas)
+
+    with ProcessPoolExecutor(workers, initializer=inicializar_trabajador,
+                             initargs=(ruta_bd, opciones)) as executor:
+
+        def enviar_siguiente():
+            for indice, entrada in entradas:
+                return executor.submit(procesar_en_trabajador, indice, entrada)
+            return None
+
+        if en_orden:
+            # Cola FIFO de futuros: se espera siempre al más antiguo
+            pendientes = deque()
+            for _ in range(en_vuelo):
+                futuro = enviar_siguiente()
+                if futuro is None:
+                    break
+                pendientes.append(futuro)
+
+            while pendientes:
+                resultado = pendientes.popleft().result()
+                futuro = enviar_siguiente()
+                if futuro is not None:
+                    pendientes.append(futuro)
+                yield resultado
+        else:
+            pendientes = set()
+            for _ in range(en_vuelo):
+                futuro = enviar_siguiente()
+                if futuro is None:
+                    break
+                pendientes.add(futuro)
+
+            while pendientes:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for terminado in terminados:
+                    futuro = enviar_siguiente()
+                    if futuro is not None:
+                        pendientes.add(futuro)
+                    yield terminado.result()
+
+
+def procesar_lote(entradas, workers=None, ruta_bd='tokenizador.db', **opciones):
+    """Procesa todas las conversaciones en paralelo y devuelve sus resultados en el orden de entrada"""
+    return [resultados for _, resultados in iterar_lote(entradas, workers, ruta_bd, **opciones)]
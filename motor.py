@@ -0,0 +1,1339 @@
+"""
+Motor de análisis: léxico, tokenización, sentimiento, protocolo y reporte.
+
+No importa tkinter ni NumPy al cargarse, así que los procesos trabajadores y los servidores sin
+entorno gráfico pueden usarlo. Los diálogos del modo interactivo (dialogos.py) y los módulos
+que dependen de NumPy (distancias_vectorizadas.py, columnar.py) se importan recién la primera
+vez que se necesitan.
+"""
+import sqlite3
+import re
+import os
+import csv
+import hashlib
+import io
+import json
+from collections import defaultdict, Counter
+from conexion_sqlite import conectar
+from indice_difuso import ArbolBK, CacheSugerencias
+from aho_corasick import AutomataFrases
+from bisect import bisect_right
+from instantanea import LexicoInstantanea, LexicoSuperpuesto
+from instrumentacion import METRICAS_NULAS, medido
+from lexemas_compuestos import TrieFrases, es_compuesto
+from linea_tiempo import LineaTiempoSentimiento
+from reporte import crear_renderizador
+
+# Patrones compilados una sola vez por proceso
+PATRON_PALABRA = re.compile(r'\b\w+\b')
+PATRON_HABLANTE = re.compile(r'(Agente|Cliente):')
+
+# Plegado de tildes y diéresis para comparar "cuénteme" con "cuenteme"; la ñ se conserva
+# porque distingue palabras ("año" y "ano")
+PLEGADO_ACENTOS = str.maketrans('áéíóúüàèìòù', 'aeiouuaeiou')
+
+
+class ProcesamientoCancelado(Exception):
+    """Se lanza cuando se cancela el procesamiento de una conversación entre turnos"""
+
+
+class Tokenizador:
+    """
+    CLASE PRINCIPAL QUE IMPLEMENTA EL SISTEMA COMPLETO DEL TRABAJO PRÁCTICO
+    """
+    def __init__(self, ruta_bd='tokenizador.db', interactivo=True, umbral_autocorreccion=None, verboso=True,
+                 indice_sugerencias='bk', instantanea=None, capacidad_cache=10000, metricas=None,
+                 plegar_acentos=False, ventana_sentimiento=3, cache_resultados=None):
+        self.ruta_bd = ruta_bd
+
+        # Caché en disco de resultados completos por transcripción (ver cache_resultados.py):
+        # una ruta o una CacheResultados ya creada. Solo se usa en modo no interactivo
+        if isinstance(cache_resultados, str):
+            from cache_resultados import CacheResultados
+            cache_resultados = CacheResultados(cache_resultados)
+        self.cache_resultados = cache_resultados
+
+        # Turnos de cada hablante que promedia la línea de tiempo de sentimiento
+        self.ventana_sentimiento = ventana_sentimiento
+
+        # Con plegar_acentos, una palabra que no está tal cual en el léxico se busca también sin
+        # tildes ("cuenteme" encuentra "cuénteme" y viceversa)
+        self.plegar_acentos = plegar_acentos
+        self.plegadas = {}
+
+        # Lexemas de varias palabras ("no funciona"), reconocidos como un solo token
+        self.frases_lexico = TrieFrases()
+
+        # Tiempos por etapa y contadores (ver instrumentacion.py); apagados por defecto
+        self.metricas = metricas or METRICAS_NULAS
+
+        # Caché LRU de sugerencias por palabra, corregida al agregar lexemas
+        self.cache_sugerencias = CacheSugerencias(capacidad_cache)
+
+        # Ruta opcional a una instantánea binaria del léxico (ver instantanea.py) que reemplaza
+        # la carga completa desde SQLite; los cambios posteriores se traen de la base
+        self.instantanea = instantanea
+
+        # Estructura para las sugerencias: 'bk' (árbol BK) o 'numpy' (distancias vectorizadas)
+        self.indice_sugerencias = indice_sugerencias
+
+        # Modo interactivo: las palabras desconocidas se consultan al operador con diálogos Tk.
+        # Modo no interactivo: se marcan como "desconocido" (o se autocorrigen si la mejor
+        # sugerencia está dentro del umbral) y se encolan para revisión posterior.
+        self.interactivo = interactivo
+        self.umbral_autocorreccion = umbral_autocorreccion
+        self.verboso = verboso
+
+        # Función opcional palabra -> (palabra_final, procesada, correccion_info) para resolver
+        # palabras desconocidas en modo interactivo sin crear ventanas Tk propias (la usa la
+        # interfaz para mostrar los diálogos en su ventana principal desde otro hilo)
+        self.resolutor_desconocidas = None
+
+        # Decisiones del operador sobre palabras desconocidas durante la corrida actual:
+        # palabra -> (palabra_final, procesada, correccion_info). Evita preguntar dos veces y se
+        # descartan al terminar la corrida (procesar_conversacion(es) o la llamada en vivo)
+        self.decisiones_sesion = {}
+
+        # Palabras desconocidas de la sesión pendientes de guardar: palabra -> [frecuencia, contexto]
+        self.pendientes_sesion = {}
+
+        # Conexión a SQLite de larga duración, abierta en la primera consulta
+        self.conn = None
+
+        # Inicializar la base de datos para almacenar lexemas y tokens
+        self.inicializar_bd()
+        
+        # Cargar palabras desde la base de datos
+        self.cargar_palabras()
+        
+        # Definir categorías de tokens para el protocolo de atención al cliente
+        self.categorias_protocolo = {
+            'saludo': ['hola', 'buenos días', 'buenas tardes', 'buenas noches', 'bienvenido'],
+            'identificacion': ['nombre', 'con quién', 'con quien', 'identificarse', 'quién es', 'quien es'],
+            'palabras_prohibidas': ['inútil', 'tonto', 'estúpido', 'idiota', 'molesto', 'incompetente'],
+            'despedida': ['gracias', 'adiós', 'hasta luego', 'que tenga', 'buen día', 'buenas tardes']
+        }
+        self.compilar_protocolo()
+
+    def compilar_protocolo(self):
+
+        # Debe volver a llamarse si se modifican las frases de categorias_protocolo
+        self.automata_protocolo = AutomataFrases.desde_categorias(self.categorias_protocolo)
+        # Huella de las frases, parte de la clave de la caché de resultados
+        self.version_protocolo = hashlib.sha1(
+            json.dumps(self.categorias_protocolo, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    def conexion(self):
+
+        if self.conn is None:
+            self.conn = conectar(self.ruta_bd)
+        return self.conn
+
+    def cerrar(self):
+
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+        if self.cache_resultados is not None:
+            self.cache_resultados.cerrar()
+        # La instantánea no se vuelve a mapear: a diferencia de la conexión, después de esto el
+        # léxico ya no se puede consultar
+        if isinstance(self.palabras, LexicoSuperpuesto):
+            self.palabras.base.close()
+
+    def inicializar_bd(self):
+
+        if not os.path.exists(self.ruta_bd):
+            conn = self.conexion()
+            cursor = conn.cursor()
+            
+            # Crear tabla de palabras con lexema, token y puntuación
+            cursor.execute('''
+            CREATE TABLE palabras (
+                id INTEGER PRIMARY KEY,
+                lexema TEXT UNIQUE,
+                token TEXT,
+                puntuacion INTEGER
+            )
+            ''')
+            
+            # Insertar palabras iniciales con sus puntuaciones para análisis de sentimiento
+            palabras_iniciales = [
+                ('bueno', 'positivo', 1),
+                ('amable', 'positivo', 2),
+                ('problema', 'negativo', -1),
+                ('mal', 'negativo', -2),
+                ('excelente', 'positivo', 3),
+                ('fatal', 'negativo', -3),
+                ('hola', 'saludo', 1),
+                ('bienvenido', 'saludo', 1),
+                ('gracias', 'despedida', 1),
+                ('nombre', 'identificacion', 0),
+                ('inútil', 'prohibida', -3),
+                ('tonto', 'prohibida', -3),
+                ('al', 'articulo', 0),
+                ('el', 'articulo', 0),
+                ('la', 'articulo', 0),
+                ('de', 'preposicion', 0),
+                ('en', 'preposicion', 0),
+                ('con', 'preposicion', 0),
+                # Lexemas de varias palabras: se reconocen como un solo token
+                ('no funciona', 'negativo', -2),
+                ('buenos días', 'saludo', 1),
+                ('hasta luego', 'despedida', 1)
+            ]
+            
+            cursor.executemany('INSERT INTO palabras (lexema, token, puntuacion) VALUES (?, ?, ?)', 
+                              palabras_iniciales)
+            
+            conn.commit()
+            if self.verboso:
+                print("Base de datos inicializada con palabras de ejemplo.")
+
+        # Tablas auxiliares y migraciones: BEGIN IMMEDIATE serializa a los procesos que arrancan a la vez
+        conn = self.conexion()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Cola de revisión de palabras desconocidas encontradas en modo no interactivo
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS pendientes (
+                id INTEGER PRIMARY KEY,
+                palabra TEXT UNIQUE,
+                frecuencia INTEGER,
+                contexto TEXT
+            )
+            ''')
+            self.migrar_versiones(conn)
+            self.migrar_correcciones(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def migrar_versiones(self, conn):
+
+        # Contador global de versión del léxico: cada alta, cambio o baja en palabras lo incrementa
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor INTEGER)')
+        conn.execute("INSERT OR IGNORE INTO meta (clave, valor) VALUES ('version_lexico', 0)")
+
+        columnas = {fila[1] for fila in conn.execute('PRAGMA table_info(palabras)')}
+        if 'version' not in columnas:
+            conn.execute('ALTER TABLE palabras ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        if 'actualizado_en' not in columnas:
+            conn.execute('ALTER TABLE palabras ADD COLUMN actualizado_en TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_palabras_version ON palabras (version)')
+
+        # Las bajas (y los lexemas renombrados) quedan registradas para que los demás procesos las vean
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS palabras_borradas (
+            lexema TEXT,
+            version INTEGER
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_palabras_borradas_version ON palabras_borradas (version)')
+
+        # Los triggers mantienen la versión aunque la base la modifique otro programa
+        # (executescript haría COMMIT de la transacción en curso, así que van de a uno)
+        for trigger in (
+            '''
+            CREATE TRIGGER IF NOT EXISTS palabras_version_alta AFTER INSERT ON palabras
+            BEGIN
+                UPDATE meta SET valor = valor + 1 WHERE clave = 'version_lexico';
+                UPDATE palabras SET version = (SELECT valor FROM meta WHERE clave = 'version_lexico'),
+                    actualizado_en = CURRENT_TIMESTAMP
+                    WHERE id = NEW.id;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS palabras_version_cambio AFTER UPDATE OF lexema, token, puntuacion ON palabras
+            BEGIN
+                UPDATE meta SET valor = valor + 1 WHERE clave = 'version_lexico';
+                INSERT INTO palabras_borradas (lexema, version)
+                    SELECT OLD.lexema, valor FROM meta WHERE clave = 'version_lexico' AND OLD.lexema <> NEW.lexema;
+                UPDATE palabras SET version = (SELECT valor FROM meta WHERE clave = 'version_lexico'),
+                    actualizado_en = CURRENT_TIMESTAMP
+                    WHERE id = NEW.id;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS palabras_version_baja AFTER DELETE ON palabras
+            BEGIN
+                UPDATE meta SET valor = valor + 1 WHERE clave = 'version_lexico';
+                INSERT INTO palabras_borradas (lexema, version)
+                    SELECT OLD.lexema, valor FROM meta WHERE clave = 'version_lexico';
+            END
+            '''
+        ):
+            conn.execute(trigger)
+
+    def migrar_correcciones(self, conn):
+
+        # Memoria de correcciones: errores ya corregidos por un operador -> lexema correcto.
+        # Comparte el contador de versión del léxico para que refrescar_palabras también las traiga
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS correcciones (
+            id INTEGER PRIMARY KEY,
+            alias TEXT UNIQUE,
+            lexema TEXT,
+            aciertos INTEGER NOT NULL DEFAULT 0,
+            version INTEGER NOT NULL DEFAULT 0,
+            actualizado_en TEXT
+        )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_correcciones_version ON correcciones (version)')
+
+        # Los aciertos cambian seguido y no afectan a las decisiones: no cambian la versión
+        for trigger in (
+            '''
+            CREATE TRIGGER IF NOT EXISTS correcciones_version_alta AFTER INSERT ON correcciones
+            BEGIN
+                UPDATE meta SET valor = valor + 1 WHERE clave = 'version_lexico';
+                UPDATE correcciones SET version = (SELECT valor FROM meta WHERE clave = 'version_lexico'),
+                    actualizado_en = CURRENT_TIMESTAMP
+                    WHERE id = NEW.id;
+            END
+            ''',
+            '''
+            CREATE TRIGGER IF NOT EXISTS correcciones_version_cambio AFTER UPDATE OF alias, lexema ON correcciones
+            BEGIN
+                UPDATE meta SET valor = valor + 1 WHERE clave = 'version_lexico';
+                UPDATE correcciones SET version = (SELECT valor FROM meta WHERE clave = 'version_lexico'),
+                    actualizado_en = CURRENT_TIMESTAMP
+                    WHERE id = NEW.id;
+            END
+            '''
+        ):
+            conn.execute(trigger)
+
+    def leer_version_lexico(self):
+        return self.conexion().execute("SELECT valor FROM meta WHERE clave = 'version_lexico'").fetchone()[0]
+    
+    def cargar_alias(self):
+
+        # alias (palabra mal escrita) -> lexema; aciertos acumulados todavía no guardados
+        self.alias = {}
+        self.aciertos_alias = Counter()
+        for alias, lexema in self.conexion().execute('SELECT alias, lexema FROM correcciones'):
+            self.alias[alias] = lexema
+
+    def cargar_palabras(self):
+
+        self.cargar_alias()
+
+        if self.instantanea:
+            base = LexicoInstantanea(self.instantanea)
+            self.palabras = LexicoSuperpuesto(base)
+            self.version_lexico = base.version_lexico
+            self.indice = None
+            self.cache_sugerencias.invalidar()
+            self.indexar_lexico()
+            # Traer lo que haya cambiado en la base desde que se exportó la instantánea
+            self.refrescar_palabras()
+            if self.verboso:
+                print(f"Se cargaron {len(self.palabras)} palabras desde la instantánea {self.instantanea}.")
+            return
+
+        # La versión se lee antes que las filas: si otro proceso escribe en el medio, el próximo
+        # refresco vuelve a traer esos cambios en lugar de perderlos
+        self.version_lexico = self.leer_version_lexico()
+
+        self.palabras = {}
+        cursor = self.conexion().cursor()
+        cursor.execute('SELECT lexema, token, puntuacion FROM palabras')
+        for lexema, token, puntuacion in cursor:
+            self.palabras[lexema.lower()] = (token, puntuacion)
+
+        # El índice de búsqueda aproximada se construye recién en la primera sugerencia
+        self.indice = None
+        self.cache_sugerencias.invalidar()
+        self.indexar_lexico()
+
+        if self.verboso:
+            print(f"Se cargaron {len(self.palabras)} palabras de la base de datos.")
+    
+    def refrescar_palabras(self):
+        """
+        Trae solo los cambios del léxico hechos (por este u otro proceso) desde la última
+        sincronización. Devuelve la cantidad de lexemas actualizados o eliminados.
+        """
+        conn = self.conexion()
+        version = self.leer_version_lexico()
+        if version == self.version_lexico:
+            return 0
+
+        cambios = 0
+        nuevas = []
+        bajas = False
+        for lexema, token, puntuacion in conn.execute(
+                'SELECT lexema, token, puntuacion FROM palabras WHERE version > ? ORDER BY id', (self.version_lexico,)):
+            clave = lexema.lower()
+            if clave not in self.palabras:
+                nuevas.append(clave)
+            self.palabras[clave] = (token, puntuacion)
+            cambios += 1
+
+        borradas = [lexema.lower() for lexema, in conn.execute(
+            'SELECT lexema FROM palabras_borradas WHERE version > ? ORDER BY version', (self.version_lexico,))]
+        vigentes = {lexema.lower() for lexema, in conn.execute(
+            'SELECT lexema FROM palabras WHERE version > ?', (self.version_lexico,))} if borradas else set()
+        for clave in borradas:
+            # Un lexema borrado y vuelto a agregar después sigue vigente
+            if clave in self.palabras and clave not in vigentes:
+                del self.palabras[clave]
+                cambios += 1
+                bajas = True
+                # Los índices no admiten bajas: se reconstruyen en la próxima sugerencia
+                self.indice = None
+                self.cache_sugerencias.invalidar()
+
+        if bajas:
+            self.indexar_lexico()
+        self.notificar_lexemas_nuevos(nuevas)
+
+        for alias, lexema in conn.execute(
+                'SELECT alias, lexema FROM correcciones WHERE version > ?', (self.version_lexico,)):
+            self.alias[alias] = lexema
+            cambios += 1
+
+        self.version_lexico = version
+        if self.verboso and cambios:
+            print(f"Se actualizaron {cambios} palabras desde la base de datos (versión {version}).")
+        return cambios
+
+    @medido('agregar_palabra')
+    def agregar_palabra(self, lexema, token, puntuacion):
+
+        conn = self.conexion()
+        try:
+            with conn:
+                conn.execute('INSERT INTO palabras (lexema, token, puntuacion) VALUES (?, ?, ?)',
+                             (lexema, token, puntuacion))
+            clave = lexema.lower()
+            nueva = clave not in self.palabras
+            self.palabras[clave] = (token, puntuacion)
+            if nueva:
+                self.notificar_lexemas_nuevos([clave])
+            if self.verboso:
+                print(f"Palabra '{lexema}' agregada con token '{token}' y puntuación {puntuacion}")
+            return True
+        except sqlite3.IntegrityError:
+            if self.verboso:
+                print(f"La palabra '{lexema}' ya existe en la base de datos")
+            return False
+
+    @medido('agregar_palabras')
+    def agregar_palabras(self, palabras, tamanio_lote=5000):
+        """
+        Agrega muchas palabras (lexema, token, puntuacion) en transacciones por lotes. Las que ya
+        existen se ignoran. Devuelve la cantidad de palabras nuevas.
+        """
+        conn = self.conexion()
+        agregadas = 0
+        lote = {}
+
+        def escribir(lote):
+            with conn:
+                cursor = conn.executemany('INSERT OR IGNORE INTO palabras (lexema, token, puntuacion) VALUES (?, ?, ?)',
+                                          lote.values())
+                # Las filas ignoradas (el lexema ya estaba, por ejemplo agregado por otro proceso)
+                # conservan sus valores: se releen en lugar de confiar en los del lote
+                lexemas = [lexema for lexema, _, _ in lote.values()]
+                guardadas = []
+                for i in range(0, len(lexemas), 500):
+                    parte = lexemas[i:i + 500]
+                    guardadas.extend(conn.execute(
+                        f"SELECT lexema, token, puntuacion FROM palabras WHERE lexema IN ({','.join('?' * len(parte))})",
+                        parte))
+            nuevas = []
+            for lexema, token, puntuacion in guardadas:
+                clave = lexema.lower()
+                if clave not in self.palabras:
+                    nuevas.append(clave)
+                self.palabras[clave] = (token, puntuacion)
+            self.notificar_lexemas_nuevos(nuevas)
+            # rowcount no incluye las filas que modifican los triggers de versión
+            return cursor.rowcount
+
+        for lexema, token, puntuacion in palabras:
+            # Saltear las que ya están en memoria y las repetidas dentro del mismo lote
+            clave = lexema.lower()
+            if clave in self.palabras or clave in lote:
+                continue
+            lote[clave] = (lexema, token, int(puntuacion))
+            if len(lote) >= tamanio_lote:
+                agregadas += escribir(lote)
+                lote = {}
+
+        if lote:
+            agregadas += escribir(lote)
+
+        if self.verboso:
+            print(f"Se agregaron {agregadas} palabras nuevas a la base de datos.")
+        return agregadas
+
+    def importar_csv(self, ruta, delimitador=',', tamanio_lote=5000):
+        """Importa un léxico desde un CSV con columnas lexema, token, puntuacion (encabezado opcional)"""
+        with open(ruta, 'r', encoding='utf-8', newline='') as f:
+            filas = csv.reader(f, delimiter=delimitador)
+
+            def palabras():
+                for numero, fila in enumerate(filas):
+                    if len(fila) < 3 or not fila[0].strip():
+                        continue
+                    lexema, token, puntuacion = (campo.strip() for campo in fila[:3])
+                    try:
+                        yield lexema, token, int(puntuacion)
+                    except ValueError:
+                        if numero > 0:
+                            raise ValueError(f"Puntuación inválida en la fila {numero + 1} de {ruta}: {puntuacion!r}")
+                        # Primera fila no numérica: encabezado
+
+            return self.agregar_palabras(palabras(), tamanio_lote)
+    
+    def distancia_levenshtein(self, s1, s2):
+
+        if len(s1) < len(s2):
+            return self.distancia_levenshtein(s2, s1)
+        
+        if len(s2) == 0:
+            return len(s1)
+        
+        previous_row = range(len(s2) + 1)
+        for i, c1 in enumerate(s1):
+            current_row = [i + 1]
+            for j, c2 in enumerate(s2):
+                insertions = previous_row[j + 1] + 1
+                deletions = current_row[j] + 1
+                substitutions = previous_row[j] + (c1 != c2)
+                current_row.append(min(insertions, deletions, substitutions))
+            previous_row = current_row
+        
+        return previous_row[-1]
+    
+    def distancia_hamming(self, s1, s2):
+
+        # Igualar longitudes añadiendo espacios (como especifica el TP)
+        if len(s1) < len(s2):
+            s1 = s1 + ' ' * (len(s2) - len(s1))
+        elif len(s2) < len(s1):
+            s2 = s2 + ' ' * (len(s1) - len(s2))
+        
+        # Calcular distancia
+        return sum(ch1 != ch2 for ch1, ch2 in zip(s1, s2))
+    
+    def notificar_lexemas_nuevos(self, lexemas, maximo_parches=100):
+
+        for lexema in lexemas:
+            self.indexar_lexema(lexema)
+
+        # Los lexemas de varias palabras no participan de las sugerencias aproximadas
+        lexemas = [lexema for lexema in lexemas if not es_compuesto(lexema)]
+        if not lexemas:
+            return
+        if self.indice is not None:
+            self.indice.agregar_varios(lexemas)
+
+        # Pocas altas: corregir las entradas de la caché; muchas: es más barato vaciarla
+        if len(lexemas) > maximo_parches:
+            self.cache_sugerencias.invalidar()
+            return
+        distancia = lambda s1, s2: min(self.distancia_levenshtein(s1, s2), self.distancia_hamming(s1, s2))
+        for lexema in lexemas:
+            self.cache_sugerencias.agregar_lexema(lexema, distancia)
+
+    def indexar_lexico(self):
+
+        # Estructuras que usa tokenizar además del diccionario: el trie de lexemas de varias
+        # palabras y, con plegar_acentos, forma sin tildes -> lexema (solo los que cambian)
+        self.frases_lexico = TrieFrases()
+        self.plegadas = {}
+
+        if self.plegar_acentos:
+            for lexema in self.palabras:
+                self.indexar_lexema(lexema)
+        elif isinstance(self.palabras, LexicoSuperpuesto):
+            # Sin plegado alcanza con los compuestos, que la instantánea encuentra sin decodificar todo
+            for lexema in self.palabras.compuestos():
+                self.frases_lexico.agregar(lexema)
+        else:
+            for lexema in self.palabras:
+                if ' ' in lexema and es_compuesto(lexema):
+                    self.frases_lexico.agregar(lexema)
+
+    def indexar_lexema(self, lexema):
+
+        if es_compuesto(lexema):
+            # Con plegado, el trie se recorre sin tildes: "buenos dias" encuentra "buenos días"
+            if self.plegar_acentos:
+                self.frases_lexico.agregar(lexema, lexema.translate(PLEGADO_ACENTOS).split())
+            else:
+                self.frases_lexico.agregar(lexema)
+        if self.plegar_acentos:
+            plegada = lexema.translate(PLEGADO_ACENTOS)
+            if plegada != lexema:
+                self.plegadas.setdefault(plegada, lexema)
+
+    def clave_lexico(self, palabra):
+        """Clave del léxico para una palabra ya en minúsculas, o None si no está"""
+        if palabra in self.palabras:
+            return palabra
+        if self.plegar_acentos:
+            plegada = palabra.translate(PLEGADO_ACENTOS)
+            if plegada in self.palabras:
+                return plegada
+            return self.plegadas.get(plegada)
+        return None
+
+    def construir_indice(self):
+
+        # Reconstruir implica que el léxico cambió por fuera de las altas incrementales
+        self.cache_sugerencias.invalidar()
+        simples = (lexema for lexema in self.palabras if not es_compuesto(lexema))
+        if self.indice_sugerencias == 'numpy':
+            from distancias_vectorizadas import MotorDistancias
+            self.indice = MotorDistancias(simples)
+            return
+
+        # Con lexemas de una sola palabra la distancia de Hamming con relleno nunca es menor
+        # que la de Levenshtein, así que el índice usa solo Levenshtein (que sí es una métrica)
+        self.indice = ArbolBK(self.distancia_levenshtein)
+        for lexema in simples:
+            self.indice.agregar(lexema)
+
+    @medido('sugerir_palabras_similares')
+    def sugerir_con_distancias(self, palabra):
+
+        palabra = palabra.lower()
+        sugerencias = self.cache_sugerencias.obtener(palabra)
+        if sugerencias is not None:
+            return sugerencias
+
+        if self.indice is None:
+            self.construir_indice()
+
+        # Mismas sugerencias y orden que el recorrido lineal, visitando solo parte del léxico
+        sugerencias = self.indice.buscar(palabra, 2)[:5]
+        self.cache_sugerencias.guardar(palabra, sugerencias)
+        return sugerencias
+
+    def sugerir_palabras_similares(self, palabra):
+        return [lexema for _, lexema in self.sugerir_con_distancias(palabra)]
+
+    def sugerir_palabras_similares_lineal(self, palabra):
+
+        sugerencias = []
+        
+        for lexema in self.palabras.keys():
+            if es_compuesto(lexema):
+                continue  # Las frases del léxico no se sugieren como corrección de una palabra
+
+            # Calcular ambas distancias como especifica el TP
+            dist_lev = self.distancia_levenshtein(palabra.lower(), lexema.lower())
+            dist_ham = self.distancia_hamming(palabra.lower(), lexema.lower())
+            
+            # Usar el mínimo de ambas distancias
+            dist = min(dist_lev, dist_ham)
+            
+            # Si la distancia es pequeña, agregar a sugerencias
+            if dist <= 2:  # Umbral ajustable
+                sugerencias.append((lexema, dist))
+        
+        # Ordenar por distancia (menor primero)
+        sugerencias.sort(key=lambda x: x[1])
+        
+        # Devolver hasta 5 sugerencias
+        return [s[0] for s in sugerencias[:5]]
+    
+    def procesar_palabra_con_sugerencia(self, palabra_seleccionada, root):
+
+        from dialogos import TokenDialog, pedir_puntuacion
+
+        # Obtener tokens disponibles
+        tokens_disponibles = set(token for token, _ in self.palabras.values())
+        
+        # Crear y mostrar diálogo para asignar token
+        token_dialog = TokenDialog(root, "Asignar token", 
+                        f"¿A qué token pertenece '{palabra_seleccionada}'?\nSeleccione uno existente o escriba uno nuevo:",
+                        tokens_disponibles)
+        root.wait_window(token_dialog)
+        
+        token = token_dialog.result
+        
+        if token:
+            # Pedir puntuación para análisis de sentimiento
+            puntuacion = pedir_puntuacion(palabra_seleccionada, root)
+            
+            if puntuacion is not None:
+                # Agregar palabra a la base de datos
+                self.agregar_palabra(palabra_seleccionada, token, puntuacion)
+                return True
+        
+        return False
+
+    def mostrar_popup_palabra_desconocida(self, palabra, root=None):
+
+        from dialogos import SugerenciasDialog, crear_raiz_oculta
+
+        # Crear una ventana temporal si no se proporciona una
+        temp_root = None
+        if root is None:
+            temp_root = crear_raiz_oculta()
+            root = temp_root
+    
+        # Hacer que la ventana temporal sea transitoria y capturar el foco
+        root.attributes('-topmost', True)
+    
+        # Obtener sugerencias usando las distancias implementadas
+        sugerencias = self.sugerir_palabras_similares(palabra)
+    
+        # Crear y mostrar el diálogo de sugerencias
+        dialog = SugerenciasDialog(root, palabra, sugerencias)
+        root.wait_window(dialog)
+    
+        palabra_seleccionada = dialog.result
+    
+        if palabra_seleccionada is None:
+            # Si se canceló
+            if temp_root is not None:
+                temp_root.destroy()
+            return None, False, None  # palabra_final, procesada, correccion_info
+    
+        # Determinar si es corrección o palabra nueva
+        es_correccion = palabra_seleccionada != palabra
+        correccion_info = None
+        
+        if es_correccion:
+            # Es una corrección - la palabra seleccionada ya existe en la BD
+            correccion_info = {
+                'palabra_original': palabra,
+                'palabra_corregida': palabra_seleccionada,
+                'token': self.palabras[palabra_seleccionada.lower()][0],
+                'puntuacion': self.palabras[palabra_seleccionada.lower()][1]
+            }
+            
+            if temp_root is not None:
+                temp_root.destroy()
+            return palabra_seleccionada, True, correccion_info
+        else:
+            # Es palabra nueva - necesita asignar token y puntuación
+            procesada = self.procesar_palabra_con_sugerencia(palabra_seleccionada, root)
+            
+            if temp_root is not None:
+                temp_root.destroy()
+            return palabra_seleccionada, procesada, None
+    
+    def resolver_sin_interaccion(self, palabra, contexto=""):
+
+        # Autocorrección: solo si hay una única mejor sugerencia dentro del umbral
+        if self.umbral_autocorreccion is not None:
+            sugerencias = self.sugerir_con_distancias(palabra)
+            if sugerencias:
+                distancias = [d for d, _ in sugerencias[:2]]
+                unica = len(distancias) == 1 or distancias[0] < distancias[1]
+                if distancias[0] <= self.umbral_autocorreccion and unica:
+                    palabra_corregida = sugerencias[0][1]
+                    token, puntuacion = self.palabras[palabra_corregida]
+                    correccion_info = {
+                        'palabra_original': palabra,
+                        'palabra_corregida': palabra_corregida,
+                        'token': token,
+                        'puntuacion': puntuacion,
+                        'automatica': True
+                    }
+                    return palabra_corregida, correccion_info
+
+        # Sin corrección confiable: encolar para revisión del operador
+        pendiente = self.pendientes_sesion.setdefault(palabra, [0, contexto])
+        pendiente[0] += 1
+        return None, None
+
+    def registrar_correccion(self, alias, lexema):
+
+        # Recordar la corrección elegida por el operador para aplicarla sola la próxima vez
+        alias, lexema = alias.lower(), lexema.lower()
+        if alias == lexema or lexema not in self.palabras:
+            return False
+
+        conn = self.conexion()
+        with conn:
+            conn.execute('''
+                INSERT INTO correcciones (alias, lexema) VALUES (?, ?)
+                ON CONFLICT(alias) DO UPDATE SET lexema = excluded.lexema
+                WHERE lexema <> excluded.lexema
+            ''', (alias, lexema))
+        self.alias[alias] = lexema
+        return True
+
+    def resolver_por_alias(self, palabra):
+
+        # Corrección aprendida: O(1) y sin pasar por la búsqueda aproximada
+        lexema = self.alias.get(palabra)
+        if lexema is None or lexema not in self.palabras:
+            return None, None
+
+        self.aciertos_alias[palabra] += 1
+        token, puntuacion = self.palabras[lexema]
+        correccion_info = {
+            'palabra_original': palabra,
+            'palabra_corregida': lexema,
+            'token': token,
+            'puntuacion': puntuacion,
+            'aprendida': True
+        }
+        return lexema, correccion_info
+
+    def guardar_aciertos_alias(self):
+
+        if not self.aciertos_alias:
+            return 0
+
+        conn = self.conexion()
+        with conn:
+            conn.executemany('UPDATE correcciones SET aciertos = aciertos + ? WHERE alias = ?',
+                             [(aciertos, alias) for alias, aciertos in self.aciertos_alias.items()])
+        cantidad = len(self.aciertos_alias)
+        self.aciertos_alias = Counter()
+        return cantidad
+
+    def obtener_correcciones(self, limite=None):
+
+        # Correcciones aprendidas, las que más se usan primero (incluye aciertos aún no guardados)
+        self.guardar_aciertos_alias()
+        consulta = 'SELECT alias, lexema, aciertos, actualizado_en FROM correcciones ORDER BY aciertos DESC, id'
+        if limite is not None:
+            filas = self.conexion().execute(consulta + ' LIMIT ?', (limite,)).fetchall()
+        else:
+            filas = self.conexion().execute(consulta).fetchall()
+        return [{'alias': alias, 'lexema': lexema, 'aciertos': aciertos, 'actualizado_en': actualizado_en}
+                for alias, lexema, aciertos, actualizado_en in filas]
+
+    @medido('guardar_pendientes')
+    def guardar_pendientes(self):
+
+        if not self.pendientes_sesion:
+            return 0
+
+        conn = self.conexion()
+        with conn:
+            conn.executemany('''
+                INSERT INTO pendientes (palabra, frecuencia, contexto) VALUES (?, ?, ?)
+                ON CONFLICT(palabra) DO UPDATE SET frecuencia = frecuencia + excluded.frecuencia
+            ''', [(palabra, frecuencia, contexto)
+                  for palabra, (frecuencia, contexto) in self.pendientes_sesion.items()])
+
+        cantidad = len(self.pendientes_sesion)
+        self.pendientes_sesion = {}
+        return cantidad
+
+    def obtener_pendientes(self, limite=None):
+
+        conn = self.conexion()
+        consulta = 'SELECT palabra, frecuencia, contexto FROM pendientes ORDER BY frecuencia DESC, id'
+        if limite is not None:
+            filas = conn.execute(consulta + ' LIMIT ?', (limite,)).fetchall()
+        else:
+            filas = conn.execute(consulta).fetchall()
+        return [{'palabra': palabra, 'frecuencia': frecuencia, 'contexto': contexto}
+                for palabra, frecuencia, contexto in filas]
+
+    def resolver_pendientes(self, decisiones):
+        """
+        Resuelve en bloque palabras de la cola de revisión. `decisiones` asocia cada palabra a:
+        una tupla (token, puntuacion) para agregarla como palabra nueva, el lexema existente
+        que la corrige, o None para descartarla.
+        """
+        resueltas = []
+        for palabra, decision in decisiones.items():
+            if isinstance(decision, tuple):
+                token, puntuacion = decision
+                if palabra.lower() not in self.palabras:
+                    self.agregar_palabra(palabra, token, puntuacion)
+            elif decision is not None:
+                # La corrección debe apuntar a un lexema existente; queda aprendida
+                if not self.registrar_correccion(palabra, decision):
+                    continue
+            resueltas.append((palabra,))
+
+        conn = self.conexion()
+        with conn:
+            conn.executemany('DELETE FROM pendientes WHERE palabra = ?', resueltas)
+        return len(resueltas)
+
+    def revisar_pendientes(self, root=None):
+
+        # Recorrer la cola con los mismos diálogos del modo interactivo, más frecuentes primero
+        decisiones = {}
+        for pendiente in self.obtener_pendientes():
+            palabra = pendiente['palabra']
+            palabra_resultado, procesada, correccion_info = self.mostrar_popup_palabra_desconocida(palabra, root)
+            if palabra_resultado is None:
+                break  # El operador canceló: el resto queda en la cola
+            if procesada:
+                decisiones[palabra] = correccion_info['palabra_corregida'] if correccion_info else None
+
+        return self.resolver_pendientes(decisiones)
+
+    def recolectar_desconocidas(self, conversaciones):
+
+        # Palabras fuera del léxico de todas las conversaciones, con su frecuencia
+        frecuencias = Counter()
+        for conversacion in conversaciones:
+            for _, texto in self.dividir_turnos(conversacion):
+                for _, _, palabra in self.agrupar_frases(list(self.segmentar(texto))):
+                    if (self.clave_lexico(palabra) is None and palabra not in self.decisiones_sesion
+                            and self.alias.get(palabra) not in self.palabras):
+                        frecuencias[palabra] += 1
+        return frecuencias
+
+    def resolver_desconocidas(self, conversaciones, cancelar=None):
+        """
+        Prepasada del modo interactivo: pregunta una sola vez por cada palabra desconocida
+        distinta de las conversaciones, de la más frecuente a la menos frecuente, y guarda
+        las decisiones para que tokenizar las aplique sin volver a preguntar.
+        """
+        frecuencias = self.recolectar_desconocidas(conversaciones)
+        if not frecuencias:
+            return self.decisiones_sesion
+
+        root = None
+        if self.resolutor_desconocidas is None:
+            from dialogos import crear_raiz_oculta
+            root = crear_raiz_oculta()
+
+        try:
+            for palabra, _ in frecuencias.most_common():
+                if cancelar is not None and cancelar.is_set():
+                    raise ProcesamientoCancelado()
+                # Una palabra agregada antes en esta misma prepasada ya no es desconocida
+                if palabra in self.palabras:
+                    continue
+                self.decisiones_sesion[palabra] = self.consultar_desconocida(palabra, root)
+        finally:
+            if root is not None:
+                root.destroy()
+
+        return self.decisiones_sesion
+
+    def consultar_desconocida(self, palabra, root):
+
+        if self.resolutor_desconocidas is not None:
+            decision = self.resolutor_desconocidas(palabra)
+        else:
+            decision = self.mostrar_popup_palabra_desconocida(palabra, root)
+
+        palabra_resultado, procesada, correccion_info = decision
+        if procesada and correccion_info:
+            self.registrar_correccion(palabra, palabra_resultado)
+        return decision
+
+    def segmentar(self, texto):
+        """Genera (inicio, fin, palabra en minúsculas) por cada palabra, con posiciones en `texto`"""
+        for coincidencia in PATRON_PALABRA.finditer(texto):
+            inicio, fin = coincidencia.span()
+            yield inicio, fin, coincidencia.group().lower()
+
+    def agrupar_frases(self, segmentos):
+        """
+        Une en un solo segmento (inicio de la primera, fin de la última, lexema) cada lexema de
+        varias palabras, eligiendo siempre la coincidencia más larga; el resto queda igual.
+        """
+        if not self.frases_lexico:
+            return segmentos
+
+        palabras = [palabra for _, _, palabra in segmentos]
+        if self.plegar_acentos:
+            palabras = [palabra.translate(PLEGADO_ACENTOS) for palabra in palabras]
+        primeras = self.frases_lexico.raiz
+        unidades = []
+        i = 0
+        while i < len(segmentos):
+            largo, frase = self.frases_lexico.buscar(palabras, i) if palabras[i] in primeras else (0, None)
+            if frase is None:
+                unidades.append(segmentos[i])
+                i += 1
+            else:
+                unidades.append((segmentos[i][0], segmentos[i + largo - 1][1], frase))
+                i += largo
+        return unidades
+
+    def descartar_decisiones(self):
+        """Cierra la corrida: la próxima vez se vuelve a preguntar por las palabras desconocidas"""
+        self.decisiones_sesion = {}
+
+    def tokenizar(self, texto):
+        """
+        Las decisiones del operador se recuerdan entre llamadas hasta descartar_decisiones(),
+        así quien tokeniza turno por turno decide cuándo termina la corrida.
+        """
+        tokens, correcciones, _ = self.tokenizar_con_posiciones(texto)
+        return tokens, correcciones
+
+    @medido('tokenizar')
+    def tokenizar_con_posiciones(self, texto):
+        """
+        Igual que tokenizar, y además devuelve la lista de (inicio, fin) en `texto` de cada
+        token, para ubicar las palabras en el texto original aunque se hayan corregido.
+        """
+        # Dividir el texto en palabras con el patrón precompilado
+        with self.metricas.medir('dividir_palabras'):
+            segmentos = self.agrupar_frases(list(self.segmentar(texto)))
+
+        # Ventana temporal para los popups: se crea recién ante la primera palabra a consultar
+        root = None
+
+        tokens = []
+        posiciones = []
+        correcciones_realizadas = []  # Para llevar registro de las correcciones
+        aciertos = 0
+
+        for inicio, fin, palabra in segmentos:
+            posiciones.append((inicio, fin))
+            clave = palabra if palabra in self.palabras else self.clave_lexico(palabra)
+            if clave is not None:
+                # Si la palabra existe en la tabla de símbolos, obtener su token y puntuación
+                token, puntuacion = self.palabras[clave]
+                tokens.append((clave, token, puntuacion))
+                aciertos += 1
+            elif (palabra in self.alias and self.alias[palabra] in self.palabras
+                  and palabra not in self.decisiones_sesion):
+                # Error conocido: se corrige con la memoria de correcciones, sin preguntar
+                palabra_resultado, correccion_info = self.resolver_por_alias(palabra)
+                correcciones_realizadas.append(correccion_info)
+                token, puntuacion = self.palabras[palabra_resultado]
+                tokens.append((palabra_resultado, token, puntuacion))
+            elif not self.interactivo:
+                # Modo no interactivo: autocorregir o encolar sin bloquear
+                palabra_resultado, correccion_info = self.resolver_sin_interaccion(palabra, texto)
+
+                if correccion_info:
+                    correcciones_realizadas.append(correccion_info)
+                    token, puntuacion = self.palabras[palabra_resultado]
+                    tokens.append((palabra_resultado, token, puntuacion))
+                else:
+                    tokens.append((palabra, "desconocido", 0))
+            else:
+                # Si no existe, aplicar el flujo de manejo de palabras desconocidas,
+                # reutilizando la decisión si ya se preguntó por esta palabra en la corrida
+                decision = self.decisiones_sesion.get(palabra)
+                if decision is None:
+                    if root is None and self.resolutor_desconocidas is None:
+                        from dialogos import crear_raiz_oculta
+                        root = crear_raiz_oculta()
+                    decision = self.consultar_desconocida(palabra, root)
+                    self.decisiones_sesion[palabra] = decision
+                palabra_resultado, procesada, correccion_info = decision
+            
+                if procesada and palabra_resultado:
+                    if correccion_info:
+                        # Se realizó una corrección
+                        correcciones_realizadas.append(correccion_info)
+                        if self.verboso:
+                            print(f"CORRECCIÓN: '{palabra}' → '{palabra_resultado}'")
+                    
+                    # Obtener token y puntuación de la palabra (original o corregida)
+                    token, puntuacion = self.palabras[palabra_resultado.lower()]
+                    tokens.append((palabra_resultado, token, puntuacion))
+                else:
+                    # Si no se procesó o se canceló, marcar como desconocida
+                    tokens.append((palabra, "desconocido", 0))
+
+        if root is not None:
+            root.destroy()
+
+        if self.metricas.activa:
+            self.metricas.contar('palabras', len(segmentos))
+            self.metricas.contar('aciertos_lexico', aciertos)
+            self.metricas.contar('palabras_fuera_de_lexico', len(segmentos) - aciertos)
+            self.metricas.contar('correcciones', len(correcciones_realizadas))
+            self.metricas.contar('desconocidas', sum(1 for _, token, _ in tokens if token == "desconocido"))
+
+        return tokens, correcciones_realizadas, posiciones
+    
+    @medido('analizar_sentimiento')
+    def analizar_sentimiento(self, tokens):
+
+        # Calcular puntuación total sumando/restando ponderaciones
+        puntuacion_total = sum(puntuacion for _, _, puntuacion in tokens)
+        
+        # Separar palabras positivas y negativas
+        palabras_positivas = [(palabra, puntuacion) for palabra, _, puntuacion in tokens if puntuacion > 0]
+        palabras_negativas = [(palabra, puntuacion) for palabra, _, puntuacion in tokens if puntuacion < 0]
+        
+        # Determinar sentimiento general según especificación del TP
+        if puntuacion_total > 0:
+            sentimiento = "Positivo"
+        elif puntuacion_total < 0:
+            sentimiento = "Negativo"
+        else:
+            sentimiento = "Neutral"
+        
+        # Encontrar palabras más positivas y negativas
+        palabra_mas_positiva = max(palabras_positivas, key=lambda x: x[1]) if palabras_positivas else None
+        palabra_mas_negativa = min(palabras_negativas, key=lambda x: x[1]) if palabras_negativas else None
+        
+        return {
+            "sentimiento": sentimiento,
+            "puntuacion_total": puntuacion_total,
+            "palabras_positivas": len(palabras_positivas),
+            "palabras_negativas": len(palabras_negativas),
+            "palabra_mas_positiva": palabra_mas_positiva,
+            "palabra_mas_negativa": palabra_mas_negativa
+        }
+    
+    def buscar_frases_protocolo(self, tokens, turnos=None, posiciones=None):
+        return self.buscar_frases_en_palabras([palabra for palabra, _, _ in tokens], turnos, posiciones)
+
+    @medido('verificar_protocolo')
+    def buscar_frases_en_palabras(self, palabras_tokens, turnos=None, posiciones=None):
+
+        # Una sola pasada del autómata sobre las palabras, respetando límites de palabra.
+        # `turnos` es una lista ordenada de (posición del primer token, número de turno) y
+        # `posiciones` tiene el (inicio, fin) de cada token en el texto original
+        inicios = [inicio for inicio, _ in turnos] if turnos else None
+
+        # Los tokens de lexemas de varias palabras se pasan al autómata palabra por palabra;
+        # token_de lleva cada palabra al índice de su token
+        palabras = []
+        token_de = []
+        for indice, palabra in enumerate(palabras_tokens):
+            for parte in palabra.split():
+                palabras.append(parte)
+                token_de.append(indice)
+
+        coincidencias = []
+        for inicio_frase, categoria, frase in self.automata_protocolo.buscar(palabras):
+            posicion = token_de[inicio_frase]
+            coincidencia = {'categoria': categoria, 'frase': frase, 'posicion': posicion}
+            if turnos:
+                coincidencia['turno'] = turnos[bisect_right(inicios, posicion) - 1][1]
+            if posiciones is not None:
+                ultima = token_de[inicio_frase + len(PATRON_PALABRA.findall(frase)) - 1]
+                coincidencia['inicio'] = int(posiciones[posicion][0])
+                coincidencia['fin'] = int(posiciones[ultima][1])
+            coincidencias.append(coincidencia)
+        return coincidencias
+
+    def evaluar_protocolo(self, coincidencias):
+
+        encontradas = defaultdict(set)
+        for coincidencia in coincidencias:
+            encontradas[coincidencia['categoria']].add(coincidencia['frase'])
+
+        # Verificar cada fase del protocolo como especifica el TP
+        resultados = {}
+        
+        # FASE 1: Fase de saludo - Detectar bienvenida
+        resultados['Fase de saludo'] = "OK" if encontradas['saludo'] else "Faltante"
+        
+        # FASE 2: Identificación del cliente - Verificar si pide identificación
+        resultados['Identificación del cliente'] = "OK" if encontradas['identificacion'] else "Faltante"
+        
+        # FASE 3: No usar palabras rudas o prohibidas - Detectar palabras no permitidas
+        palabras_prohibidas_usadas = [palabra for palabra in self.categorias_protocolo['palabras_prohibidas']
+                                      if palabra in encontradas['palabras_prohibidas']]
+        if palabras_prohibidas_usadas:
+            resultados['Uso de palabras rudas'] = f"Detectadas: {', '.join(palabras_prohibidas_usadas)}"
+        else:
+            resultados['Uso de palabras rudas'] = "Ninguna detectada"
+        
+        # FASE 4: Despedida amable - Comprobar cierre cortés
+        resultados['Despedida amable'] = "OK" if encontradas['despedida'] else "Faltante"
+        
+        return resultados
+
+    def verificar_protocolo(self, tokens, es_agente=True, turnos=None):
+
+        if not es_agente:
+            return None  # No verificar protocolo para el cliente
+
+        return self.evaluar_protocolo(self.buscar_frases_protocolo(tokens, turnos))
+    
+    def dividir_turnos(self, conversacion):
+
+        # Dividir la conversación en turnos de agente y cliente
+        for hablante, texto, _ in self.segmentar_turnos(conversacion):
+            yield hablante, texto
+
+    def segmentar_turnos(self, conversacion):
+        """Genera (hablante, texto, inicio del texto en la conversación); los turnos vacíos se omiten"""
+        marcas = list(PATRON_HABLANTE.finditer(conversacion))
+        for i, marca in enumerate(marcas):
+            fin = marcas[i + 1].start() if i + 1 < len(marcas) else len(conversacion)
+            texto = conversacion[marca.end():fin]
+            recortado = texto.strip()
+            if recortado:
+                yield marca.group(1), recortado, marca.end() + len(texto) - len(texto.lstrip())
+
+    def procesar_conversaciones(self, conversaciones, progreso=None, cancelar=None, tuplas=False):
+
+        # Una sola prepasada de palabras desconocidas para todo el lote, luego cada conversación
+        conversaciones = list(conversaciones)
+        try:
+            if self.interactivo:
+                self.resolver_desconocidas(conversaciones, cancelar)
+            return [self.procesar_conversacion(conversacion, progreso, cancelar, prepasada=False, tuplas=tuplas)
+                    for conversacion in conversaciones]
+        finally:
+            self.descartar_decisiones()
+
+    def procesar_conversacion(self, conversacion, progreso=None, cancelar=None, prepasada=True, tuplas=False):
+        """
+        `progreso(turno, total)` se llama después de cada turno procesado. Si `cancelar` (por
+        ejemplo un threading.Event) queda activado, se lanza ProcesamientoCancelado antes del
+        siguiente turno. Con `prepasada`, en modo interactivo se pregunta primero una vez por
+        cada palabra desconocida distinta y las decisiones se descartan al terminar.
+
+        Los tokens quedan solo en resultados["columnas"] (ver columnar.py); con `tuplas=True` se
+        agregan además las listas "tokens_totales" y "tokens_agente" de tuplas
+        (palabra, token, puntuacion), para código que todavía las use.
+        """
+        if prepasada and self.interactivo:
+            try:
+                self.resolver_desconocidas([conversacion], cancelar)
+                return self.procesar_conversacion(conversacion, progreso, cancelar, prepasada=False, tuplas=tuplas)
+            finally:
+                self.descartar_decisiones()
+
+        resultados = None
+        cache = self.cache_resultados if not self.interactivo else None
+        if cache is not None:
+            from cache_resultados import normalizar_transcripcion
+            # Las altas hechas por este mismo Tokenizador no mueven version_lexico hasta refrescar
+            self.refrescar_palabras()
+            # Se analiza la transcripción normalizada, así un acierto y un cálculo nuevo dan
+            # exactamente lo mismo (incluidas las posiciones)
+            conversacion = normalizar_transcripcion(conversacion)
+            entrada = cache.obtener(self, conversacion)
+            self.metricas.contar('cache_resultados_aciertos' if entrada is not None else 'cache_resultados_fallos')
+            if entrada is not None:
+                resultados, efectos = entrada
+                self.reproducir_efectos(resultados, efectos)
+
+        if resultados is None:
+            efectos = None
+            if cache is not None:
+                # Lo encolado antes no es de esta conversación: así los efectos guardados con
+                # la entrada son exactamente los suyos
+                self.guardar_pendientes()
+                self.guardar_aciertos_alias()
+                efectos = {}
+            resultados = self.analizar_conversacion(conversacion, progreso, cancelar, efectos)
+            if cache is not None:
+                cache.guardar(self, conversacion, resultados, efectos)
+
+        if tuplas:
+            columnas = resultados["columnas"]
+            resultados = dict(resultados, tokens_totales=columnas.tuplas(),
+                              tokens_agente=columnas.tuplas(columnas.agente))
+        return resultados
+
+    def analizar_conversacion(self, conversacion, progreso=None, cancelar=None, efectos=None):
+        """
+        Si se pasa el diccionario `efectos`, se copian ahí las palabras encoladas para revisión,
+        los aciertos de la memoria de correcciones y la cantidad de turnos de esta conversación,
+        para que reproducir_efectos los repita cuando los resultados salen de la caché.
+        """
+
+        # NumPy se carga recién con el primer análisis
+        from columnar import TokensColumnares
+
+        resultados = {
+            "protocolo": None, # variable donde se guardará el resultado de la verificación
+            "coincidencias_protocolo": [],  # Frases del protocolo encontradas, con su turno
+            "palabras_negativas": [],  # Cada palabra con puntuación negativa y dónde aparece
+            "correcciones_totales": []  # Para llevar registro de todas las correcciones
+        }
+
+        # (posición del primer token entre los del agente, número de turno) de cada turno del agente
+        turnos_agente = []
+        tokens_agente = 0
+        # Todos los tokens, en arreglos paralelos con su turno, hablante y ubicación
+        columnas = TokensColumnares()
+        # Puntuación por turno y hablante, acumulada mientras se tokeniza
+        linea_tiempo = LineaTiempoSentimiento(self.ventana_sentimiento)
+
+        turnos = list(self.segmentar_turnos(conversacion))
+
+        for numero_turno, (hablante, texto, desplazamiento) in enumerate(turnos):
+            if cancelar is not None and cancelar.is_set():
+                raise ProcesamientoCancelado()
+
+            tokens, correcciones, posiciones = self.tokenizar_con_posiciones(texto)
+            columnas.agregar_turno(tokens, hablante == "Agente", numero_turno,
+                                   [(inicio + desplazamiento, fin + desplazamiento) for inicio, fin in posiciones])
+            if hablante == "Agente":
+                turnos_agente.append((tokens_agente, numero_turno))
+                tokens_agente += len(tokens)
+            linea_tiempo.agregar(numero_turno, hablante, sum(puntuacion for _, _, puntuacion in tokens))
+            resultados["correcciones_totales"].extend(correcciones)
+
+            if progreso is not None:
+                progreso(numero_turno + 1, len(turnos))
+
+        resultados["columnas"] = columnas.cerrar()
+        resultados["linea_tiempo"] = linea_tiempo.resumen()
+        if len(columnas):
+            with self.metricas.medir('analizar_sentimiento'):
+                resultados["sentimiento_general"] = columnas.sentimiento()
+                resultados["sentimiento_por_hablante"] = columnas.sentimiento_por_hablante()
+            resultados["palabras_negativas"] = columnas.negativas()
+
+        if tokens_agente:
+            coincidencias = self.buscar_frases_en_palabras(columnas.palabras_de(columnas.agente), turnos_agente,
+                                                           columnas.posiciones(columnas.agente))
+            resultados["coincidencias_protocolo"] = coincidencias
+            resultados["protocolo"] = self.evaluar_protocolo(coincidencias)
+
+        if efectos is not None:
+            efectos['pendientes'] = {palabra: list(pendiente) for palabra, pendiente in self.pendientes_sesion.items()}
+            efectos['aciertos_alias'] = dict(self.aciertos_alias)
+            efectos['turnos'] = len(turnos)
+
+        # Persistir de una sola vez las palabras desconocidas encoladas durante la conversación
+        # y los aciertos de la memoria de correcciones
+        if not self.interactivo:
+            self.guardar_pendientes()
+        self.guardar_aciertos_alias()
+
+        self.metricas.contar('conversaciones')
+        self.metricas.contar('turnos', len(turnos))
+        self.metricas.volcar()
+        return resultados
+
+    def reproducir_efectos(self, resultados, efectos):
+        """
+        Lo que analizar_conversacion habría dejado en la cola de revisión, los aciertos de
+        correcciones y los contadores, para resultados que salieron de la caché (en modo no
+        interactivo cada token es un acierto del léxico, una corrección o una desconocida).
+        """
+        for palabra, (frecuencia, contexto) in efectos['pendientes'].items():
+            pendiente = self.pendientes_sesion.setdefault(palabra, [0, contexto])
+            pendiente[0] += frecuencia
+        self.aciertos_alias.update(efectos['aciertos_alias'])
+        self.guardar_pendientes()
+        self.guardar_aciertos_alias()
+
+        if self.metricas.activa:
+            columnas = resultados["columnas"]
+            palabras = len(columnas)
+            correcciones = len(resultados["correcciones_totales"])
+            desconocidas = columnas.conteo_categorias().get("desconocido", 0)
+            self.metricas.contar('palabras', palabras)
+            self.metricas.contar('aciertos_lexico', palabras - correcciones - desconocidas)
+            self.metricas.contar('palabras_fuera_de_lexico', correcciones + desconocidas)
+            self.metricas.contar('correcciones', correcciones)
+            self.metricas.contar('desconocidas', desconocidas)
+        self.metricas.contar('conversaciones')
+        self.metricas.contar('turnos', efectos['turnos'])
+        self.metricas.volcar()
+
+    @medido('generar_reporte')
+    def generar_reporte(self, resultados, sumidero=None, formato='texto'):
+        """
+        Sin sumidero devuelve el reporte como texto; con uno (cualquier objeto con write) lo va
+        escribiendo ahí en el formato pedido ('texto', 'jsonl' o 'csv', ver reporte.py).
+        """
+        destino = io.StringIO() if sumidero is None else sumidero
+        crear_renderizador(formato, destino).escribir(resultados)
+        if sumidero is None:
+            return destino.getvalue()
@@ -0,0 +1,214 @@
+"""
+Reportes de análisis escritos de a poco en cualquier objeto con write() (archivo, sys.stdout,
+io.StringIO, socket.makefile...), sin armar el reporte completo en memoria.
+
+    texto   el reporte legible de siempre, sección por sección
+    jsonl   un objeto JSON por conversación y por línea
+    csv     una fila resumen por conversación, con encabezado en la primera
+
+Cada renderizador recibe el sumidero una vez y se le pasan los resultados de
+procesar_conversacion uno por uno, así una corrida de lote vuelca miles de reportes a disco
+a medida que terminan.
+"""
+import csv
+import json
+
+FASES_PROTOCOLO = ('Fase de saludo', 'Identificación del cliente', 'Uso de palabras rudas', 'Despedida amable')
+
+
+def desconocidas(resultados):
+    """Palabras distintas que quedaron como 'desconocido', de las columnas o de las tuplas"""
+    if resultados.get('columnas') is not None:
+        return resultados['columnas'].desconocidas()
+    return sorted({palabra for palabra, token, _ in resultados.get('tokens_totales', []) if token == 'desconocido'})
+
+
+def crear_registro(resultados, archivo=None):
+    """Los resultados sin los tokens ni las columnas, listos para serializar"""
+    registro = {'archivo': archivo} if archivo is not None else {}
+    registro.update({
+        'sentimiento': resultados.get('sentimiento_general'),
+        'protocolo': resultados.get('protocolo'),
+        'coincidencias_protocolo': resultados.get('coincidencias_protocolo', []),
+        'palabras_negativas': resultados.get('palabras_negativas', []),
+        'sentimiento_por_hablante': resultados.get('sentimiento_por_hablante'),
+        'linea_tiempo': resultados.get('linea_tiempo'),
+        'correcciones': resultados.get('correcciones_totales', []),
+        'desconocidas': desconocidas(resultados)
+    })
+    return registro
+
+
+class RenderizadorTexto:
+
+    def __init__(self, sumidero):
+        self.sumidero = sumidero
+        self.escritos = 0
+
+    def escribir(self, resultados, archivo=None):
+
+        w = self.sumidero.write
+        if archivo is not None:
+            if self.escritos:
+                w("\n")
+            w(f"Archivo: {archivo}\n")
+        w("=== REPORTE DE ANÁLISIS DE CONVERSACIÓN ===\n\n")
+
+        if "sentimiento_general" in resultados:
+            s = resultados["sentimiento_general"]
+            w("SENTIMIENTO GENERAL DE LA CONVERSACIÓN:\n")
+            w(f"Sentimiento general: {s['sentimiento']} ({s['puntuacion_total']})\n")
+            w(f"Palabras positivas: {s['palabras_positivas']}\n")
+            if s['palabra_mas_positiva']:
+                w(f"Palabra más positiva: {s['palabra_mas_positiva'][0]}, +{s['palabra_mas_positiva'][1]}\n")
+            w(f"Palabras negativas: {s['palabras_negativas']}\n")
+            if s['palabra_mas_negativa']:
+                w(f"Palabra más negativa: {s['palabra_mas_negativa'][0]}, {s['palabra_mas_negativa'][1]}\n")
+            w("\n")
+
+        if resultados.get("protocolo"):
+            w("VERIFICACIÓN DEL PROTOCOLO DE ATENCIÓN (AGENTE):\n")
+            for fase, estado in resultados["protocolo"].items():
+                w(f"{fase}: {estado}\n")
+            w("\n")
+
+        if resultados.get("linea_tiempo") and resultados["linea_tiempo"]["turnos"]:
+            linea = resultados["linea_tiempo"]
+            w(f"EVOLUCIÓN DEL SENTIMIENTO POR TURNO (promedio móvil de {linea['ventana']} turnos por hablante):\n")
+            for p in linea["turnos"]:
+                w(f"Turno {p['turno'] + 1} ({p['hablante']}): {p['puntuacion']:+d} | "
+                  f"acumulado {p['acumulado']:+d} | {p['hablante']} acumulado {p['acumulado_hablante']:+d} | "
+                  f"móvil {p['movil_hablante']:+.2f}\n")
+            for hablante, p in linea["punto_mas_bajo"].items():
+                if p and p['acumulado_hablante'] < 0:
+                    w(f"Punto más negativo del {hablante.lower()}: turno {p['turno'] + 1} ({p['acumulado_hablante']:+d})\n")
+            w("\n")
+
+        prohibidas = [c for c in resultados.get("coincidencias_protocolo", [])
+                      if c['categoria'] == 'palabras_prohibidas' and 'inicio' in c]
+        if resultados.get("palabras_negativas") or prohibidas:
+            w("UBICACIÓN DE PALABRAS NEGATIVAS Y PROHIBIDAS (caracteres en la conversación):\n")
+            for p in resultados.get("palabras_negativas", []):
+                w(f"Negativa '{p['palabra']}' ({p['puntuacion']}): turno {p['turno'] + 1}, {p['inicio']}-{p['fin']}\n")
+            for c in prohibidas:
+                w(f"Prohibida '{c['frase']}': turno {c['turno'] + 1}, {c['inicio']}-{c['fin']}\n")
+            w("\n")
+
+        if resultados.get("correcciones_totales"):
+            w("=== CORRECCIONES REALIZADAS ===\n")
+            for correccion in resultados["correcciones_totales"]:
+                w(f"Palabra mal escrita: '{correccion['palabra_original']}'\n")
+                if correccion.get('automatica'):
+                    w(f"Corrección automática: '{correccion['palabra_corregida']}'\n")
+                elif correccion.get('aprendida'):
+                    w(f"Corrección aprendida: '{correccion['palabra_corregida']}'\n")
+                else:
+                    w(f"Corrección seleccionada: '{correccion['palabra_corregida']}'\n")
+                w(f"Token asignado: {correccion['token']}\n")
+                w(f"Puntuación: {correccion['puntuacion']}\n")
+                w("-" * 40 + "\n")
+
+        self.escritos += 1
+
+    def escribir_error(self, error, archivo=None):
+
+        if archivo is not None:
+            if self.escritos:
+                self.sumidero.write("\n")
+            self.sumidero.write(f"Archivo: {archivo}\n")
+        self.sumidero.write(f"ERROR: no se pudo analizar la conversación ({error})\n")
+        self.escritos += 1
+
+
+class RenderizadorJSON:
+    """
+    JSON lines: cada registro se codifica entero con json.dumps y se escribe de una vez; json.dump
+    hacia un archivo usa el codificador en Python puro y es unas tres veces más lento.
+    """
+    def __init__(self, sumidero):
+        self.sumidero = sumidero
+        self.escritos = 0
+
+    def escribir(self, resultados, archivo=None):
+
+        self.sumidero.write(json.dumps(crear_registro(resultados, archivo), ensure_ascii=False) + '\n')
+        self.escritos += 1
+
+    def escribir_error(self, error, archivo=None):
+
+        registro = {'archivo': archivo} if archivo is not None else {}
+        registro['error'] = error
+        self.sumidero.write(json.dumps(registro, ensure_ascii=False) + '\n')
+        self.escritos += 1
+
+
+class RenderizadorCSV:
+    """
+    Una fila por conversación con los totales, el estado de cada fase del protocolo y las
+    cantidades de negativas, prohibidas, correcciones y desconocidas; las conversaciones que no
+    se pudieron analizar llevan solo el archivo y la columna error. Con `encabezado=False` no
+    se escribe la fila de nombres (para seguir agregando a un CSV que ya la tiene).
+    """
+    COLUMNAS = ('archivo', 'sentimiento', 'puntuacion_total', 'palabras_positivas', 'palabras_negativas',
+                'palabra_mas_positiva', 'palabra_mas_negativa', 'puntuacion_agente', 'puntuacion_cliente',
+                *FASES_PROTOCOLO, 'prohibidas', 'correcciones', 'desconocidas', 'punto_mas_bajo_cliente', 'error')
+
+    def __init__(self, sumidero, encabezado=True):
+        self.escritor = csv.writer(sumidero, lineterminator='\n')
+        self.encabezado = encabezado
+        self.escritos = 0
+
+    def fila(self, resultados, archivo=None):
+
+        s = resultados.get('sentimiento_general') or {}
+        por_hablante = resultados.get('sentimiento_por_hablante') or {}
+        protocolo = resultados.get('protocolo') or {}
+        linea = resultados.get('linea_tiempo') or {}
+        punto_cliente = (linea.get('punto_mas_bajo') or {}).get('Cliente')
+        mas_positiva, mas_negativa = s.get('palabra_mas_positiva'), s.get('palabra_mas_negativa')
+
+        return [
+            archivo or '',
+            s.get('sentimiento', ''),
+            s.get('puntuacion_total', ''),
+            s.get('palabras_positivas', ''),
+            s.get('palabras_negativas', ''),
+            mas_positiva[0] if mas_positiva else '',
+            mas_negativa[0] if mas_negativa else '',
+            por_hablante['Agente']['puntuacion_total'] if 'Agente' in por_hablante else '',
+            por_hablante['Cliente']['puntuacion_total'] if 'Cliente' in por_hablante else '',
+            *(protocolo.get(fase, '') for fase in FASES_PROTOCOLO),
+            sum(1 for c in resultados.get('coincidencias_protocolo', []) if c['categoria'] == 'palabras_prohibidas'),
+            len(resultados.get('correcciones_totales', [])),
+            len(desconocidas(resultados)),
+            punto_cliente['turno'] + 1 if punto_cliente and punto_cliente['acumulado_hablante'] < 0 else '',
+            ''
+        ]
+
+    def escribir(self, resultados, archivo=None):
+
+        if self.encabezado:
+            self.escritor.writerow(self.COLUMNAS)
+            self.encabezado = False
+        self.escritor.writerow(self.fila(resultados, archivo))
+        self.escritos += 1
+
+    def escribir_error(self, error, archivo=None):
+
+        if self.encabezado:
+            self.escritor.writerow(self.COLUMNAS)
+            self.encabezado = False
+        self.escritor.writerow([archivo or ''] + [''] * (len(self.COLUMNAS) - 2) + [error])
+        self.escritos += 1
+
+
+FORMATOS = {'texto': RenderizadorTexto, 'jsonl': RenderizadorJSON, 'csv': RenderizadorCSV}
+
+
+def crear_renderizador(formato, sumidero, **opciones):
+
+    try:
+        clase = FORMATOS[formato]
+    except KeyError:
+        raise ValueError(f"Formato de reporte desconocido: {formato!r} (opciones: {', '.join(FORMATOS)})") from None
+    return clase(sumidero, **opciones)
@@ -0,0 +1,351 @@
+"""
+Servicio local de análisis: un Tokenizador caliente detrás de un socket, para que los trabajos
+de ingesta no paguen la conexión a SQLite y la carga del léxico en cada invocación.
+
+Protocolo: JSON lines sobre un socket Unix (o TCP en localhost). Cada pedido es un objeto por
+línea y cada respuesta repite su "id"; un cliente puede mandar muchos pedidos seguidos sin
+esperar las respuestas.
+
+    {"id": 1, "op": "analizar", "conversacion": "Agente: ...", "formato": "jsonl"}
+        -> {"id": 1, "ok": true, "resultado": {...}}   (con "texto" o "csv", el resultado es texto)
+    {"id": 2, "op": "salud"}          -> estado, tiempo activo, pedidos en cola, versión del léxico
+    {"id": 3, "op": "estadisticas"}   -> contadores, tamaño de los lotes y percentiles de latencia
+
+Los pedidos de todas las conexiones entran a una cola y un agrupador los procesa por lotes en un
+solo hilo, porque el Tokenizador no se comparte entre hilos. Mientras el hilo está ocupado los
+pedidos se acumulan y el lote siguiente se lleva todos (hasta `lote_maximo`): con poca carga un
+pedido no espera a nadie y con mucha se paga un salto al hilo y un refresco del léxico por lote
+en lugar de uno por conversación. Con `espera_maxima` se espera además ese tiempo a que se
+junten más pedidos antes de cada lote.
+"""
+import asyncio
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from reporte import FORMATOS, crear_registro, crear_renderizador
+
+# Límite de una línea del protocolo (una conversación completa viaja en una línea)
+LARGO_MAXIMO_LINEA = 64 * 2**20
+
+
+class ErrorServidor(Exception):
+    pass
+
+
+def renderizar(resultados, formato):
+
+    if formato == 'jsonl':
+        return crear_registro(resultados)
+    sumidero = io.StringIO()
+    crear_renderizador(formato, sumidero, **({'encabezado': False} if formato == 'csv' else {})).escribir(resultados)
+    return sumidero.getvalue()
+
+
+def percentiles(valores, cuantiles=(50, 90, 99)):
+    """Percentiles por el método del rango más cercano, en milisegundos"""
+    if not valores:
+        return {}
+    ordenados = sorted(valores)
+    resultado = {f'p{q}': ordenados[min(len(ordenados) - 1, max(0, -(-q * len(ordenados) // 100) - 1))] * 1000
+                 for q in cuantiles}
+    resultado['max'] = ordenados[-1] * 1000
+    return resultado
+
+
+class ServidorAnalisis:
+
+    def __init__(self, tokenizador, lote_maximo=32, espera_maxima=0.0, muestras_latencia=10000):
+        self.tokenizador = tokenizador
+        self.lote_maximo = lote_maximo
+        self.espera_maxima = espera_maxima
+
+        # Un solo hilo: todas las llamadas al Tokenizador quedan serializadas
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tokenizador')
+        self.cola = None
+
+        self.inicio = time.time()
+        self.atendidos = 0
+        self.errores = 0
+        self.lotes = 0
+        # Ventanas de las últimas mediciones, para que los percentiles reflejen la carga actual
+        self.latencias = deque(maxlen=muestras_latencia)
+        self.tamanios_lote = deque(maxlen=1000)
+
+    def procesar_lote(self, pedidos):
+        """Corre en el hilo del Tokenizador: [(conversacion, formato)] -> [(ok, resultado o error)]"""
+        self.tokenizador.refrescar_palabras()
+        respuestas = []
+        for conversacion, formato in pedidos:
+            try:
+                respuestas.append((True, renderizar(self.tokenizador.procesar_conversacion(conversacion), formato)))
+            except Exception as error:
+                respuestas.append((False, f'{type(error).__name__}: {error}'))
+        return respuestas
+
+    async def agrupar(self):
+
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            limite = loop.time() + self.espera_maxima
+            while len(lote) < self.lote_maximo:
+                if not self.cola.empty():
+                    lote.append(self.cola.get_nowait())
+                    continue
+                restante = limite - loop.time()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                respuestas = await loop.run_in_executor(
+                    self.ejecutor, self.procesar_lote, [(conversacion, formato) for conversacion, formato, _, _ in lote])
+            except Exception as error:
+                respuestas = [(False, f'{type(error).__name__}: {error}')] * len(lote)
+
+            self.lotes += 1
+            self.tamanios_lote.append(len(lote))
+            fin = time.perf_counter()
+            for (_, _, futuro, llegada), respuesta in zip(lote, respuestas):
+                self.latencias.append(fin - llegada)
+                if not futuro.done():
+                    futuro.set_result(respuesta)
+
+    async def analizar(self, conversacion, formato='jsonl'):
+
+        if not isinstance(conversacion, str):
+            raise ErrorServidor("El campo 'conversacion' tiene que ser texto")
+        if not isinstance(formato, str) or formato not in FORMATOS:
+            raise ErrorServidor(f"Formato desconocido: {formato!r} (opciones: {', '.join(FORMATOS)})")
+        futuro = asyncio.get_running_loop().create_future()
+        await self.cola.put((conversacion, formato, futuro, time.perf_counter()))
+        ok, resultado = await futuro
+        if not ok:
+            raise ErrorServidor(resultado)
+        return resultado
+
+    def salud(self):
+
+        return {
+            'estado': 'ok',
+            'pid': os.getpid(),
+            'segundos_activo': time.time() - self.inicio,
+            'en_cola': self.cola.qsize() if self.cola is not None else 0,
+            'version_lexico': self.tokenizador.version_lexico,
+            'palabras': len(self.tokenizador.palabras)
+        }
+
+    def estadisticas(self):
+
+        estadisticas = {
+            'atendidos': self.atendidos,
+            'errores': self.errores,
+            'lotes': self.lotes,
+            'lote_promedio': sum(self.tamanios_lote) / len(self.tamanios_lote) if self.tamanios_lote else 0,
+            'lote_maximo': self.lote_maximo,
+            'latencia_ms': percentiles(self.latencias),
+            'cache_sugerencias': self.tokenizador.cache_sugerencias.estadisticas()
+        }
+        if self.tokenizador.cache_resultados is not None:
+            estadisticas['cache_resultados'] = self.tokenizador.cache_resultados.estadisticas()
+        return estadisticas
+
+    async def responder(self, pedido):
+
+        if not isinstance(pedido, dict):
+            self.errores += 1
+            return {'id': None, 'ok': False, 'error': "Cada pedido tiene que ser un objeto JSON"}
+        identificador = pedido.get('id')
+        try:
+            op = pedido.get('op')
+            if op == 'analizar':
+                respuesta = {'resultado': await self.analizar(pedido['conversacion'], pedido.get('formato', 'jsonl'))}
+            elif op == 'salud':
+                respuesta = self.salud()
+            elif op == 'estadisticas':
+                respuesta = self.estadisticas()
+            else:
+                raise ErrorServidor(f"Operación desconocida: {op!r}")
+            self.atendidos += 1
+            return {'id': identificador, 'ok': True, **respuesta}
+        except (ErrorServidor, KeyError) as error:
+            self.errores += 1
+            detalle = f"Falta el campo {error}" if isinstance(error, KeyError) else str(error)
+            return {'id': identificador, 'ok': False, 'error': detalle}
+        except Exception as error:
+            # Cualquier otra falla también se contesta: un cliente sin timeout no puede quedar esperando
+            self.errores += 1
+            return {'id': identificador, 'ok': False, 'error': f'{type(error).__name__}: {error}'}
+
+    async def atender(self, lector, escritor):
+        """Una conexión: cada pedido se atiende en su propia tarea, así un cliente puede encadenarlos"""
+        escritura = asyncio.Lock()
+        tareas = set()
+
+        async def atender_pedido(linea):
+            try:
+                respuesta = await self.responder(json.loads(linea))
+            except ValueError as error:
+                self.errores += 1
+                respuesta = {'id': None, 'ok': False, 'error': f"JSON inválido: {error}"}
+            async with escritura:
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode('utf-8') + b'\n')
+                await escritor.drain()
+
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                if not linea.strip():
+                    continue
+                tarea = asyncio.create_task(atender_pedido(linea))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+            if tareas:
+                await asyncio.gather(*tareas, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def ejecutar(self, ruta_socket=None, host='127.0.0.1', puerto=None, listo=None):
+        """Atiende hasta recibir SIGINT o SIGTERM. `listo`, si se pasa, se llama con la dirección de escucha."""
+        self.cola = asyncio.Queue(maxsize=10 * self.lote_maximo)
+        agrupador = asyncio.create_task(self.agrupar())
+
+        if ruta_socket is not None:
+            if os.path.exists(ruta_socket):
+                os.remove(ruta_socket)  # Socket de una ejecución anterior que no se cerró bien
+            servidor = await asyncio.start_unix_server(self.atender, ruta_socket, limit=LARGO_MAXIMO_LINEA)
+            direccion = ruta_socket
+        else:
+            servidor = await asyncio.start_server(self.atender, host, puerto or 0, limit=LARGO_MAXIMO_LINEA)
+            direccion = '%s:%d' % servidor.sockets[0].getsockname()[:2]
+
+        detener = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for senial in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(senial, detener.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows o un hilo que no es el principal: se detiene con KeyboardInterrupt
+
+        if listo is not None:
+            listo(direccion)
+        try:
+            await detener.wait()
+        finally:
+            # Sin esperar a wait_closed: con clientes conectados quedaría esperando a que se vayan
+            servidor.close()
+            agrupador.cancel()
+            self.ejecutor.shutdown(wait=True)
+            self.tokenizador.cerrar()
+            if ruta_socket is not None and os.path.exists(ruta_socket):
+                os.remove(ruta_socket)
+
+
+def servir(tokenizador, ruta_socket=None, host='127.0.0.1', puerto=None, **opciones):
+
+    servidor = ServidorAnalisis(tokenizador, **opciones)
+
+    def listo(direccion):
+        print(f"Escuchando en {direccion} ({len(tokenizador.palabras)} palabras cargadas).", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(servidor.ejecutar(ruta_socket, host, puerto, listo))
+    except KeyboardInterrupt:
+        pass
+
+
+class ClienteAnalisis:
+    """Cliente sincrónico del servidor, pensado para scripts de ingesta"""
+    def __init__(self, ruta_socket=None, host='127.0.0.1', puerto=None, timeout=None):
+        if ruta_socket is not None:
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.settimeout(timeout)
+            self.socket.connect(ruta_socket)
+        else:
+            self.socket = socket.create_connection((host, puerto), timeout)
+        self.archivo = self.socket.makefile('rwb')
+        self.siguiente_id = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+        return False
+
+    def enviar(self, op, **campos):
+
+        self.siguiente_id += 1
+        self.archivo.write(json.dumps({'id': self.siguiente_id, 'op': op, **campos}, ensure_ascii=False).encode('utf-8') + b'\n')
+        return self.siguiente_id
+
+    def recibir(self):
+
+        linea = self.archivo.readline()
+        if not linea:
+            raise ConnectionError("El servidor cerró la conexión")
+        return json.loads(linea)
+
+    def pedir(self, op, **campos):
+
+        self.enviar(op, **campos)
+        self.archivo.flush()
+        respuesta = self.recibir()
+        if not respuesta['ok']:
+            raise ErrorServidor(respuesta['error'])
+        return respuesta
+
+    def analizar(self, conversacion, formato='jsonl'):
+        return self.pedir('analizar', conversacion=conversacion, formato=formato)['resultado']
+
+    def analizar_varios(self, conversaciones, formato='jsonl'):
+        """
+        Manda todos los pedidos seguidos y después junta las respuestas, en el orden de entrada.
+        Una respuesta que no corresponde a ningún pedido pendiente (el servidor contesta con
+        "id": null lo que no pudo leer) deja sin saber qué respuestas faltan: se cierra la
+        conexión y se lanza ErrorServidor en lugar de esperar para siempre.
+        """
+        ids = [self.enviar('analizar', conversacion=conversacion, formato=formato) for conversacion in conversaciones]
+        self.archivo.flush()
+        pendientes = set(ids)
+        respuestas = {}
+        while pendientes:
+            respuesta = self.recibir()
+            identificador = respuesta.get('id')
+            if identificador not in pendientes:
+                self.cerrar()
+                raise ErrorServidor(respuesta.get('error') or f"Respuesta inesperada con id {identificador!r}")
+            pendientes.discard(identificador)
+            respuestas[identificador] = respuesta
+        resultados = []
+        for identificador in ids:
+            respuesta = respuestas[identificador]
+            if not respuesta['ok']:
+                raise ErrorServidor(respuesta['error'])
+            resultados.append(respuesta['resultado'])
+        return resultados
+
+    def salud(self):
+        return self.pedir('salud')
+
+    def estadisticas(self):
+        return self.pedir('estadisticas')
+
+    def cerrar(self):
+
+        self.archivo.close()
+        self.socket.close()
@@ -0,0 +1,17 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Los módulos del proyecto viven en la raíz, sin paquete
+sys.path.insert(0, RAIZ)
+
+
+@pytest.fixture
+def ruta_bd(tmp_path):
+    """Copia de tokenizador.db: las pruebas nunca escriben en la base del repositorio"""
+    ruta = tmp_path / 'tokenizador.db'
+    shutil.copy(os.path.join(RAIZ, 'tokenizador.db'), ruta)
+    return str(ruta)
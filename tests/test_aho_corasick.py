@@ -0,0 +1,60 @@
+"""Autómata de frases por palabra completa, contra una búsqueda ingenua"""
+import random
+
+from aho_corasick import AutomataFrases
+from motor import Tokenizador
+
+CATEGORIAS = {
+    'saludo': ['hola', 'buenos días', 'buenas tardes'],
+    'despedida': ['gracias', 'buenas tardes', 'que tenga buen día'],
+    'solapadas': ['a b', 'b c', 'a b c d', 'c'],
+}
+
+
+def ingenua(categorias, palabras):
+    encontradas = []
+    for categoria, frases in categorias.items():
+        for frase in frases:
+            partes = frase.split()
+            for inicio in range(len(palabras) - len(partes) + 1):
+                if palabras[inicio:inicio + len(partes)] == partes:
+                    encontradas.append((inicio, categoria, frase))
+    return sorted(encontradas)
+
+
+def test_coincide_con_la_busqueda_ingenua():
+
+    automata = AutomataFrases.desde_categorias(CATEGORIAS)
+    vocabulario = sorted({palabra for frases in CATEGORIAS.values() for frase in frases for palabra in frase.split()})
+    rng = random.Random(0)
+    for _ in range(200):
+        palabras = [rng.choice(vocabulario + ['otra']) for _ in range(rng.randint(0, 30))]
+        assert sorted(automata.buscar(palabras)) == ingenua(CATEGORIAS, palabras)
+
+
+def test_solo_en_limites_de_palabra_y_la_misma_frase_en_dos_categorias():
+
+    automata = AutomataFrases.desde_categorias(CATEGORIAS)
+    assert list(automata.buscar(['holas', 'ahola', 'agradecido'])) == []
+    assert sorted(automata.buscar(['muy', 'buenas', 'tardes'])) == [(1, 'despedida', 'buenas tardes'),
+                                                                   (1, 'saludo', 'buenas tardes')]
+
+
+def test_agregar_despues_de_compilar_recompila_al_buscar():
+
+    automata = AutomataFrases.desde_categorias({'saludo': ['hola']})
+    automata.agregar('Buen Día', 'despedida')
+    assert list(automata.buscar(['hola', 'buen', 'día'])) == [(0, 'saludo', 'hola'), (1, 'despedida', 'Buen Día')]
+
+
+def test_protocolo_con_turno_y_ubicacion_en_el_texto(ruta_bd):
+
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False)
+    conversacion = "Cliente: Hola.\nAgente: Hola, buenos días. ¿Con quién hablo?\nAgente: Gracias, que tenga buen día.\n"
+    resultados = tokenizador.procesar_conversacion(conversacion)
+    for coincidencia in resultados['coincidencias_protocolo']:
+        assert conversacion[coincidencia['inicio']:coincidencia['fin']].lower() == coincidencia['frase']
+    turnos = {c['frase']: c['turno'] for c in resultados['coincidencias_protocolo']}
+    assert turnos['buenos días'] == 1 and turnos['que tenga'] == 2
+    assert resultados['protocolo']['Identificación del cliente'] == 'OK'
+    tokenizador.cerrar()
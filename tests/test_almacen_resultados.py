@@ -0,0 +1,52 @@
+"""Consultas de cumplimiento sobre la base de resultados"""
+import pytest
+
+from almacen_resultados import AlmacenResultados
+from motor import Tokenizador
+
+AMABLE = "Agente: Hola, buenos días. Gracias.\nCliente: Excelente servicio.\n"
+RUDA = "Agente: Usted es un tonto.\nCliente: El servicio es pésimo.\n"
+
+
+@pytest.fixture
+def almacen(ruta_bd, tmp_path):
+
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False)
+    almacen = AlmacenResultados(str(tmp_path / 'resultados.db'), tamanio_lote=2)
+    almacen.guardar(tokenizador.procesar_conversacion(AMABLE), 'amable.txt', fecha='2026-10-01 10:00:00')
+    almacen.guardar(tokenizador.procesar_conversacion(RUDA), 'ruda.txt', fecha='2026-10-05 10:00:00')
+    almacen.guardar(tokenizador.procesar_conversacion(RUDA), 'ruda_2.txt', fecha='2026-10-09 10:00:00')
+    tokenizador.cerrar()
+    yield almacen
+    almacen.cerrar()
+
+
+def archivos(conversaciones):
+    return [conversacion['archivo'] for conversacion in conversaciones]
+
+
+def test_filtros_de_cumplimiento(almacen):
+
+    # buscar() vacía lo encolado antes de consultar: el tercero todavía no llegó a un lote
+    assert archivos(almacen.buscar()) == ['ruda_2.txt', 'ruda.txt', 'amable.txt']
+    assert archivos(almacen.buscar(sentimiento='Negativo', limite=1)) == ['ruda_2.txt']
+    assert archivos(almacen.buscar(fase='Uso de palabras rudas', cumple=False)) == ['ruda_2.txt', 'ruda.txt']
+    assert archivos(almacen.buscar(fase='Fase de saludo', cumple=True)) == ['amable.txt']
+    assert archivos(almacen.buscar(categoria='prohibida', desde='2026-10-06')) == ['ruda_2.txt']
+    assert almacen.contar(categoria='saludo', hasta='2026-10-01 10:00:00') == 0
+    assert almacen.contar(fase='Despedida amable') == 3
+
+
+def test_guardar_otra_vez_un_archivo_reemplaza_sus_resultados(almacen, ruta_bd):
+
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False)
+    almacen.guardar(tokenizador.procesar_conversacion(AMABLE), 'ruda.txt', fecha='2026-10-05 10:00:00')
+    tokenizador.cerrar()
+
+    assert almacen.contar() == 3
+    assert almacen.contar(categoria='prohibida') == 1
+    reemplazada, = almacen.buscar(desde='2026-10-05', hasta='2026-10-06')
+    detalle = almacen.detalle(reemplazada['id'])
+    assert reemplazada['sentimiento'] == 'Positivo'
+    assert {p['fase']: p['cumple'] for p in detalle['protocolo']}['Fase de saludo'] == 1
+    assert [a['palabra'] for a in detalle['apariciones'] if a['categoria'] == 'negativa'] == []
@@ -0,0 +1,60 @@
+"""Caché de resultados por hash de contenido: aciertos, efectos repetidos e invalidación"""
+from cache_resultados import CacheResultados
+from instrumentacion import Metricas
+from motor import Tokenizador
+
+CONVERSACION = ("Agente: Buenos días, gracias por comunicarse.\n"
+                "Cliente: El servicio es pésimo y el zrbqx no anda.\n")
+OTRA = "Agente: Hola, buenos días.\nCliente: Todo excelente.\n"
+
+
+def crear(ruta_bd, tmp_path, **opciones):
+    cache = CacheResultados(str(tmp_path / 'cache_resultados.db'))
+    return Tokenizador(ruta_bd, interactivo=False, verboso=False, cache_resultados=cache, **opciones)
+
+
+def test_un_acierto_da_lo_mismo_y_cuenta_en_la_cola_y_los_contadores(ruta_bd, tmp_path):
+
+    tokenizador = crear(ruta_bd, tmp_path, metricas=Metricas())
+    calculado = tokenizador.procesar_conversacion(CONVERSACION, tuplas=True)
+    contadores = dict(tokenizador.metricas.contadores)
+    desde_cache = tokenizador.procesar_conversacion(CONVERSACION, tuplas=True)
+
+    assert tokenizador.cache_resultados.aciertos == 1
+    assert desde_cache['tokens_totales'] == calculado['tokens_totales']
+    assert desde_cache['palabras_negativas'] == calculado['palabras_negativas']
+    assert [p['frecuencia'] for p in tokenizador.obtener_pendientes() if p['palabra'] == 'zrbqx'] == [2]
+
+    # Cada contador del análisis se duplica, como si se hubiera vuelto a calcular
+    segundos = tokenizador.metricas.contadores
+    for nombre in ('conversaciones', 'turnos', 'palabras', 'aciertos_lexico', 'desconocidas'):
+        assert segundos[nombre] == 2 * contadores[nombre], nombre
+    tokenizador.cerrar()
+
+
+def test_un_acierto_repite_los_aciertos_de_correcciones_aprendidas(ruta_bd, tmp_path):
+
+    tokenizador = crear(ruta_bd, tmp_path)
+    assert tokenizador.registrar_correccion('pesimo', 'pésimo')
+    texto = "Cliente: Fue pesimo.\n"
+    tokenizador.procesar_conversacion(texto)
+    tokenizador.procesar_conversacion(texto)
+
+    assert tokenizador.cache_resultados.aciertos == 1
+    assert tokenizador.obtener_correcciones()[0]['aciertos'] == 2
+    tokenizador.cerrar()
+
+
+def test_agregar_un_lexema_invalida_solo_las_entradas_que_lo_usan(ruta_bd, tmp_path):
+
+    tokenizador = crear(ruta_bd, tmp_path)
+    tokenizador.procesar_conversacion(CONVERSACION)
+    tokenizador.procesar_conversacion(OTRA)
+    tokenizador.agregar_palabra('zrbqx', 'negativo', -2)
+
+    resultados = tokenizador.procesar_conversacion(CONVERSACION, tuplas=True)
+    assert ('zrbqx', 'negativo', -2) in resultados['tokens_totales']
+    tokenizador.procesar_conversacion(OTRA)
+    cache = tokenizador.cache_resultados
+    assert (cache.invalidaciones, cache.aciertos) == (1, 1)
+    tokenizador.cerrar()
@@ -0,0 +1,52 @@
+"""Reanudación de la salida JSONL y CSV de `analizar`"""
+import csv
+import json
+
+import pytest
+
+from cli import main
+
+CONVERSACION = "Agente: Buenos días, gracias por comunicarse.\nCliente: El servicio es pésimo.\n"
+
+
+def leer(ruta, formato):
+    """Archivo y error de cada registro de la salida"""
+    with open(ruta, encoding='utf-8', newline='') as f:
+        if formato == 'jsonl':
+            return [(registro['archivo'], 'error' in registro) for registro in map(json.loads, f)]
+        filas = list(csv.reader(f))
+    assert filas[0][0] == 'archivo'
+    return [(fila[0], bool(fila[-1])) for fila in filas[1:]]
+
+
+def analizar(ruta_bd, directorio, salida, formato):
+    return main(['analizar', str(directorio), '--jobs', '1', '--bd', ruta_bd,
+                 '--out', str(salida), '--formato', formato])
+
+
+@pytest.mark.parametrize('formato', ['jsonl', 'csv'])
+def test_reanudar_no_repite_los_analizados_y_reintenta_los_errores(ruta_bd, tmp_path, formato):
+
+    directorio = tmp_path / 'conversaciones'
+    directorio.mkdir()
+    (directorio / 'a.txt').write_text(CONVERSACION, encoding='utf-8')
+    (directorio / 'b.txt').write_bytes(b'Cliente: \xff\xfe no es UTF-8\n')
+    salida = tmp_path / f'resultados.{formato}'
+
+    assert analizar(ruta_bd, directorio, salida, formato) == 0
+    assert sorted(leer(salida, formato)) == [('a.txt', False), ('b.txt', True)]
+
+    # Una corrida cortada a mitad de una línea, y la falla de b.txt ya corregida
+    with open(salida, 'a', encoding='utf-8') as f:
+        f.write('{"archivo": "c.t' if formato == 'jsonl' else 'c.txt,Neg')
+    (directorio / 'b.txt').write_text(CONVERSACION, encoding='utf-8')
+    (directorio / 'c.txt').write_text(CONVERSACION, encoding='utf-8')
+
+    assert analizar(ruta_bd, directorio, salida, formato) == 0
+    registros = leer(salida, formato)
+    assert sorted(registros[2:]) == [('b.txt', False), ('c.txt', False)]
+    assert sorted(registros[:2]) == [('a.txt', False), ('b.txt', True)]
+
+    # Con todo analizado, otra corrida no agrega nada
+    assert analizar(ruta_bd, directorio, salida, formato) == 0
+    assert len(leer(salida, formato)) == 4
@@ -0,0 +1,46 @@
+"""El motor NumPy y los índices de sugerencias contra las funciones escalares, sobre el léxico real"""
+import random
+
+import pytest
+
+from benchmark import alterar
+from distancias_vectorizadas import MotorDistancias
+from lexemas_compuestos import es_compuesto
+from motor import Tokenizador
+
+
+@pytest.fixture
+def tokenizador(ruta_bd):
+    # Sin caché de sugerencias: se comparan los índices, no la memoización
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False, capacidad_cache=0)
+    yield tokenizador
+    tokenizador.cerrar()
+
+
+def consultas(lexemas, cantidad=150, semilla=0):
+    """Lexemas sin cambios y con hasta tres errores de transcripción"""
+    rng = random.Random(semilla)
+    return [alterar(rng.choice(lexemas), rng, rng.randint(0, 3)) for _ in range(cantidad)]
+
+
+def test_distancias_vectorizadas_iguales_a_las_escalares(tokenizador):
+
+    lexemas = list(tokenizador.palabras)
+    motor = MotorDistancias(lexemas)
+    for palabra in consultas(lexemas):
+        levenshtein = [tokenizador.distancia_levenshtein(palabra, lexema) for lexema in lexemas]
+        assert motor.levenshtein(palabra).tolist() == levenshtein, palabra
+        assert motor.levenshtein(palabra, 2).tolist() == [min(d, 3) for d in levenshtein], palabra
+        assert motor.hamming(palabra).tolist() == [tokenizador.distancia_hamming(palabra, lexema)
+                                                   for lexema in lexemas], palabra
+
+
+@pytest.mark.parametrize('indice', ['bk', 'numpy'])
+def test_sugerencias_del_indice_iguales_a_las_lineales(tokenizador, indice):
+
+    tokenizador.indice_sugerencias = indice
+    tokenizador.construir_indice()
+    simples = [lexema for lexema in tokenizador.palabras if not es_compuesto(lexema)]
+    for palabra in consultas(simples, cantidad=80, semilla=1):
+        assert tokenizador.sugerir_palabras_similares(palabra) == \
+            tokenizador.sugerir_palabras_similares_lineal(palabra), palabra
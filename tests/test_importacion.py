@@ -0,0 +1,22 @@
+"""El núcleo sin GUI no carga tkinter ni NumPy al importarse y arranca dentro de un presupuesto"""
+import pytest
+
+from benchmark import tiempos_importacion
+
+# Presupuesto del mejor de REPETICIONES intérpretes nuevos, en milisegundos. Antes de separar el
+# núcleo, importar tokenizador costaba unos 130ms y lote unos 190ms; hoy motor ronda los 45ms y
+# lote y cli los 85ms (la mitad es concurrent.futures). NumPy solo ya cuesta más de 100ms, así
+# que volver a cargarlo al importar hace fallar la prueba.
+PRESUPUESTO_MS = {'motor': 100, 'tokenizador': 100, 'lote': 150, 'cli': 150}
+REPETICIONES = 3
+
+
+@pytest.mark.parametrize('modulo', list(PRESUPUESTO_MS))
+def test_importar_dentro_del_presupuesto_y_sin_dependencias_pesadas(modulo):
+
+    corridas = [tiempos_importacion(modulo) for _ in range(REPETICIONES)]
+    mejor, dependencias, cargadas = min(corridas, key=lambda corrida: corrida[0])
+    assert cargadas == []
+    caras = ', '.join(f"{nombre} {t / 1000:.1f}ms" for nombre, t in
+                      sorted(dependencias.items(), key=lambda item: -item[1])[:3])
+    assert mejor / 1000 <= PRESUPUESTO_MS[modulo], f"{modulo}: {mejor / 1000:.1f}ms ({caras})"
@@ -0,0 +1,47 @@
+"""Caché de sugerencias: aislamiento de las listas devueltas y corrección ante cambios del léxico"""
+import sqlite3
+
+from motor import Tokenizador
+
+CONSULTAS = ['zumbid', 'zumbidos', 'exelente', 'probema', 'grasias']
+
+
+def crear(ruta_bd, **opciones):
+    return Tokenizador(ruta_bd, interactivo=False, verboso=False, **opciones)
+
+
+def test_modificar_lo_devuelto_no_cambia_la_cache(ruta_bd):
+
+    tokenizador = crear(ruta_bd)
+    primeras = tokenizador.sugerir_con_distancias('exelente')
+    primeras.clear()
+    segundas = tokenizador.sugerir_con_distancias('exelente')
+    assert segundas and tokenizador.cache_sugerencias.aciertos == 1
+    segundas.append((0, 'basura'))
+    assert (0, 'basura') not in tokenizador.sugerir_con_distancias('exelente')
+    tokenizador.cerrar()
+
+
+def test_altas_y_bajas_dan_lo_mismo_que_sin_cache(ruta_bd):
+
+    tokenizador = crear(ruta_bd)
+    for palabra in CONSULTAS:
+        tokenizador.sugerir_con_distancias(palabra)
+
+    # El alta parcha las entradas en el lugar; la baja (traída al refrescar) vacía la caché
+    tokenizador.agregar_palabra('zumbido', 'negativo', -1)
+    cache = tokenizador.cache_sugerencias
+    assert cache.parches >= 2 and cache.invalidaciones == 0
+    assert tokenizador.sugerir_palabras_similares('zumbid')[0] == 'zumbido'
+    conn = sqlite3.connect(ruta_bd)
+    with conn:
+        conn.execute("DELETE FROM palabras WHERE lexema = 'excelente'")
+    conn.close()
+    tokenizador.refrescar_palabras()
+    assert cache.invalidaciones == 1
+
+    referencia = crear(ruta_bd, capacidad_cache=0)
+    for palabra in CONSULTAS:
+        assert tokenizador.sugerir_con_distancias(palabra) == referencia.sugerir_con_distancias(palabra), palabra
+    referencia.cerrar()
+    tokenizador.cerrar()
@@ -0,0 +1,62 @@
+"""Instantánea binaria del léxico: ida y vuelta, superposición de cambios y cierre del mapeo"""
+import sqlite3
+
+import pytest
+
+from instantanea import LexicoInstantanea, exportar_instantanea
+from motor import Tokenizador
+
+
+def crear(ruta_bd, **opciones):
+    return Tokenizador(ruta_bd, interactivo=False, verboso=False, **opciones)
+
+
+def test_ida_y_vuelta_con_las_mismas_claves_valores_y_orden(ruta_bd, tmp_path):
+
+    tokenizador = crear(ruta_bd)
+    # Puntuaciones que no entran en un int8
+    tokenizador.agregar_palabra('catastrófico', 'negativo', -500)
+    tokenizador.agregar_palabra('sublime', 'positivo', 2**40)
+    ruta = str(tmp_path / 'lexico.bin')
+    assert exportar_instantanea(ruta_bd, ruta) == len(tokenizador.palabras)
+
+    with LexicoInstantanea(ruta) as lexico:
+        assert list(lexico) == list(tokenizador.palabras)
+        assert dict(lexico.items()) == dict(tokenizador.palabras)
+        assert lexico['sublime'] == ('positivo', 2**40)
+        assert 'no existe' not in lexico
+        assert lexico.version_lexico == tokenizador.leer_version_lexico()
+    tokenizador.cerrar()
+
+
+def test_los_cambios_posteriores_se_superponen_a_la_instantanea(ruta_bd, tmp_path):
+
+    ruta = str(tmp_path / 'lexico.bin')
+    exportar_instantanea(ruta_bd, ruta)
+    escritor = crear(ruta_bd)
+    escritor.agregar_palabra('zumbido', 'negativo', -1)
+    escritor.cerrar()
+    conn = sqlite3.connect(ruta_bd)
+    with conn:
+        conn.execute("DELETE FROM palabras WHERE lexema = 'excelente'")
+    conn.close()
+
+    tokenizador = crear(ruta_bd, instantanea=ruta)
+    assert tokenizador.palabras['zumbido'] == ('negativo', -1)
+    assert 'excelente' not in tokenizador.palabras
+    assert 'excelente' in tokenizador.palabras.base
+    assert tokenizador.tokenizar('zumbido excelente')[0] == [('zumbido', 'negativo', -1),
+                                                            ('excelente', 'desconocido', 0)]
+    tokenizador.cerrar()
+
+
+def test_cerrar_libera_el_mapeo(ruta_bd, tmp_path):
+
+    ruta = str(tmp_path / 'lexico.bin')
+    exportar_instantanea(ruta_bd, ruta)
+    lexico = LexicoInstantanea(ruta)
+    lexico.close()
+    lexico.close()
+    assert lexico.mapa.closed
+    with pytest.raises(ValueError):
+        lexico['hola']
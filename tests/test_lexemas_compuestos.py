@@ -0,0 +1,50 @@
+"""Lexemas de varias palabras reconocidos como un solo token, con y sin plegado de acentos"""
+import pytest
+
+from lexemas_compuestos import TrieFrases
+from motor import Tokenizador
+
+
+def test_trie_devuelve_la_coincidencia_mas_larga():
+
+    trie = TrieFrases(['no funciona', 'no funciona nada'])
+    palabras = 'esto no funciona nada bien'.split()
+    assert trie.buscar(palabras, 1) == (3, 'no funciona nada')
+    assert trie.buscar(palabras, 0) == (0, None)
+
+
+@pytest.mark.parametrize('plegar_acentos', [False, True])
+def test_lexema_compuesto_con_posiciones(ruta_bd, plegar_acentos):
+
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False, plegar_acentos=plegar_acentos)
+    tokenizador.agregar_palabra('buenos días', 'saludo', 1)
+    texto = 'Buenos días, no funciona'
+    tokens, _, posiciones = tokenizador.tokenizar_con_posiciones(texto)
+    assert tokens[0] == ('buenos días', 'saludo', 1)
+    assert texto[slice(*posiciones[0])] == 'Buenos días'
+    tokenizador.cerrar()
+
+
+def test_lexema_compuesto_sin_tildes_con_plegado(ruta_bd):
+
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False, plegar_acentos=True)
+    tokenizador.agregar_palabra('buenos días', 'saludo', 1)
+    tokenizador.agregar_palabra('atención rápida', 'positivo', 2)
+    tokens, _ = tokenizador.tokenizar('Buenos dias, gracias por la atencion rapida')
+    assert tokens[0] == ('buenos días', 'saludo', 1)
+    assert ('atención rápida', 'positivo', 2) in tokens
+
+    # Un Tokenizador nuevo arma el trie desde la base con las mismas claves
+    otro = Tokenizador(ruta_bd, interactivo=False, verboso=False, plegar_acentos=True)
+    assert otro.tokenizar('buenos dias')[0] == [('buenos días', 'saludo', 1)]
+    otro.cerrar()
+    tokenizador.cerrar()
+
+
+def test_sin_plegado_la_forma_sin_tildes_no_coincide(ruta_bd):
+
+    tokenizador = Tokenizador(ruta_bd, interactivo=False, verboso=False)
+    tokenizador.agregar_palabra('buenos días', 'saludo', 1)
+    tokens, _ = tokenizador.tokenizar('buenos dias')
+    assert len(tokens) == 2
+    tokenizador.cerrar()
@@ -0,0 +1,60 @@
+"""Escrituras del léxico en SQLite y su sincronización entre instancias"""
+from motor import Tokenizador
+
+
+def crear(ruta_bd, **opciones):
+    return Tokenizador(ruta_bd, interactivo=False, verboso=False, **opciones)
+
+
+def test_agregar_palabras_no_pisa_las_que_ya_estaban_en_la_base(ruta_bd):
+
+    primero, segundo = crear(ruta_bd), crear(ruta_bd)
+    primero.agregar_palabra('zumbido', 'negativo', -1)
+
+    # El segundo no la tiene en memoria: el INSERT OR IGNORE la saltea y deben quedar los valores de la base
+    agregadas = segundo.agregar_palabras([('zumbido', 'positivo', 5), ('chirrido', 'negativo', -2)])
+    assert agregadas == 1
+    assert segundo.palabras['zumbido'] == ('negativo', -1)
+    assert segundo.palabras['chirrido'] == ('negativo', -2)
+    assert segundo.tokenizar('zumbido')[0] == [('zumbido', 'negativo', -1)]
+    primero.cerrar()
+    segundo.cerrar()
+
+
+def test_importar_csv_en_lotes(ruta_bd, tmp_path):
+
+    ruta_csv = tmp_path / 'lexico.csv'
+    ruta_csv.write_text('lexema,token,puntuacion\nfenomenal,positivo,3\nespantoso,negativo,-3\nhola,saludo,9\n',
+                        encoding='utf-8')
+    tokenizador = crear(ruta_bd)
+    original = tokenizador.palabras['hola']
+    assert tokenizador.importar_csv(str(ruta_csv), tamanio_lote=2) == 2
+    assert tokenizador.palabras['fenomenal'] == ('positivo', 3)
+    assert tokenizador.palabras['hola'] == original
+    tokenizador.cerrar()
+
+
+def test_refrescar_trae_altas_cambios_bajas_y_correcciones_de_otra_instancia(ruta_bd):
+
+    lector, escritor = crear(ruta_bd), crear(ruta_bd)
+    assert lector.refrescar_palabras() == 0
+
+    escritor.agregar_palabra('zumbido', 'negativo', -1)
+    escritor.agregar_palabra('no anda', 'negativo', -2)
+    escritor.registrar_correccion('exelente', 'excelente')
+    conn = escritor.conexion()
+    with conn:
+        conn.execute("UPDATE palabras SET puntuacion = 4 WHERE lexema = 'excelente'")
+        conn.execute("DELETE FROM palabras WHERE lexema = 'problema'")
+
+    assert lector.refrescar_palabras() == 5
+    assert lector.version_lexico == escritor.leer_version_lexico()
+    assert lector.palabras['excelente'] == ('positivo', 4)
+    assert 'problema' not in lector.palabras
+    assert lector.tokenizar('zumbido exelente no anda problema')[0] == [
+        ('zumbido', 'negativo', -1), ('excelente', 'positivo', 4), ('no anda', 'negativo', -2),
+        ('problema', 'desconocido', 0)]
+    # Sin cambios nuevos el refresco no trae nada
+    assert lector.refrescar_palabras() == 0
+    lector.cerrar()
+    escritor.cerrar()
@@ -0,0 +1,77 @@
+"""Protocolo JSON lines del servidor de análisis y respuestas de error"""
+import asyncio
+import threading
+
+import pytest
+
+from motor import Tokenizador
+from servidor import ClienteAnalisis, ErrorServidor, ServidorAnalisis
+
+CONVERSACION = "Agente: Buenos días, gracias por comunicarse.\nCliente: El servicio es pésimo.\n"
+
+
+@pytest.fixture
+def puerto(ruta_bd):
+    """Servidor en un puerto TCP libre de localhost, en su propio hilo; se detiene al terminar"""
+    servidor = ServidorAnalisis(Tokenizador(ruta_bd, interactivo=False, verboso=False))
+    listo = threading.Event()
+    estado = {}
+
+    async def principal():
+        estado['tarea'] = asyncio.current_task()
+        estado['loop'] = asyncio.get_running_loop()
+        await servidor.ejecutar(listo=lambda direccion: (estado.update(direccion=direccion), listo.set()))
+
+    def correr():
+        try:
+            asyncio.run(principal())
+        except asyncio.CancelledError:
+            pass
+
+    hilo = threading.Thread(target=correr, daemon=True)
+    hilo.start()
+    assert listo.wait(10)
+    yield int(estado['direccion'].rsplit(':', 1)[1])
+    estado['loop'].call_soon_threadsafe(estado['tarea'].cancel)
+    hilo.join(10)
+
+
+def test_analizar_salud_y_estadisticas(puerto):
+
+    with ClienteAnalisis(puerto=puerto, timeout=10) as cliente:
+        registro = cliente.analizar(CONVERSACION)
+        assert registro['sentimiento']['palabra_mas_negativa'] == ['pésimo', -3]
+        assert cliente.analizar(CONVERSACION, formato='csv').count('\n') == 1
+        assert cliente.salud()['estado'] == 'ok'
+        assert cliente.estadisticas()['atendidos'] == 3
+
+
+def test_varios_pedidos_seguidos_vuelven_en_el_orden_de_entrada(puerto):
+
+    conversaciones = ["Cliente: Todo excelente.\n", CONVERSACION, "Cliente: Gracias.\n"]
+    with ClienteAnalisis(puerto=puerto, timeout=10) as cliente:
+        esperados = [cliente.analizar(conversacion) for conversacion in conversaciones]
+        assert cliente.analizar_varios(conversaciones) == esperados
+
+
+@pytest.mark.parametrize('campos, error', [
+    ({'op': 'borrar'}, "Operación desconocida"),
+    ({'op': 'analizar'}, "Falta el campo"),
+    ({'op': 'analizar', 'conversacion': 3}, "tiene que ser texto"),
+    ({'op': 'analizar', 'conversacion': CONVERSACION, 'formato': 'xml'}, "Formato desconocido"),
+])
+def test_los_pedidos_invalidos_se_contestan_con_error(puerto, campos, error):
+
+    with ClienteAnalisis(puerto=puerto, timeout=10) as cliente:
+        with pytest.raises(ErrorServidor, match=error):
+            cliente.pedir(campos.pop('op'), **campos)
+        # La conexión sigue sirviendo después del error
+        assert cliente.salud()['ok']
+
+
+def test_una_respuesta_sin_id_corta_el_lote_en_lugar_de_colgarse(puerto):
+
+    with ClienteAnalisis(puerto=puerto, timeout=10) as cliente:
+        cliente.archivo.write(b'esto no es JSON\n')
+        with pytest.raises(ErrorServidor, match="JSON inválido"):
+            cliente.analizar_varios([CONVERSACION, CONVERSACION])
@@ -0,0 +1,78 @@
+"""Tokenización: posiciones en el texto, plegado de acentos y memoria de correcciones"""
+from motor import Tokenizador
+
+
+def crear(ruta_bd, **opciones):
+    opciones.setdefault('interactivo', False)
+    return Tokenizador(ruta_bd, verboso=False, **opciones)
+
+
+def corregir_a(lexema):
+    """Resolutor de palabras desconocidas que corrige siempre al mismo lexema"""
+    def resolutor(palabra):
+        return lexema, True, {'palabra_original': palabra, 'palabra_corregida': lexema,
+                              'token': 'saludo', 'puntuacion': 1}
+    return resolutor
+
+
+def test_correccion_del_operador_se_recuerda_y_no_imprime(ruta_bd, capsys):
+
+    tokenizador = crear(ruta_bd, interactivo=True)
+    tokenizador.resolutor_desconocidas = corregir_a('hola')
+    tokens, correcciones = tokenizador.tokenizar('holaa')
+    assert tokens[0][0] == 'hola'
+    assert correcciones[0]['palabra_corregida'] == 'hola'
+    assert capsys.readouterr().out == ''
+
+    # Otra instancia aplica la corrección aprendida sin preguntar
+    otro = crear(ruta_bd, interactivo=True)
+    otro.resolutor_desconocidas = lambda palabra: (_ for _ in ()).throw(AssertionError(palabra))
+    tokens, correcciones = otro.tokenizar('holaa')
+    assert tokens[0][0] == 'hola'
+    assert correcciones[0]['aprendida']
+    otro.guardar_aciertos_alias()
+    assert otro.obtener_correcciones()[0]['aciertos'] == 1
+    tokenizador.cerrar()
+    otro.cerrar()
+
+
+def test_posiciones_ubican_cada_token_en_el_texto(ruta_bd):
+
+    tokenizador = crear(ruta_bd)
+    tokenizador.agregar_palabra('no anda', 'negativo', -2)
+    texto = "¡HOLA!  El equipo   No   Anda, qué PÉSIMO... zrbqx"
+    tokens, _, posiciones = tokenizador.tokenizar_con_posiciones(texto)
+    assert [texto[inicio:fin] for inicio, fin in posiciones] == ['HOLA', 'El', 'equipo', 'No   Anda', 'qué',
+                                                                  'PÉSIMO', 'zrbqx']
+    assert tokens[3] == ('no anda', 'negativo', -2)
+    assert tokens[-1] == ('zrbqx', 'desconocido', 0)
+    tokenizador.cerrar()
+
+
+def test_las_negativas_de_una_conversacion_apuntan_a_la_conversacion(ruta_bd):
+
+    tokenizador = crear(ruta_bd)
+    conversacion = "Agente: Buenos días.\n\nCliente:   Todo PÉSIMO, un problema fatal.\n"
+    negativas = tokenizador.procesar_conversacion(conversacion)['palabras_negativas']
+    assert [(n['turno'], conversacion[n['inicio']:n['fin']]) for n in negativas] == [
+        (1, 'PÉSIMO'), (1, 'problema'), (1, 'fatal')]
+    tokenizador.cerrar()
+
+
+def test_plegar_acentos_en_ambos_sentidos_y_en_frases(ruta_bd):
+
+    escritor = crear(ruta_bd)
+    escritor.agregar_palabra('cuénteme', 'neutro', 0)
+    escritor.agregar_palabra('está caído', 'negativo', -2)
+    escritor.cerrar()
+    sin_plegar, plegando = crear(ruta_bd), crear(ruta_bd, plegar_acentos=True)
+    texto = 'cuenteme excelénte, esta caido'
+
+    desconocidas = [palabra for palabra, token, _ in sin_plegar.tokenizar(texto)[0] if token == 'desconocido']
+    assert desconocidas == ['cuenteme', 'excelénte', 'caido']
+    # Sin tildes encuentra el lexema con tildes, con tildes de más el lexema sin ellas, y las
+    # frases se reconocen igual; el token lleva siempre la clave del léxico
+    assert plegando.tokenizar(texto)[0] == [('cuénteme', 'neutro', 0), ('excelente', 'positivo', 3),
+                                           ('está caído', 'negativo', -2)]
+    sin_plegar.cerrar()
+    plegando.cerrar()